@@ -0,0 +1,152 @@
+"""Benchmark for binding schedule CSV files into an Excel workbook.
+
+Generates a synthetic corpus of Revit-style schedule exports (UTF-16, title
+row, header row, 'Prefix_CODE_suffix.csv' file names) and times the parse,
+write and format stages of the binder separately as well as a complete
+bind_all_files() run. Runs headless with the native xlsx writer backend.
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import os.path
+import random
+import sys
+import tempfile
+import time
+import binder_writers
+import bind_schedules
+import schedule_table
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Constants:
+SUCCESS = 0
+PREFIX = "Qty"
+SUFFIX = "Bench"
+SYSTEMS = ["SW", "RW", "TWK", "TWW", "HZV", "HZR", "LUE"]
+COLUMN_GENERATORS = [  # (header, cell generator) cycled through for the columns
+    ("System", lambda rng: rng.choice(SYSTEMS)),
+    ("Length", lambda rng: "{0:.2f} m".format(rng.uniform(0.1, 12.0))),
+    ("Diameter", lambda rng: "DN{0}".format(rng.choice([20, 25, 32, 40, 50, 65, 80, 100]))),
+    ("Count", lambda rng: str(rng.randint(1, 500))),
+    ("Flow", lambda rng: "{0:.1f} m³/h".format(rng.uniform(0.0, 900.0)) if rng.random() > 0.1 else ""),
+    ("Comment", lambda rng: rng.choice(["", "", "check", "to be confirmed, see detail 4"])),
+    ("Mark", lambda rng: "{0:04d}".format(rng.randint(0, 9999))),
+]
+
+
+def main(files, rows, columns, backend, workers, corpus_directory=None, seed=0):
+    """Generate a corpus and run all benchmarks on it."""
+    with contextlib.ExitStack() as stack:
+        if corpus_directory is None:
+            corpus_directory = stack.enter_context(tempfile.TemporaryDirectory())
+        print(f"Generating {files} files with {rows} rows and {columns} columns in '{corpus_directory}'... ",
+              end="", flush=True)
+        csv_file_paths = generate_corpus(corpus_directory, files, rows, columns, seed=seed)
+        print("✔")
+        total_rows = files * rows
+        output_path = os.path.join(corpus_directory, f"binder_{backend}.xlsx")
+        # Stage benchmarks
+        tables, parse_time = timed(lambda: [schedule_table.read_schedule_table(path) for path in csv_file_paths])
+        write_time, format_time, save_time = time_writing(tables, output_path, backend)
+        del tables
+        report("parse", parse_time, total_rows)
+        report("write", write_time, total_rows)
+        report("format", format_time, total_rows)
+        report("save", save_time, total_rows)
+        # End to end benchmark including the parallel parsing pipeline
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, bind_time = timed(lambda: bind_schedules.bind_all_files(
+                csv_file_paths, output_path, backend=backend, workers=workers))
+        report(f"bind ({workers} workers)", bind_time, total_rows)
+        print(f"  ➜ Peak RSS: {peak_rss_text()}")
+    return SUCCESS
+
+
+def generate_corpus(directory, files, rows, columns, seed=0):
+    """Write a synthetic corpus of schedule CSV files and return their paths."""
+    rng = random.Random(seed)
+    paths = []
+    for number in range(files):
+        schedule_code = f"S{number:04d}"
+        path = os.path.join(directory, f"{PREFIX}_{schedule_code}_{SUFFIX}.csv")
+        generators = [COLUMN_GENERATORS[column % len(COLUMN_GENERATORS)] for column in range(columns)]
+        with open(path, mode="w", encoding="utf-16", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow([f"{PREFIX}_{schedule_code}_{SUFFIX}"])  # title row
+            writer.writerow([header for header, _ in generators])
+            for _ in range(rows):
+                writer.writerow([generator(rng) for _, generator in generators])
+        paths.append(path)
+    return paths
+
+
+def time_writing(tables, output_path, backend):
+    """Write parsed tables to a workbook, timing writing, formatting and saving."""
+    write_time = format_time = 0.0
+    workbook = binder_writers.open_workbook(output_path, backend=backend)
+    for number, table in enumerate(tables):
+        start = time.perf_counter()
+        sheet = workbook.add_sheet(f"S{number:04d}")
+        sheet.write_title(table.title)
+        sheet.write_rows(table.rows(include_header=True))
+        write_time += time.perf_counter() - start
+        start = time.perf_counter()
+        sheet.format()
+        format_time += time.perf_counter() - start
+    _, save_time = timed(workbook.close)
+    return write_time, format_time, save_time
+
+
+def timed(function):
+    """Call a function and return its result and the elapsed wall time."""
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def report(stage, seconds, total_rows):
+    """Print the timing and throughput of a benchmark stage."""
+    throughput = total_rows / seconds if seconds else float("inf")
+    print(f"  ➜ {stage:<16} {seconds:8.3f} s {throughput:12,.0f} rows/s")
+
+
+def peak_rss_text():
+    """Peak resident set size of this process and its children."""
+    if resource is None:
+        return "not available on this platform"
+    scale = 1 if sys.platform == "darwin" else 1024  # bytes on macOS, kilobytes on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return f"{own / 2 ** 20:.1f} MiB (largest worker process {children / 2 ** 20:.1f} MiB)"
+
+
+if __name__ == "__main__":
+    # Parse command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=50, help="number of schedule CSV files to generate")
+    parser.add_argument("--rows", type=int, default=2000, help="number of data rows per schedule")
+    parser.add_argument("--columns", type=int, default=12, help="number of columns per schedule")
+    parser.add_argument(
+        "--backend", default=binder_writers.DEFAULT_BACKEND, choices=sorted(binder_writers.BACKENDS),
+        help="workbook writer to benchmark")
+    parser.add_argument(
+        "--workers", type=int, default=bind_schedules.DEFAULT_WORKERS,
+        help="number of parsing processes for the end to end run")
+    parser.add_argument(
+        "--corpus-directory", default=None,
+        help="keep the generated corpus and binder in this directory instead of a temporary one")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the corpus generator")
+    args = parser.parse_args()
+    # Run benchmarks
+    result = main(
+        files=args.files, rows=args.rows, columns=args.columns,
+        backend=args.backend, workers=args.workers,
+        corpus_directory=args.corpus_directory, seed=args.seed)
+    sys.exit(result)
@@ -0,0 +1,155 @@
+"""Headless batch binding of many schedule CSV folders into Excel workbooks.
+
+The jobs are read from a JSON job manifest, either a list of jobs or an
+object with a "jobs" list:
+
+    {"jobs": [
+        {"name": "ProjectA", "sources": ["exports/A", "exports/A2/Qty_*.csv"],
+         "output": "binders/A.xlsx", "incremental": true},
+        {"sources": ["exports/B"], "output": "binders/B.xlsx", "chunk_size": 10000}
+    ]}
+
+Sources are folders (all CSV files in them) or glob patterns, relative paths
+are resolved against the manifest's folder. The jobs run on a pool of worker
+processes and progress, timings and errors are streamed to stdout as JSON
+lines. A failing job does not stop the others.
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import glob
+import json
+import multiprocessing
+import os
+import os.path
+import queue
+import sys
+import time
+import traceback
+import binder_writers
+import bind_schedules
+
+# Constants:
+SUCCESS = 0
+FAILURE = -1
+DEFAULT_JOB_WORKERS = os.cpu_count() or 1
+DEFAULT_PARSE_WORKERS = 1  # per job, the jobs themselves already run in parallel
+POLL_INTERVAL = 0.1  # seconds
+
+
+def main(manifest_path, job_workers=DEFAULT_JOB_WORKERS, parse_workers=DEFAULT_PARSE_WORKERS):
+    """Run all jobs of a job manifest and stream their progress as JSON lines."""
+    jobs = load_jobs(manifest_path)
+    start = time.perf_counter()
+    failed = 0
+    with multiprocessing.Manager() as manager:
+        events = manager.Queue()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max(job_workers, 1)) as executor:
+            futures = {executor.submit(run_job, job, parse_workers, events): job for job in jobs}
+            remaining = set(futures)
+            while remaining:
+                done, remaining = concurrent.futures.wait(remaining, timeout=POLL_INTERVAL)
+                emit_queued_events(events)
+                for future in done:
+                    try:
+                        result = future.result()
+                    except Exception as ex:  # worker process died
+                        result = {"event": "finished", "job": futures[future]["name"],
+                                  "status": "failed", "error": repr(ex)}
+                    failed += result["status"] != "succeeded"
+                    emit(result)
+            emit_queued_events(events)
+    emit({"event": "batch", "jobs": len(jobs), "failed": failed,
+          "seconds": round(time.perf_counter() - start, 3)})
+    return FAILURE if failed else SUCCESS
+
+
+def load_jobs(manifest_path):
+    """Read and normalize the jobs of a job manifest."""
+    with open(manifest_path, encoding="utf-8") as file:
+        manifest = json.load(file)
+    if isinstance(manifest, dict):
+        manifest = manifest.get("jobs", [])
+    base_directory = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    for number, job in enumerate(manifest, start=1):
+        jobs.append({
+            "name": job.get("name", "job{num}".format(num=number)),
+            "sources": [os.path.join(base_directory, source) for source in job.get("sources", [])],
+            "output": os.path.join(base_directory, job["output"]),
+            "backend": job.get("backend", binder_writers.DEFAULT_BACKEND),
+            "incremental": bool(job.get("incremental", False)),
+            "chunk_size": job.get("chunk_size"),
+        })
+    return jobs
+
+
+def find_csv_files(sources):
+    """Collect the CSV files of source folders and glob patterns."""
+    csv_file_paths = set()
+    for source in sources:
+        if os.path.isdir(source):
+            paths = [os.path.join(source, filename) for filename in os.listdir(source)]
+        else:
+            paths = glob.glob(source)
+        csv_file_paths.update(os.path.abspath(path) for path in paths if path.endswith(".csv"))
+    return sorted(csv_file_paths)
+
+
+def run_job(job, parse_workers, events):
+    """Bind the CSV files of one job, reporting progress to the event queue."""
+    start = time.perf_counter()
+    name = job["name"]
+
+    def progress(schedule_code, status):
+        events.put({"event": "sheet", "job": name, "sheet": schedule_code, "status": status,
+                    "seconds": round(time.perf_counter() - start, 3)})
+
+    try:
+        csv_file_paths = find_csv_files(job["sources"])
+        if not csv_file_paths:
+            raise IOError("No CSV files found in {sources}".format(sources=job["sources"]))
+        events.put({"event": "started", "job": name, "files": len(csv_file_paths), "output": job["output"]})
+        output_directory = os.path.dirname(job["output"])
+        if output_directory:
+            os.makedirs(output_directory, exist_ok=True)
+        with open(os.devnull, mode="w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            bind_schedules.bind_all_files(
+                csv_file_paths, job["output"], backend=job["backend"], workers=parse_workers,
+                incremental=job["incremental"], progress=progress, chunk_size=job["chunk_size"])
+    except Exception as ex:
+        return {"event": "finished", "job": name, "status": "failed", "error": repr(ex),
+                "traceback": traceback.format_exc(), "seconds": round(time.perf_counter() - start, 3)}
+    return {"event": "finished", "job": name, "status": "succeeded", "files": len(csv_file_paths),
+            "output": job["output"], "seconds": round(time.perf_counter() - start, 3)}
+
+
+def emit_queued_events(events):
+    """Emit all events the workers have queued so far."""
+    while True:
+        try:
+            emit(events.get_nowait())
+        except queue.Empty:
+            return
+
+
+def emit(event):
+    """Write one event as a JSON line to stdout."""
+    print(json.dumps(event, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    # Parse command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("manifest", help="JSON job manifest listing the source folders and output paths")
+    parser.add_argument(
+        "--job-workers", type=int, default=DEFAULT_JOB_WORKERS,
+        help="number of jobs binding in parallel")
+    parser.add_argument(
+        "--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS,
+        help="number of processes parsing CSV files within each job")
+    args = parser.parse_args()
+    # Run batch
+    result = main(args.manifest, job_workers=args.job_workers, parse_workers=args.parse_workers)
+    sys.exit(result)
@@ -1,69 +1,191 @@
 """Python script for binding a folder of csv output into a multisheet Excel workbook."""
 
 import argparse
-import csv
+import collections
+import concurrent.futures
+import itertools
 import os
 import os.path
 import sys
-import xlwings
+import zipfile
+import binder_manifest
+import binder_writers
+import schedule_table
 
 # Constants:
 SUCCESS = 0
 FAILURE = -1
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_MAX_IN_FLIGHT = 8  # sheets being parsed or waiting to be written
 
 
-def main(source_directory, output_filename):
+def main(source_directory, output_filename, backend=binder_writers.DEFAULT_BACKEND,
+         workers=DEFAULT_WORKERS, max_in_flight=DEFAULT_MAX_IN_FLIGHT, incremental=False,
+         chunk_size=None):
     """Main function running the binding logic of the script."""
     # Check if the given source directory exists
     if not os.path.exists(source_directory):
         print(f"✘ Error: The given path '{source_directory}' does not exist. ")
         return FAILURE
     print(f"Binding files from '{source_directory}'...")
-    # Create workbook
-    workbook = xlwings.Book()
-    # Read CSV files and write them to individual sheets of an Excel workbook
     # Get all files in the source directory and filter for CSV files
     file_paths = [os.path.join(source_directory, filename) for filename in os.listdir(source_directory)]
     csv_file_paths = [path for path in file_paths if path.endswith(".csv")]
-    for csv_file_path in reversed(csv_file_paths):
-        # Extract important parts of the path and filename
-        filename = os.path.basename(csv_file_path)
-        _, schedule_code, _ = filename.split("_")
-        # Read the CSV file into a python list of lists
-        print(f"Reading csv file '{filename}'... ", end="", flush=True)
-        title = ""
-        data = []
-        with open(csv_file_path, encoding="utf-16") as file:
-            reader = csv.reader(file)
-            for line, row in enumerate(reader):
-                if line == 0:  # title line
-                    title = "".join(row)
-                else:  # line > 0: data lines
-                    data.append(row)
-        # Write list date read from CSV file to the Excel workbook
-        print("✔ writing to Excel... ", end="", flush=True)
-        current_sheet = workbook.sheets.add(schedule_code)  # create and activate
-        current_sheet.range("A1").value = title
-        current_sheet.range("A2").value = data
-        # Format the sheet
-        print("✔ formatting... ", end="", flush=True)
-        current_sheet.cells.api.Font.Name = "Arial Narrow"
-        current_sheet.cells.api.Font.Size = 10
-        current_sheet.range("1:2").api.Font.Bold = True
-        current_sheet.autofit()
-        print("✔")
-    # Delete empty default
-    default_sheet = workbook.sheets["Sheet1"]
-    default_sheet.delete()
-    # Save workbook
+    # Read CSV files and write them to individual sheets of an Excel workbook
     binder_output_path = os.path.join(source_directory, output_filename)
-    print(f"Saving binder to '{binder_output_path}'... ", end="", flush=True)
-    workbook.save(binder_output_path)
-    workbook.close()
+    return bind_all_files(
+        csv_file_paths, binder_output_path, backend=backend,
+        workers=workers, max_in_flight=max_in_flight, incremental=incremental,
+        chunk_size=chunk_size)
+
+
+def bind_all_files(csv_file_paths, output_filename, backend=binder_writers.DEFAULT_BACKEND,
+                   workers=DEFAULT_WORKERS, max_in_flight=DEFAULT_MAX_IN_FLIGHT, incremental=False,
+                   progress=None, chunk_size=None):
+    """Bind CSV files into the sheets of one workbook, sorted by file name.
+
+    The CSV files are parsed by a pool of worker processes while this process
+    is the single writer, taking the parsed sheets in file name order.
+    In incremental mode a sidecar manifest is kept next to the workbook and
+    the sheets of unchanged CSV files are copied over from the previous
+    binder instead of being parsed and written again.
+    With a chunk size the CSV files are streamed into the sheets in blocks of
+    that many rows by the writing process itself, keeping memory bounded for
+    very large schedules. Schedules exceeding Excel's row limit are split
+    into continuation sheets 'CODE', 'CODE (2)', ... in either mode.
+    The optional progress callback is called with the schedule code and
+    either "written" or "reused" after each sheet.
+    The workbook is written to a temporary file replacing the binder only
+    once it is complete, so a failing run leaves the previous binder intact.
+    """
+    if incremental and backend != "xlsx":
+        raise ValueError("Incremental binding requires the 'xlsx' writer backend!")
+    csv_file_paths = sorted(csv_file_paths)
+    # Find the CSV files that changed since the previous binder was written
+    previous_entries = binder_manifest.load_manifest(output_filename) if incremental else {}
+    entries = {}  # schedule_code: manifest entry
+    unchanged_codes = set()
+    for csv_file_path in csv_file_paths:
+        schedule_code = get_schedule_code(os.path.basename(csv_file_path))
+        if incremental:
+            previous_entry = previous_entries.get(schedule_code)
+            entries[schedule_code] = binder_manifest.source_entry(csv_file_path, previous_entry)
+            if binder_manifest.is_unchanged(entries[schedule_code], previous_entry):
+                unchanged_codes.add(schedule_code)
+    changed_paths = [path for path in csv_file_paths
+                     if get_schedule_code(os.path.basename(path)) not in unchanged_codes]
+    # Write changed sheets from the parsing pipeline and copy the unchanged ones
+    # into a temporary workbook, which only replaces the binder once it is complete
+    write_path = binder_writers.temp_path(output_filename)
+    previous_package = zipfile.ZipFile(output_filename) if unchanged_codes else None
+    workbook = binder_writers.open_workbook(write_path, backend=backend)
+    schedules = read_schedules(
+        changed_paths, workers=workers, max_in_flight=max_in_flight, chunk_size=chunk_size)
+    closed = False
+    try:
+        for csv_file_path in csv_file_paths:
+            # Extract important parts of the path and filename
+            filename = os.path.basename(csv_file_path)
+            schedule_code = get_schedule_code(filename)
+            if schedule_code in unchanged_codes:
+                print(f"Reusing unchanged sheet of '{filename}'... ", end="", flush=True)
+                entries[schedule_code]["sheets"] = [
+                    [sheet_name, workbook.copy_sheet(sheet_name, previous_package, part_name)]
+                    for sheet_name, part_name in previous_entries[schedule_code]["sheets"]]
+                print("✔")
+                if progress:
+                    progress(schedule_code, "reused")
+                continue
+            _, title, header, row_blocks = next(schedules)
+            # Write the typed cells of the parsed CSV file into new sheets of the workbook
+            print(f"Writing csv file '{filename}' to Excel... ", end="", flush=True)
+            sheets = binder_writers.write_schedule(workbook, schedule_code, title, header, row_blocks)
+            if incremental:
+                entries[schedule_code]["sheets"] = [[name, sheet.part_name] for name, sheet in sheets]
+            print(f"✔ ({len(sheets)} sheets)" if len(sheets) > 1 else "✔")
+            if progress:
+                progress(schedule_code, "written")
+        # Save workbook
+        print(f"Saving binder to '{output_filename}'... ", end="", flush=True)
+        workbook.close()
+        closed = True
+        if previous_package:
+            previous_package.close()
+        # The old manifest must never describe the new binder, not even if this run stops right here
+        binder_manifest.remove_manifest(output_filename)
+        os.replace(write_path, output_filename)
+    finally:
+        schedules.close()
+        if not closed:
+            workbook.discard()
+        if previous_package:
+            previous_package.close()
+        if os.path.exists(write_path):  # the run failed, keep the previous binder
+            os.remove(write_path)
+    if incremental:
+        binder_manifest.save_manifest(output_filename, entries)
     print("✔")
+    if incremental:
+        print(f"  ➜ Rebuilt {len(changed_paths)} sheets, skipped {len(unchanged_codes)} unchanged sheets.")
+        for schedule_code in sorted(unchanged_codes):
+            print(f"  ➜ Skipped '{schedule_code}'")
     return SUCCESS
 
 
+def get_schedule_code(filename):
+    """Extract the schedule code from a 'Prefix_CODE_suffix.csv' file name."""
+    _, schedule_code, _ = filename.split("_")
+    return schedule_code
+
+
+def read_schedules(csv_file_paths, workers=DEFAULT_WORKERS, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                   chunk_size=None):
+    """Read schedule CSV files in file name order, yielding (path, title, header, row blocks).
+
+    With more than one worker the files are decoded and parsed into typed
+    schedule tables in parallel by a process pool. At most max_in_flight
+    tables are being parsed or held in memory at any time, including the one
+    currently handed to the caller. With a chunk size each file is instead
+    streamed lazily by this process, parsing one block of rows at a time.
+    """
+    ordered_paths = sorted(csv_file_paths)
+    if chunk_size:
+        for csv_file_path in ordered_paths:
+            yield (csv_file_path,) + chunked_schedule(csv_file_path, chunk_size)
+        return
+    if workers <= 1:
+        for csv_file_path in ordered_paths:
+            table = schedule_table.read_schedule_table(csv_file_path)
+            yield csv_file_path, table.title, table.header, table.row_blocks()
+        return
+    remaining_paths = iter(ordered_paths)
+    pending = collections.deque()  # (path, future) in file name order
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            for csv_file_path in itertools.islice(remaining_paths, max(max_in_flight, 1)):
+                pending.append((csv_file_path, executor.submit(schedule_table.read_schedule_table, csv_file_path)))
+            while pending:
+                csv_file_path, future = pending.popleft()
+                table = future.result()
+                yield csv_file_path, table.title, table.header, table.row_blocks()
+                del table  # release the written sheet before parsing the next one
+                for next_path in itertools.islice(remaining_paths, 1):
+                    pending.append((next_path, executor.submit(schedule_table.read_schedule_table, next_path)))
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def chunked_schedule(csv_file_path, chunk_size):
+    """Title, header and lazily parsed row blocks of a schedule CSV file.
+
+    Column types and units are inferred from the first block and kept for
+    all further blocks, cells not fitting them are written as text.
+    """
+    first_table, row_blocks = schedule_table.read_schedule_chunks(csv_file_path, chunk_size)
+    return first_table.title, first_table.header, row_blocks
+
+
 if __name__ == "__main__":
     # Parse command line arguments
     parser = argparse.ArgumentParser()
@@ -73,9 +195,29 @@ if __name__ == "__main__":
     parser.add_argument(
         "output_filename", default="binder.xlsx", nargs="?",
         help="name of the Excel output file to write. By default it will be saved in the source directory")
+    parser.add_argument(
+        "--backend", default=binder_writers.DEFAULT_BACKEND, choices=sorted(binder_writers.BACKENDS),
+        help="workbook writer to use, 'xlwings' requires a local Excel installation")
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help="number of processes parsing CSV files in parallel, 1 reads them sequentially")
+    parser.add_argument(
+        "--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+        help="maximum number of parsed sheets held in memory while waiting to be written")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="only rebuild sheets whose CSV file changed since the previous binder (xlsx backend only)")
+    parser.add_argument(
+        "--chunk-size", type=int, default=None,
+        help="stream each CSV file into its sheet in blocks of this many rows to bound memory")
     args = parser.parse_args()
     # Run main script
     result = main(
         source_directory=os.path.abspath(args.source_directory),
-        output_filename=args.output_filename)
+        output_filename=args.output_filename,
+        backend=args.backend,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        incremental=args.incremental,
+        chunk_size=args.chunk_size)
     sys.exit(result)
@@ -1,12 +1,11 @@
 """Python script for binding a folder of csv output into a multisheet Excel workbook."""
 
-import csv
 import os
 import os.path
 import sys
 import tkinter as tk
 import tkinter.filedialog as tkfiledialog
-import xlwings
+from bind_schedules import bind_all_files
 
 # Constants:
 SUCCESS = 0
@@ -97,47 +96,6 @@ def get_all_csv_files_in_folder(source_directory):
     return csv_file_paths
 
 
-def bind_all_files(csv_file_paths, output_filename):
-    """Main function running the binding logic of the script."""
-    workbook = xlwings.Book()
-    for csv_file_path in reversed(sorted(csv_file_paths)):
-        # Extract important parts of the path and filename
-        filename = os.path.basename(csv_file_path)
-        _, schedule_code, _ = filename.split("_")
-        # Read the CSV file into a python list of lists
-        print(f"Reading csv file '{filename}'... ", end="", flush=True)
-        title, data = "", []
-        with open(csv_file_path, encoding="utf-16") as file:
-            reader = csv.reader(file)
-            for line, row in enumerate(reader):
-                if line == 0:  # title line
-                    title = "".join(row)
-                else:  # line > 0: data lines
-                    data.append(row)
-        # Write list data read from the CSV file to the Excel workbook
-        print("✔ writing to Excel... ", end="", flush=True)
-        current_sheet = workbook.sheets.add(schedule_code)  # create and activate
-        current_sheet.range("A1").value = title
-        current_sheet.range("A2").value = data
-        # Format the sheet
-        print("✔ formatting... ", end="", flush=True)
-        current_sheet.cells.api.Font.Name = "Arial Narrow"
-        current_sheet.cells.api.Font.Size = 10
-        current_sheet.range("1:2").api.Font.Bold = True
-        current_sheet.autofit()
-        print("✔")
-    # Delete empty default sheet
-    default_sheet = workbook.sheets["Sheet1"]
-    default_sheet.delete()
-    # Save workbook
-    #binder_output_path = os.path.join(source_directory, output_filename)
-    print(f"Saving binder to '{output_filename}'... ", end="", flush=True)
-    workbook.save(output_filename)
-    workbook.close()
-    print("✔")
-    return SUCCESS
-
-
 if __name__ == "__main__":
     root = tk.Tk()
     root.title("CSV-Binder")
@@ -0,0 +1,84 @@
+"""Sidecar manifest of the schedule CSV files a binder workbook was built from.
+
+The manifest maps each schedule code to the size, modification time and
+content hash of its source file and to the sheets and sheet parts it was
+written to, so an incremental run can tell which sheets have to be rebuilt.
+"""
+
+import hashlib
+import json
+import os
+import os.path
+
+# Constants:
+MANIFEST_VERSION = 3  # bumped when the sheet contents change for the same source
+MANIFEST_SUFFIX = ".manifest.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def manifest_path(output_path):
+    """Path of the sidecar manifest belonging to a binder workbook."""
+    return output_path + MANIFEST_SUFFIX
+
+
+def load_manifest(output_path):
+    """Load the schedule entries of a binder's manifest.
+
+    An empty mapping is returned if there is no usable previous binder.
+    """
+    path = manifest_path(output_path)
+    if not (os.path.exists(path) and os.path.exists(output_path)):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("schedules", {})
+
+
+def save_manifest(output_path, schedules):
+    """Write the schedule entries of a binder's manifest."""
+    manifest = {"version": MANIFEST_VERSION, "schedules": schedules}
+    with open(manifest_path(output_path), mode="w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+
+
+def remove_manifest(output_path):
+    """Delete the manifest of a binder if there is one, e.g. before the binder is replaced."""
+    path = manifest_path(output_path)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def source_entry(csv_file_path, previous_entry=None):
+    """Describe a source file, reusing the previous hash if size and mtime match."""
+    stat = os.stat(csv_file_path)
+    entry = {
+        "file": os.path.basename(csv_file_path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+    }
+    if previous_entry and all(previous_entry.get(key) == entry[key] for key in ("file", "size", "mtime")):
+        entry["sha1"] = previous_entry["sha1"]
+    else:
+        entry["sha1"] = file_hash(csv_file_path)
+    return entry
+
+
+def is_unchanged(entry, previous_entry):
+    """Check if a source file still has the content it had for the previous binder."""
+    if not previous_entry or "sheets" not in previous_entry:
+        return False
+    return all(previous_entry.get(key) == entry[key] for key in ("file", "size", "sha1"))
+
+
+def file_hash(path):
+    """SHA-1 hex digest of a file's content."""
+    digest = hashlib.sha1()
+    with open(path, mode="rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
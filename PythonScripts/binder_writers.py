@@ -0,0 +1,185 @@
+"""Workbook writer backends for binding schedule CSV files into Excel workbooks.
+
+Every backend provides the same small interface: a workbook with add_sheet(),
+close() and discard(), and sheets with write_title(), write_rows() and format(). The
+native "xlsx" backend works without Excel, the "xlwings" backend remotes a
+live Excel instance and is only available where xlwings is installed.
+The native backend also runs on IronPython 2.7 inside Revit.
+"""
+
+import os
+import os.path
+import xlsx_writer
+
+# Constants:
+FONT_NAME = "Arial Narrow"
+FONT_SIZE = 10
+HEADER_ROWS = 2  # bold title and column header rows, repeated on continuation sheets
+MAX_DATA_ROWS = xlsx_writer.MAX_ROWS - HEADER_ROWS  # data rows per sheet
+DEFAULT_BACKEND = "xlsx"
+
+
+class XlsxWorkbook(object):
+    """Native streaming XLSX backend."""
+
+    def __init__(self, output_path):
+        """Initializer."""
+        self.writer = xlsx_writer.XlsxWriter(output_path, font_name=FONT_NAME, font_size=FONT_SIZE)
+
+    def add_sheet(self, name):
+        """Append a new sheet to the end of the workbook."""
+        return XlsxSheet(self.writer.add_sheet(name))
+
+    def copy_sheet(self, name, source_package, source_part_name):
+        """Append a sheet copied unchanged from a previously written binder package."""
+        return self.writer.copy_sheet(name, source_package, source_part_name)
+
+    def close(self):
+        """Save and close the workbook."""
+        self.writer.close()
+
+    def discard(self):
+        """Close the workbook without finishing it, e.g. after an error."""
+        self.writer.discard()
+
+
+class XlsxSheet(object):
+    """Sheet of the native streaming XLSX backend."""
+
+    def __init__(self, sheet_writer):
+        """Initializer."""
+        self.sheet_writer = sheet_writer
+        self.part_name = sheet_writer.part_name
+
+    def write_title(self, title):
+        """Write the schedule title to the first row."""
+        self.sheet_writer.write_row([title], bold=True, measure=False)
+
+    def write_rows(self, rows):
+        """Write rows below the previously written ones, streaming them row by row."""
+        for row in rows:
+            bold = self.sheet_writer.row_count < HEADER_ROWS
+            self.sheet_writer.write_row(row, bold=bold)
+
+    def format(self):
+        """Finish the sheet, fonts and column widths were handled while writing."""
+        self.sheet_writer.close()
+
+
+class XlwingsWorkbook(object):
+    """Backend remoting a live Excel instance through xlwings."""
+
+    def __init__(self, output_path):
+        """Initializer."""
+        import xlwings  # optional dependency, only needed for this backend
+        self.output_path = output_path
+        self.book = xlwings.Book()
+        self.default_sheet_names = [sheet.name for sheet in self.book.sheets]
+
+    def add_sheet(self, name):
+        """Append a new sheet to the end of the workbook."""
+        last_sheet = self.book.sheets[len(self.book.sheets) - 1]
+        return XlwingsSheet(self.book.sheets.add(name, after=last_sheet))
+
+    def close(self):
+        """Delete the empty default sheets, save and close the workbook."""
+        for name in self.default_sheet_names:
+            self.book.sheets[name].delete()
+        self.book.save(self.output_path)
+        self.book.close()
+
+    def discard(self):
+        """Close the workbook without saving it, e.g. after an error."""
+        self.book.close()
+
+
+class XlwingsSheet(object):
+    """Sheet of the xlwings backend."""
+
+    def __init__(self, sheet):
+        """Initializer."""
+        self.sheet = sheet
+        self.next_row = 1
+
+    def write_title(self, title):
+        """Write the schedule title to the first row."""
+        self.sheet.range("A1").value = title
+        self.next_row = 2
+
+    def write_rows(self, rows):
+        """Write a block of rows below the previously written ones in a single COM call."""
+        data = [list(row) for row in rows]
+        if data:
+            self.sheet.range("A{row}".format(row=self.next_row)).value = data
+            self.next_row += len(data)
+
+    def format(self):
+        """Set the sheet font, embolden the header rows and autofit the columns."""
+        self.sheet.cells.api.Font.Name = FONT_NAME
+        self.sheet.cells.api.Font.Size = FONT_SIZE
+        self.sheet.range("1:{num}".format(num=HEADER_ROWS)).api.Font.Bold = True
+        self.sheet.autofit()
+
+
+BACKENDS = {
+    "xlsx": XlsxWorkbook,
+    "xlwings": XlwingsWorkbook,
+}
+
+
+def open_workbook(output_path, backend=DEFAULT_BACKEND):
+    """Create a new workbook using the named writer backend."""
+    if backend not in BACKENDS:
+        raise ValueError("Unknown writer backend '{name}', choose one of: {names}".format(
+            name=backend, names=", ".join(sorted(BACKENDS))))
+    return BACKENDS[backend](output_path)
+
+
+def temp_path(output_path):
+    """Path to write a workbook to before it replaces the one at output_path, keeping the extension."""
+    root, extension = os.path.splitext(output_path)
+    return root + ".tmp" + extension
+
+
+def replace_file(source_path, target_path):
+    """Move a file over another one, also on Pythons without os.replace (IronPython 2.7)."""
+    if hasattr(os, "replace"):
+        os.replace(source_path, target_path)
+        return
+    if os.path.exists(target_path):
+        os.remove(target_path)
+    os.rename(source_path, target_path)
+
+
+def write_schedule(workbook, schedule_code, title, header, row_blocks, max_data_rows=MAX_DATA_ROWS):
+    """Write blocks of data rows to a sheet, continuing on further sheets when it is full.
+
+    Every sheet starts with the title and header rows. Returns a list of
+    (sheet name, sheet) pairs.
+    """
+    sheets = []
+
+    def start_sheet():
+        name = schedule_code if not sheets else "{code} ({num})".format(code=schedule_code, num=len(sheets) + 1)
+        sheet = workbook.add_sheet(name)
+        sheet.write_title(title)
+        sheet.write_rows([header])
+        sheets.append((name, sheet))
+        return sheet
+
+    current_sheet, free_rows = None, 0
+    for block in row_blocks:
+        position = 0
+        while position < len(block):
+            if free_rows == 0:  # current sheet is full
+                if current_sheet is not None:
+                    current_sheet.format()
+                current_sheet, free_rows = start_sheet(), max_data_rows
+            rows = block[position:position + free_rows]
+            current_sheet.write_rows(rows)
+            free_rows -= len(rows)
+            position += len(rows)
+    if current_sheet is None:  # schedule without data rows
+        current_sheet = start_sheet()
+    current_sheet.format()
+    return sheets
@@ -0,0 +1,114 @@
+"""Direct schedule to workbook pipeline without the CSV round trip.
+
+Schedule sources hand their table data straight to the binder's writer: a
+source has a schedules() method yielding (name, title, header, rows) for
+every schedule, where rows is an iterable of lists of cell texts. The texts
+are parsed into typed cells block by block, exactly like CSV exports, with
+the column types and units of the first block.
+
+ViewScheduleSource adapts Revit ViewSchedule objects through their table
+data and cell texts. It only uses duck typing, so the pipeline can be run
+outside of Revit with any object offering the same members. The module runs
+on Python 3 as well as on IronPython 2.7 inside Revit.
+"""
+
+import os.path
+import binder_writers
+import schedule_table
+
+# Constants:
+DEFAULT_BLOCK_SIZE = 4096  # rows parsed and written at once
+
+
+class ViewScheduleSource(object):
+    """Schedule source reading Revit ViewSchedule table data."""
+
+    def __init__(self, schedules, header_section, body_section):
+        """Initializer.
+
+        header_section and body_section are the section types of the table
+        title and body, i.e. Autodesk.Revit.DB.SectionType.Header and .Body
+        when called from within Revit. The first body row holds the column
+        headings, all further rows are data rows.
+        """
+        self.view_schedules = schedules
+        self.header_section = header_section
+        self.body_section = body_section
+
+    def schedules(self):
+        """Yield (name, title, header, rows) for every schedule."""
+        for schedule in self.view_schedules:
+            rows = self.body_rows(schedule)
+            header = next(rows, [])
+            yield schedule.Name, self.title(schedule), header, rows
+
+    def title(self, schedule):
+        """Title text of a schedule, falling back to its name."""
+        table_data = schedule.GetTableData()
+        title_section = table_data.GetSectionData(self.header_section)
+        if title_section is not None and title_section.NumberOfRows and title_section.NumberOfColumns:
+            title = schedule.GetCellText(self.header_section, 0, 0)
+            if title:
+                return title
+        return schedule.Name
+
+    def body_rows(self, schedule):
+        """Lazily read the cell texts of a schedule's table body row by row."""
+        body = schedule.GetTableData().GetSectionData(self.body_section)
+        columns = range(body.NumberOfColumns)
+        for row in range(body.NumberOfRows):
+            yield [schedule.GetCellText(self.body_section, row, column) for column in columns]
+
+
+class StaticScheduleSource(object):
+    """Schedule source serving in-memory schedules, e.g. for tests."""
+
+    def __init__(self, schedules):
+        """Initializer, schedules is a list of (name, title, header, rows)."""
+        self.static_schedules = schedules
+
+    def schedules(self):
+        """Yield (name, title, header, rows) for every schedule."""
+        for name, title, header, rows in self.static_schedules:
+            yield name, title, header, iter(rows)
+
+
+def bind_schedule_source(source, output_path, backend=binder_writers.DEFAULT_BACKEND,
+                         block_size=DEFAULT_BLOCK_SIZE, progress=None):
+    """Write all schedules of a source into the sheets of one workbook.
+
+    Sheets are named by the schedule code of 'Prefix_CODE_suffix' schedule
+    names and appended in the order of the source. The optional progress
+    callback is called with the schedule code after each schedule.
+    The workbook replaces the one at output_path only once it is complete.
+    Returns the list of sheet names written.
+    """
+    write_path = binder_writers.temp_path(output_path)
+    workbook = binder_writers.open_workbook(write_path, backend=backend)
+    sheet_names = []
+    closed = False
+    try:
+        for name, title, header, rows in source.schedules():
+            code = schedule_code(name)
+            first_table, row_blocks = schedule_table.parse_row_blocks(title, header, iter(rows), block_size)
+            sheets = binder_writers.write_schedule(workbook, code, title, first_table.header, row_blocks)
+            sheet_names.extend(sheet_name for sheet_name, _ in sheets)
+            if progress:
+                progress(code)
+        workbook.close()
+        closed = True
+        binder_writers.replace_file(write_path, output_path)
+    finally:
+        if not closed:
+            workbook.discard()
+        if os.path.exists(write_path):  # the run failed, keep the previous workbook
+            os.remove(write_path)
+    return sheet_names
+
+
+def schedule_code(name):
+    """Schedule code of a 'Prefix_CODE_suffix' schedule name, the name itself otherwise."""
+    parts = name.split("_")
+    if len(parts) == 3:
+        return parts[1]
+    return name
@@ -0,0 +1,326 @@
+"""Typed, columnar tables parsed from Revit schedule CSV exports.
+
+Every column of a schedule is stored in one compact buffer: a NumPy array if
+NumPy is installed, an array.array otherwise. Column types are inferred from
+the cell texts. Numbers may carry a unit suffix (e.g. "12.5 m" or "300 m³/h")
+as long as all cells of the column share the same unit; such quantity columns
+keep the unit separately and show it in their title. Blank cells of numeric
+columns are stored as 0 and flagged in a blank mask.
+Decimal commas are accepted, but a column where any value could be read as
+thousands grouping (e.g. "1,234") or which mixes decimal points and commas is
+ambiguous and kept as text.
+
+The module runs on Python 3 as well as on IronPython 2.7 inside Revit.
+The tables can be used on their own to aggregate quantities without
+re-parsing the CSV files:
+
+    table = read_schedule_table("Qty_PIPES_2019.csv")
+    table.column("Length").total()
+    table.group_totals("System Type", "Length")
+"""
+
+import array
+import collections
+import csv
+import io
+import itertools
+import re
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, fall back to array.array buffers
+    numpy = None
+
+# Constants:
+TEXT = "text"
+INTEGER = "int"
+FLOAT = "float"
+BLANK = "blank"  # column without any content
+NUMERIC_KINDS = (INTEGER, FLOAT)
+ROW_BLOCK_SIZE = 4096  # rows materialized at once when iterating a table
+NUMBER_PATTERN = re.compile(
+    r"^(?P<number>[-+]?(?:0|[1-9]\d*)(?:[.,]\d+)?)"  # no leading zeros, those are codes
+    r"(?:\s*(?P<unit>[^\d\s.,+-]\S{0,15}))?$")  # optional unit suffix like m, m², m³/h, %
+INTEGER_PATTERN = re.compile(r"^[-+]?\d+$")
+GROUPING_PATTERN = re.compile(r"^[-+]?[1-9]\d{0,2},\d{3}$")  # like 1,234 which might be grouped thousands
+try:
+    INTEGER_TYPECODE = array.array("q").typecode
+except ValueError:  # no 64 bit integer arrays on older Pythons
+    INTEGER_TYPECODE = "l"
+INTEGER_LIMIT = 2 ** 63 if numpy is not None else 2 ** (8 * array.array(INTEGER_TYPECODE).itemsize - 1)
+
+
+class Column(object):
+    """A named, typed column of a schedule table."""
+
+    def __init__(self, name, kind, values, blanks=None, unit="", separator=None):
+        """Initializer."""
+        self.name = name
+        self.kind = kind
+        self.values = values  # numpy/array.array buffer for numbers, list for texts
+        self.blanks = blanks  # blank mask of numeric columns, None if there are no blanks
+        self.unit = unit
+        self.separator = separator  # decimal separator of the cell texts, None if no cell has one
+
+    def __len__(self):
+        """Number of cells in the column."""
+        return len(self.values)
+
+    def __getitem__(self, index):
+        """Cell value at an index, None for blank cells of numeric columns."""
+        if self.blanks is not None and self.blanks[index]:
+            return None
+        value = self.values[index]
+        return value.item() if hasattr(value, "item") else value
+
+    @property
+    def title(self):
+        """Column header including the unit of quantity columns."""
+        if self.unit:
+            return "{name} [{unit}]".format(name=self.name, unit=self.unit)
+        return self.name
+
+    @property
+    def is_numeric(self):
+        """Check if the column holds numbers."""
+        return self.kind in NUMERIC_KINDS
+
+    def to_list(self, start=0, stop=None):
+        """Cell values of a slice of the column as plain Python objects."""
+        values = self.values[start:stop]
+        values = values.tolist() if hasattr(values, "tolist") else list(values)
+        if self.blanks is not None:
+            blanks = self.blanks[start:stop]
+            values = [None if blank else value for value, blank in zip(values, blanks)]
+        return values
+
+    def total(self):
+        """Sum of a numeric column, blank cells count as 0."""
+        if not self.is_numeric:
+            raise TypeError("Column '{name}' of kind '{kind}' cannot be summed!".format(
+                name=self.name, kind=self.kind))
+        if numpy is not None:
+            return self.values.sum().item()
+        return sum(self.values)
+
+
+class ScheduleTable(object):
+    """Columnar representation of one schedule: title, header and typed columns."""
+
+    def __init__(self, title, columns):
+        """Initializer."""
+        self.title = title
+        self.columns = columns
+
+    def __len__(self):
+        """Number of data rows (excluding the header)."""
+        return len(self.columns[0]) if self.columns else 0
+
+    @property
+    def header(self):
+        """Column titles including the units of quantity columns."""
+        return [column.title for column in self.columns]
+
+    def column(self, name):
+        """Get a column by its name (or its title including the unit)."""
+        for column in self.columns:
+            if name in (column.name, column.title):
+                return column
+        raise KeyError("Schedule '{title}' has no column '{name}'!".format(title=self.title, name=name))
+
+    def rows(self, include_header=False):
+        """Iterate the table row by row, numbers as int/float and blanks as None."""
+        if include_header:
+            yield self.header
+        for block in self.row_blocks():
+            for row in block:
+                yield row
+
+    def row_blocks(self, block_size=ROW_BLOCK_SIZE):
+        """Iterate the table in lists of at most block_size rows."""
+        for start in range(0, len(self), block_size):
+            stop = start + block_size
+            yield [list(row) for row in zip(*[column.to_list(start, stop) for column in self.columns])]
+
+    def group_totals(self, key_name, value_name):
+        """Sum a numeric column grouped by the values of another column."""
+        keys = self.column(key_name).to_list()
+        values = self.column(value_name)
+        if not values.is_numeric:
+            raise TypeError("Column '{name}' of kind '{kind}' cannot be summed!".format(
+                name=values.name, kind=values.kind))
+        totals = collections.OrderedDict()
+        for key, value in zip(keys, values.to_list()):
+            totals[key] = totals.get(key, 0) + (value or 0)
+        return totals
+
+
+def read_schedule_table(csv_file_path):
+    """Read a UTF-16 schedule CSV file into a typed, columnar table."""
+    rows = read_csv_rows(csv_file_path)
+    title = "".join(next(rows, []))
+    header = next(rows, [])
+    return parse_table(title, header, rows)
+
+
+def read_schedule_chunks(csv_file_path, chunk_size):
+    """Read a UTF-16 schedule CSV file in blocks of at most chunk_size typed rows.
+
+    Returns the table of the first block and an iterator of all row blocks,
+    see parse_row_blocks.
+    """
+    rows = read_csv_rows(csv_file_path)
+    title = "".join(next(rows, []))
+    header = next(rows, [])
+    return parse_row_blocks(title, header, rows, chunk_size)
+
+
+def read_csv_rows(csv_file_path):
+    """Lazily read the rows of a UTF-16 encoded schedule CSV file.
+
+    The first row yielded is the title line, all further rows are data lines.
+    """
+    with io.open(csv_file_path, encoding="utf-16", newline="") as file:
+        for row in csv.reader(file):
+            yield row
+
+
+def parse_table(title, header, rows):
+    """Build a typed table from a header and the string cells of the data rows.
+
+    Short rows are padded with blank cells.
+    """
+    cells = [[] for _ in header]
+    for row_number, row in enumerate(rows):
+        while len(cells) < len(row):  # more cells than header titles
+            cells.append([""] * row_number)
+        for column_cells, cell in zip(cells, row):
+            column_cells.append(cell)
+        for column_cells in cells[len(row):]:
+            column_cells.append("")
+    names = list(header) + [""] * (len(cells) - len(header))
+    columns = []
+    for index in range(len(cells)):
+        columns.append(parse_column(names[index], cells[index]))
+        cells[index] = None  # release the strings as soon as the column is parsed
+    return ScheduleTable(title, columns)
+
+
+def parse_row_blocks(title, header, rows, block_size):
+    """Lazily parse rows of cell strings into blocks of at most block_size typed rows.
+
+    Column kinds, units and decimal separators are inferred from the first
+    block only, so the header of the first block's table holds for all
+    blocks. Cells of later blocks that do not fit their column (e.g. another
+    unit or a code with leading zeros in a number column) keep their text.
+    Returns the table of the first block and an iterator of all row blocks.
+    """
+    first_table = parse_table(title, header, itertools.islice(rows, block_size))
+
+    def row_blocks():
+        yield list(first_table.rows())
+        while True:
+            block = list(itertools.islice(rows, block_size))
+            if not block:
+                return
+            yield [conform_row(first_table.columns, row) for row in block]
+
+    return first_table, row_blocks()
+
+
+def conform_row(columns, row):
+    """Typed cells of a row of cell strings parsed like the given columns."""
+    cells = list(row) + [""] * (len(columns) - len(row))
+    return [conform_cell(columns[index], cell) if index < len(columns) else cell
+            for index, cell in enumerate(cells)]
+
+
+def conform_cell(column, cell):
+    """Typed value of a cell string fitting a column, the cell string itself otherwise."""
+    if not column.is_numeric:
+        return cell
+    text = cell.strip()
+    if not text:
+        return None
+    match = NUMBER_PATTERN.match(text)
+    if match is None or (match.group("unit") or "") != column.unit:
+        return cell
+    number = match.group("number")
+    cell_separator = number_separator(number)
+    if cell_separator is not None:
+        if cell_separator != (column.separator or ".") or GROUPING_PATTERN.match(number):
+            return cell
+        number = number.replace(",", ".")
+    if column.kind == INTEGER and INTEGER_PATTERN.match(number) and -INTEGER_LIMIT <= int(number) < INTEGER_LIMIT:
+        return int(number)
+    return float(number)
+
+
+def parse_column(name, cells):
+    """Infer the type of a column of cell strings and store it in a typed buffer."""
+    numbers = []
+    blanks = bytearray(len(cells))
+    unit = None
+    separator = None
+    is_integer = True
+    for index, cell in enumerate(cells):
+        cell = cell.strip()
+        if not cell:
+            blanks[index] = 1
+            numbers.append("0")
+            continue
+        match = NUMBER_PATTERN.match(cell)
+        if match is None:
+            return Column(name, TEXT, list(cells))
+        cell_unit = match.group("unit") or ""
+        if unit is None:
+            unit = cell_unit
+        elif unit != cell_unit:  # mixed units are no quantity
+            return Column(name, TEXT, list(cells))
+        number = match.group("number")
+        cell_separator = number_separator(number)
+        if cell_separator is not None:
+            if separator is None:
+                separator = cell_separator
+            elif separator != cell_separator:  # mixed decimal points and commas are ambiguous
+                return Column(name, TEXT, list(cells))
+            if GROUPING_PATTERN.match(number):  # thousands grouping or a decimal comma?
+                return Column(name, TEXT, list(cells))
+            number = number.replace(",", ".")  # allow decimal commas
+        if is_integer and not INTEGER_PATTERN.match(number):
+            is_integer = False
+        numbers.append(number)
+    if unit is None:  # all cells are blank
+        return Column(name, BLANK, list(cells))
+    integers = [int(number) for number in numbers] if is_integer else []
+    if integers and -INTEGER_LIMIT <= min(integers) and max(integers) < INTEGER_LIMIT:
+        values = numeric_buffer(INTEGER, integers)
+        kind = INTEGER
+    else:
+        values = numeric_buffer(FLOAT, [float(number) for number in numbers])
+        kind = FLOAT
+    return Column(name, kind, values, blanks=blank_mask(blanks), unit=unit, separator=separator)
+
+
+def number_separator(number):
+    """Decimal separator of a number text matched by NUMBER_PATTERN, None if it has none."""
+    for separator in ".,":
+        if separator in number:
+            return separator
+    return None
+
+
+def numeric_buffer(kind, numbers):
+    """Compact buffer for a list of numbers of the given kind."""
+    if numpy is not None:
+        return numpy.array(numbers, dtype=numpy.int64 if kind == INTEGER else numpy.float64)
+    return array.array(INTEGER_TYPECODE if kind == INTEGER else "d", numbers)
+
+
+def blank_mask(blanks):
+    """Compact blank mask, None if no cell is blank."""
+    if not any(blanks):
+        return None
+    if numpy is not None:
+        return numpy.frombuffer(bytes(blanks), dtype=numpy.bool_)
+    return blanks
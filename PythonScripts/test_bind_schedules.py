@@ -0,0 +1,66 @@
+"""Tests of binding schedule CSV files into a workbook."""
+
+import io
+import os
+import pytest
+import bind_schedules
+
+
+def write_csv(folder, code, rows):
+    """Write a UTF-16 schedule CSV file 'Qty_CODE_2019.csv' with a title line."""
+    with io.open(os.path.join(folder, "Qty_{0}_2019.csv".format(code)), "w", encoding="utf-16", newline="") as file:
+        file.write(u'"{0}"\r\n'.format(code))
+        for row in rows:
+            file.write(u",".join('"{0}"'.format(cell) for cell in row) + u"\r\n")
+
+
+def write_broken_csv(folder, code):
+    """Write a CSV file that cannot be decoded as UTF-16."""
+    with open(os.path.join(folder, "Qty_{0}_2019.csv".format(code)), "wb") as file:
+        file.write(b"\xff\xfe\x00\xd8")
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_failing_run_keeps_previous_binder(tmp_path, incremental):
+    folder = str(tmp_path)
+    write_csv(folder, "DUCTS", [["Length"], ["1 m"]])
+    write_csv(folder, "PIPES", [["Length"], ["2 m"]])
+    assert bind_schedules.main(folder, "binder.xlsx", workers=1, incremental=incremental) == bind_schedules.SUCCESS
+    binder_path = os.path.join(folder, "binder.xlsx")
+    with open(binder_path, "rb") as binder:
+        previous_binder = binder.read()
+    write_csv(folder, "DUCTS", [["Length"], ["3 m"]])
+    write_broken_csv(folder, "PIPES")
+    with pytest.raises(UnicodeDecodeError):
+        bind_schedules.main(folder, "binder.xlsx", workers=1, incremental=incremental)
+    with open(binder_path, "rb") as binder:
+        assert binder.read() == previous_binder
+    assert sorted(os.listdir(folder)) == sorted(
+        ["Qty_DUCTS_2019.csv", "Qty_PIPES_2019.csv", "binder.xlsx"]
+        + (["binder.xlsx.manifest.json"] if incremental else []))
+
+
+def test_incremental_run_after_failed_run(tmp_path):
+    folder = str(tmp_path)
+    write_csv(folder, "DUCTS", [["Length"], ["1 m"]])
+    write_csv(folder, "PIPES", [["Length"], ["2 m"]])
+    write_csv(folder, "WALLS", [["Area"], ["3 m²"]])
+    bind_schedules.main(folder, "binder.xlsx", workers=1, incremental=True)
+    write_broken_csv(folder, "DUCTS")
+    with pytest.raises(UnicodeDecodeError):
+        bind_schedules.main(folder, "binder.xlsx", workers=1, incremental=True)
+    write_csv(folder, "DUCTS", [["Length"], ["4 m"]])
+    reused = []
+    bind_schedules.bind_all_files(
+        [os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(".csv")],
+        os.path.join(folder, "binder.xlsx"), workers=1, incremental=True,
+        progress=lambda code, action: action == "reused" and reused.append(code))
+    assert reused == ["PIPES", "WALLS"]
+
+
+def test_non_incremental_run_drops_manifest(tmp_path):
+    folder = str(tmp_path)
+    write_csv(folder, "PIPES", [["Length"], ["2 m"]])
+    bind_schedules.main(folder, "binder.xlsx", workers=1, incremental=True)
+    bind_schedules.main(folder, "binder.xlsx", workers=1)
+    assert not os.path.exists(os.path.join(folder, "binder.xlsx.manifest.json"))
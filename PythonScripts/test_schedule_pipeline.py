@@ -0,0 +1,89 @@
+"""Tests of the direct schedule to workbook pipeline."""
+
+import os
+import zipfile
+import pytest
+import schedule_pipeline
+
+HEADER = "header"
+BODY = "body"
+
+
+class FakeSection(object):
+    """Section data of a fake schedule table."""
+
+    def __init__(self, cells):
+        self.NumberOfRows = len(cells)
+        self.NumberOfColumns = len(cells[0]) if cells else 0
+
+
+class FakeTableData(object):
+    """Table data of a fake schedule."""
+
+    def __init__(self, sections):
+        self.sections = sections
+
+    def GetSectionData(self, section_type):
+        return FakeSection(self.sections[section_type])
+
+
+class FakeViewSchedule(object):
+    """Object offering the ViewSchedule members used by ViewScheduleSource."""
+
+    def __init__(self, name, title_cells, body_cells):
+        self.Name = name
+        self.sections = {HEADER: title_cells, BODY: body_cells}
+
+    def GetTableData(self):
+        return FakeTableData(self.sections)
+
+    def GetCellText(self, section_type, row, column):
+        return self.sections[section_type][row][column]
+
+
+def test_view_schedule_source_reads_title_header_and_rows():
+    schedule = FakeViewSchedule("Qty_PIPES_2019", [["Pipes"]], [["Type", "Length"], ["A", "1 m"], ["B", "2 m"]])
+    source = schedule_pipeline.ViewScheduleSource([schedule], HEADER, BODY)
+    [(name, title, header, rows)] = list(source.schedules())
+    assert (name, title, header) == ("Qty_PIPES_2019", "Pipes", ["Type", "Length"])
+    assert list(rows) == [["A", "1 m"], ["B", "2 m"]]
+
+
+def test_view_schedule_source_falls_back_to_name():
+    schedule = FakeViewSchedule("Qty_DUCTS_2019", [], [["Length"]])
+    source = schedule_pipeline.ViewScheduleSource([schedule], HEADER, BODY)
+    [(_, title, header, rows)] = list(source.schedules())
+    assert title == "Qty_DUCTS_2019"
+    assert header == ["Length"] and list(rows) == []
+
+
+def test_bind_view_schedules(tmp_path):
+    schedules = [
+        FakeViewSchedule("Qty_PIPES_2019", [["Pipes"]], [["Length"], ["1 m"], ["2 m"]]),
+        FakeViewSchedule("Qty_DUCTS_2019", [["Ducts"]], [["Area"], ["3 m²"]]),
+    ]
+    output_path = str(tmp_path / "binder.xlsx")
+    sheet_names = schedule_pipeline.bind_schedule_source(
+        schedule_pipeline.ViewScheduleSource(schedules, HEADER, BODY), output_path, backend="xlsx")
+    assert sheet_names == ["PIPES", "DUCTS"]
+    with zipfile.ZipFile(output_path) as package:
+        assert "<t>Area [m²]</t>" in package.read("xl/worksheets/sheet2.xml").decode("utf-8")
+
+
+def test_failing_source_keeps_previous_workbook(tmp_path):
+    output_path = str(tmp_path / "binder.xlsx")
+    schedule_pipeline.bind_schedule_source(
+        schedule_pipeline.StaticScheduleSource([("Qty_PIPES_2019", "Pipes", ["Length"], [["1 m"]])]), output_path)
+    with open(output_path, "rb") as workbook:
+        previous_workbook = workbook.read()
+
+    class FailingSource(object):
+        def schedules(self):
+            yield "Qty_PIPES_2019", "Pipes", ["Length"], iter([["2 m"]])
+            raise RuntimeError("Revit went away")
+
+    with pytest.raises(RuntimeError):
+        schedule_pipeline.bind_schedule_source(FailingSource(), output_path)
+    with open(output_path, "rb") as workbook:
+        assert workbook.read() == previous_workbook
+    assert os.listdir(str(tmp_path)) == ["binder.xlsx"]
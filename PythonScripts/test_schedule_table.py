@@ -0,0 +1,50 @@
+"""Tests of the chunked parsing of schedule tables."""
+
+import zipfile
+import schedule_pipeline
+import schedule_table
+
+
+def parse_blocks(rows, block_size):
+    """Header and all row blocks of rows parsed in blocks."""
+    first_table, row_blocks = schedule_table.parse_row_blocks("Title", ["Code", "Length"], iter(rows), block_size)
+    return first_table.header, list(row_blocks)
+
+
+def test_later_block_with_other_unit_keeps_text():
+    header, blocks = parse_blocks([["1", "1 m"], ["2", "2 m"], ["3", "500 mm"], ["4", "3 m"]], 2)
+    assert header == ["Code", "Length [m]"]
+    assert blocks == [[[1, 1], [2, 2]], [[3, "500 mm"], [4, 3]]]
+
+
+def test_blank_first_block_keeps_quantities_as_text():
+    header, blocks = parse_blocks([["1", ""], ["2", "5 m"]], 1)
+    assert header == ["Code", "Length"]
+    assert blocks == [[[1, ""]], [[2, "5 m"]]]
+
+
+def test_codes_stay_text_in_later_blocks():
+    header, blocks = parse_blocks([["007", "1 m"], ["12", "2,5 m"]], 1)
+    assert blocks == [[["007", 1]], [["12", "2,5 m"]]]
+
+
+def test_decimal_separator_of_first_block_is_kept():
+    header, blocks = parse_blocks([["1", "2,5 m"], ["2", "1,5 m"], ["3", "1,250 m"]], 2)
+    assert header == ["Code", "Length [m]"]
+    assert blocks == [[[1, 2.5], [2, 1.5]], [[3, "1,250 m"]]]
+
+
+def test_ambiguous_grouping_is_text():
+    column = schedule_table.parse_column("Area", ["1,234", "2"])
+    assert column.kind == schedule_table.TEXT
+
+
+def test_pipeline_keeps_units_of_first_block(tmp_path):
+    source = schedule_pipeline.StaticScheduleSource(
+        [("Qty_PIPES_2019", "Pipes", ["Length"], [["1 m"], ["500 mm"]])])
+    output_path = str(tmp_path / "binder.xlsx")
+    schedule_pipeline.bind_schedule_source(source, output_path, backend="xlsx", block_size=1)
+    with zipfile.ZipFile(output_path) as package:
+        sheet = package.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert "<t>Length [m]</t>" in sheet
+    assert "<t>500 mm</t>" in sheet
@@ -0,0 +1,331 @@
+"""Minimal streaming XLSX writer that does not need Excel to be installed.
+
+Rows are serialized to SpreadsheetML as soon as they are written and spooled
+to a temporary file on disk, so no sheet is ever held in memory as a whole.
+When a sheet is closed its XML part is assembled into the zipped workbook
+package. The spooling is necessary because the column widths have to be
+written in front of the sheet data, but are only known after the last row.
+
+The module runs on Python 3 as well as on IronPython 2.7 inside Revit.
+"""
+
+import contextlib
+import numbers
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+
+# Constants:
+MAX_ROWS = 1048576  # rows per sheet supported by Excel
+MAX_COLUMNS = 16384  # columns per sheet supported by Excel
+MAX_SHEET_NAME_LENGTH = 31
+INVALID_SHEET_NAME_CHARACTERS = re.compile(r"[\[\]:*?/\\]")
+ILLEGAL_XML_CHARACTERS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+MIN_COLUMN_WIDTH = 4
+MAX_COLUMN_WIDTH = 80
+COLUMN_WIDTH_PADDING = 1.5
+STYLE_NORMAL = 0
+STYLE_BOLD = 1
+ZIP_STREAMING = sys.version_info >= (3, 6)  # ZipFile.open() supports writing
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+NS_CONTENT_TYPES = "http://schemas.openxmlformats.org/package/2006/content-types"
+REL_TYPE_DOCUMENT = NS_REL + "/officeDocument"
+REL_TYPE_WORKSHEET = NS_REL + "/worksheet"
+REL_TYPE_STYLES = NS_REL + "/styles"
+CT_WORKBOOK = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"
+CT_WORKSHEET = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+CT_STYLES = "application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"
+CT_RELATIONSHIPS = "application/vnd.openxmlformats-package.relationships+xml"
+
+
+class XlsxWriter(object):
+    """Workbook writer producing an .xlsx file sheet by sheet."""
+
+    def __init__(self, path, font_name="Calibri", font_size=11):
+        """Initializer."""
+        self.path = path
+        self.font_name = font_name
+        self.font_size = font_size
+        self.sheet_names = []  # in workbook order
+        self.open_sheets = []
+        self.package = zipfile.ZipFile(path, mode="w", compression=zipfile.ZIP_DEFLATED)
+
+    def add_sheet(self, name):
+        """Append a new worksheet to the workbook and return its writer."""
+        check_sheet_name(name, self.sheet_names)
+        self.sheet_names.append(name)
+        sheet = SheetWriter(self, name, part_name(len(self.sheet_names)))
+        self.open_sheets.append(sheet)
+        return sheet
+
+    def copy_sheet(self, name, source_package, source_part_name):
+        """Append a worksheet copied verbatim from another package written by this writer.
+
+        Returns the part name of the copied sheet in this workbook.
+        """
+        check_sheet_name(name, self.sheet_names)
+        self.sheet_names.append(name)
+        target_part_name = part_name(len(self.sheet_names))
+        with source_package.open(source_part_name) as source, self._open_part(target_part_name) as target:
+            shutil.copyfileobj(source, target)
+        return target_part_name
+
+    def close(self):
+        """Finish all open sheets and write the package parts."""
+        for sheet in list(self.open_sheets):
+            sheet.close()
+        self.package.writestr("[Content_Types].xml", content_types_xml(len(self.sheet_names)))
+        self.package.writestr("_rels/.rels", root_relationships_xml())
+        self.package.writestr("xl/workbook.xml", workbook_xml(self.sheet_names))
+        self.package.writestr("xl/_rels/workbook.xml.rels", workbook_relationships_xml(len(self.sheet_names)))
+        self.package.writestr("xl/styles.xml", styles_xml(self.font_name, self.font_size))
+        self.package.close()
+
+    def discard(self):
+        """Abandon the workbook, closing the package without writing the remaining parts."""
+        for sheet in self.open_sheets:
+            sheet.body.close()
+        self.open_sheets = []
+        self.package.close()
+
+    def _finish_sheet(self, sheet):
+        """Copy a closed sheet into the workbook package."""
+        with self._open_part(sheet.part_name) as part:
+            part.write(sheet.head_xml().encode("utf-8"))
+            sheet.body.seek(0)
+            shutil.copyfileobj(sheet.body, part)
+            part.write(sheet.tail_xml().encode("utf-8"))
+        self.open_sheets.remove(sheet)
+
+    @contextlib.contextmanager
+    def _open_part(self, name):
+        """Open a new package part for writing.
+
+        Older Pythons cannot stream into a zip file, there the part is
+        assembled in a temporary file and added to the package afterwards.
+        """
+        if ZIP_STREAMING:
+            with self.package.open(name, mode="w") as part:
+                yield part
+            return
+        handle, temp_path = tempfile.mkstemp(suffix=".xml")
+        try:
+            with os.fdopen(handle, "wb") as part:
+                yield part
+            self.package.write(temp_path, name)
+        finally:
+            os.remove(temp_path)
+
+
+class SheetWriter(object):
+    """Writer for the rows of a single worksheet."""
+
+    def __init__(self, workbook, name, part_name):
+        """Initializer."""
+        self.workbook = workbook
+        self.name = name
+        self.part_name = part_name
+        self.body = tempfile.TemporaryFile()
+        self.row_count = 0
+        self.column_widths = []  # approximated content width per column
+        self.closed = False
+
+    def write_row(self, values, bold=False, measure=True):
+        """Append one row of cell values to the sheet.
+
+        Numbers are written as numeric cells, None as empty cells and
+        everything else as inline strings. Rows written with measure=False
+        do not count towards the column widths.
+        """
+        if self.row_count >= MAX_ROWS:
+            raise ValueError("Sheet '{name}' exceeds {num} rows!".format(name=self.name, num=MAX_ROWS))
+        self.row_count += 1
+        style = ' s="{style}"'.format(style=STYLE_BOLD) if bold else ""
+        cells = []
+        for column, value in enumerate(values):
+            if value is None or value == "":
+                continue
+            reference = "{col}{row}".format(col=column_letter(column), row=self.row_count)
+            if is_number(value):
+                text = number_text(value)
+                cells.append('<c r="{ref}"{s}><v>{v}</v></c>'.format(ref=reference, s=style, v=text))
+            else:
+                text = value if isinstance(value, type(u"")) else u"{0}".format(value)
+                cells.append('<c r="{ref}"{s} t="inlineStr"><is>{t}</is></c>'.format(
+                    ref=reference, s=style, t=text_xml(text)))
+            if measure:
+                self._measure(column, text)
+        row = '<row r="{row}">{cells}</row>'.format(row=self.row_count, cells="".join(cells))
+        self.body.write(row.encode("utf-8"))
+
+    def write_rows(self, rows, bold=False):
+        """Append several rows of cell values to the sheet."""
+        for values in rows:
+            self.write_row(values, bold=bold)
+
+    def close(self):
+        """Finish the sheet and hand it over to the workbook package."""
+        if self.closed:
+            return
+        self.closed = True
+        self.workbook._finish_sheet(self)
+        self.body.close()
+
+    def head_xml(self):
+        """XML preceding the sheet rows."""
+        parts = [XML_HEADER, '<worksheet xmlns="{ns}" xmlns:r="{rel}">'.format(ns=NS_MAIN, rel=NS_REL)]
+        if self.column_widths:
+            parts.append("<cols>")
+            for column, width in enumerate(self.column_widths, start=1):
+                parts.append('<col min="{c}" max="{c}" width="{w:.2f}" customWidth="1"/>'.format(
+                    c=column, w=column_width(width)))
+            parts.append("</cols>")
+        parts.append("<sheetData>")
+        return "".join(parts)
+
+    def tail_xml(self):
+        """XML following the sheet rows."""
+        return "</sheetData></worksheet>"
+
+    def _measure(self, column, text):
+        """Track the widest content seen in a column."""
+        while len(self.column_widths) <= column:
+            self.column_widths.append(0)
+        width = max(len(line) for line in text.split("\n"))
+        if width > self.column_widths[column]:
+            self.column_widths[column] = width
+
+
+# Helpers:
+def check_sheet_name(name, existing_names):
+    """Raise a ValueError if a sheet name is not acceptable for Excel."""
+    if not name or len(name) > MAX_SHEET_NAME_LENGTH:
+        raise ValueError("Sheet name '{name}' must have 1 to {num} characters!".format(
+            name=name, num=MAX_SHEET_NAME_LENGTH))
+    if INVALID_SHEET_NAME_CHARACTERS.search(name):
+        raise ValueError("Sheet name '{name}' contains invalid characters!".format(name=name))
+    if name.lower() in [existing.lower() for existing in existing_names]:
+        raise ValueError("Sheet name '{name}' is not unique!".format(name=name))
+
+
+def part_name(sheet_number):
+    """Package part name of the n-th worksheet (starting at 1)."""
+    return "xl/worksheets/sheet{num}.xml".format(num=sheet_number)
+
+
+_column_letters = []
+
+
+def column_letter(column):
+    """Excel column letter(s) of a zero based column index."""
+    while len(_column_letters) <= column:
+        index = len(_column_letters) + 1
+        letters = ""
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            letters = chr(ord("A") + remainder) + letters
+        _column_letters.append(letters)
+    return _column_letters[column]
+
+
+def column_width(content_width):
+    """Approximate Excel column width for the widest content of a column."""
+    width = content_width + COLUMN_WIDTH_PADDING
+    return min(max(width, MIN_COLUMN_WIDTH), MAX_COLUMN_WIDTH)
+
+
+def is_number(value):
+    """Check if a value should be written as a numeric cell."""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, numbers.Real):
+        return value == value and value not in (float("inf"), float("-inf"))  # no NaN/inf
+    return False
+
+
+def number_text(value):
+    """Shortest text representation of a number for a numeric cell."""
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    return repr(float(value))
+
+
+def text_xml(text):
+    """Escaped inline string element content."""
+    text = escape(ILLEGAL_XML_CHARACTERS.sub("", text))
+    if text != text.strip():
+        return '<t xml:space="preserve">{t}</t>'.format(t=text)
+    return "<t>{t}</t>".format(t=text)
+
+
+def content_types_xml(sheet_count):
+    """Content types of all package parts."""
+    parts = [XML_HEADER, '<Types xmlns="{ns}">'.format(ns=NS_CONTENT_TYPES)]
+    parts.append('<Default Extension="rels" ContentType="{ct}"/>'.format(ct=CT_RELATIONSHIPS))
+    parts.append('<Default Extension="xml" ContentType="application/xml"/>')
+    parts.append('<Override PartName="/xl/workbook.xml" ContentType="{ct}"/>'.format(ct=CT_WORKBOOK))
+    parts.append('<Override PartName="/xl/styles.xml" ContentType="{ct}"/>'.format(ct=CT_STYLES))
+    for number in range(1, sheet_count + 1):
+        parts.append('<Override PartName="/{part}" ContentType="{ct}"/>'.format(
+            part=part_name(number), ct=CT_WORKSHEET))
+    parts.append("</Types>")
+    return "".join(parts)
+
+
+def root_relationships_xml():
+    """Package relationships pointing to the workbook part."""
+    return "".join([
+        XML_HEADER, '<Relationships xmlns="{ns}">'.format(ns=NS_PKG_REL),
+        '<Relationship Id="rId1" Type="{t}" Target="xl/workbook.xml"/>'.format(t=REL_TYPE_DOCUMENT),
+        "</Relationships>"])
+
+
+def workbook_xml(sheet_names):
+    """Workbook part listing all sheets in order."""
+    parts = [XML_HEADER, '<workbook xmlns="{ns}" xmlns:r="{rel}"><sheets>'.format(ns=NS_MAIN, rel=NS_REL)]
+    for number, name in enumerate(sheet_names, start=1):
+        parts.append('<sheet name="{name}" sheetId="{num}" r:id="rId{num}"/>'.format(
+            name=escape(name, {'"': "&quot;"}), num=number))
+    parts.append("</sheets></workbook>")
+    return "".join(parts)
+
+
+def workbook_relationships_xml(sheet_count):
+    """Workbook relationships to the sheet and style parts."""
+    parts = [XML_HEADER, '<Relationships xmlns="{ns}">'.format(ns=NS_PKG_REL)]
+    for number in range(1, sheet_count + 1):
+        parts.append('<Relationship Id="rId{num}" Type="{t}" Target="worksheets/sheet{num}.xml"/>'.format(
+            num=number, t=REL_TYPE_WORKSHEET))
+    parts.append('<Relationship Id="rId{num}" Type="{t}" Target="styles.xml"/>'.format(
+        num=sheet_count + 1, t=REL_TYPE_STYLES))
+    parts.append("</Relationships>")
+    return "".join(parts)
+
+
+def styles_xml(font_name, font_size):
+    """Style sheet with a normal and a bold cell style in the given font."""
+    font = '<font>{b}<sz val="{size}"/><name val="{name}"/></font>'
+    return "".join([
+        XML_HEADER, '<styleSheet xmlns="{ns}">'.format(ns=NS_MAIN),
+        '<fonts count="2">',
+        font.format(b="", size=font_size, name=escape(font_name, {'"': "&quot;"})),
+        font.format(b="<b/>", size=font_size, name=escape(font_name, {'"': "&quot;"})),
+        "</fonts>",
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>',
+        '<fill><patternFill patternType="gray125"/></fill></fills>',
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>',
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>',
+        '<cellXfs count="2">',
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>',
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>',
+        "</cellXfs>",
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>',
+        "</styleSheet>"])
@@ -0,0 +1,149 @@
+"""Mark the clashes of several interference reports in all coordination views."""
+
+from __future__ import print_function
+import fnmatch
+import clr
+clr.AddReference('RevitAPI')
+clr.AddReference('RevitAPIUI')
+import Autodesk.Revit.DB as db
+import Autodesk.Revit.UI as ui
+clr.AddReference("System.Windows.Forms")
+import System.Windows.Forms as swf
+import clash_batch
+import interference_report
+import MarkAllClashes
+
+__name = "BatchMarkClashes.py"
+__version = "0.3b"
+
+VIEW_NAME_PATTERN = "*Coordination*"  # fnmatch pattern of the views to mark the clashes in
+
+
+def main():
+    """Main Function."""
+
+    print("🐍 Running {fname} version {ver}...".format(fname=__name, ver=__version))
+
+    # STEP 0: Setup
+    doc = __revit__.ActiveUIDocument.Document
+
+    # STEP 1: Ask user for the clash report html files and parse them
+    print("Opening interference check report files...", end="")
+    open_dialog = swf.OpenFileDialog()
+    open_dialog.Title = "Open Interference Check Reports"
+    open_dialog.Filter = "HMTL files (*.html)|*.html"
+    open_dialog.Multiselect = True
+    if open_dialog.ShowDialog() != swf.DialogResult.OK:  # no files selected
+        print("\n✘ No files selected. Nothing to do.")
+        return ui.Result.Cancelled
+    print("✔")
+    reports = []
+    for file_path in open_dialog.FileNames:
+        print("Reading and parsing {fname}...".format(fname=file_path), end="")
+        reports.append(interference_report.parse_report(file_path))
+        print("✔")
+        print("  ➜ Found {num} clashes in the report.".format(num=len(reports[-1])))
+
+    # STEP 2: Find the target views
+    print("Getting all views matching '{pattern}'...".format(pattern=VIEW_NAME_PATTERN), end="")
+    views = get_target_views(doc, VIEW_NAME_PATTERN)
+    print("✔")
+    print("  ➜ Found {num} views.".format(num=len(views)))
+    if not views:
+        print("✘ No matching views. Nothing to do.")
+        return ui.Result.Cancelled
+
+    # STEP 3: Ask user how to combine the reports
+    dialog = ui.TaskDialog(title="Batch Mark Clashes")
+    dialog.MainInstruction = "Combine {num} Interference Reports".format(num=len(reports))
+    dialog.MainContent = "Mark the clashes in {num} views:\n{names}".format(
+        num=len(views), names="\n".join(view.Name for view in views))
+    dialog.AddCommandLink(ui.TaskDialogCommandLinkId.CommandLink1, "Mark elements clashing in any report")
+    dialog.AddCommandLink(ui.TaskDialogCommandLinkId.CommandLink2, "Mark elements clashing in all reports")
+    dialog.CommonButtons = ui.TaskDialogCommonButtons.Close
+    dialog.DefaultButton = ui.TaskDialogResult.Close
+    result = dialog.Show()
+    if result == ui.TaskDialogResult.CommandLink1:
+        mode = clash_batch.UNION
+    elif result == ui.TaskDialogResult.CommandLink2:
+        mode = clash_batch.INTERSECTION
+    else:
+        print("✘ Cancelled. Nothing to do.")
+        return ui.Result.Cancelled
+    clashing_ids = clash_batch.combine_clashing_ids(reports, mode)
+    print("  ➜ Found {num} clashing elements ({mode}).".format(num=len(clashing_ids), mode=mode))
+
+    # STEP 4: Index the visible elements of all target views
+    print("Indexing the elements of the target views...", end="")
+    index = clash_batch.VisibilityIndex()
+    for view in views:
+        index.add_view(view.Id.IntegerValue, get_element_categories(doc, view))
+    print("✔")
+
+    # STEP 5: Mark the clashes in every view
+    transaction_group = db.TransactionGroup(doc, "{name} - v{ver}".format(name=__name, ver=__version))
+    transaction_group.Start()
+    try:
+        for number, view in enumerate(views, start=1):
+            element_categories = index.element_categories(view.Id.IntegerValue)
+            plan = MarkAllClashes.plan_view_overrides(doc, view, element_categories, clashing_ids)
+            highlighted = len(plan.highlight_filter_ids) + len(plan.highlight_element_ids)
+            print("  ➜ [{num}/{total}] Marking {clash} clashing and fading {rest} elements in '{name}'...".format(
+                num=number, total=len(views), clash=highlighted, rest=len(element_categories) - highlighted,
+                name=view.Name), end="")
+            transaction = db.Transaction(doc, "Mark clashes in {name}".format(name=view.Name))
+            transaction.Start()
+            try:
+                MarkAllClashes.apply_override_plan(doc, view, plan)
+            except Exception:
+                transaction.RollBack()
+                raise
+            transaction.Commit()
+            print("✔")
+        transaction = db.Transaction(doc, "Delete unused clash filters")
+        transaction.Start()
+        try:
+            MarkAllClashes.delete_unused_highlight_filters(doc)
+        except Exception:
+            transaction.RollBack()
+            raise
+        transaction.Commit()
+    except Exception as ex:
+        print("\n✘ Exception:\n {ex}".format(ex=ex))
+        transaction_group.RollBack()
+        return ui.Result.Failed
+    else:
+        transaction_group.Assimilate()
+        print("Done. 😊")
+        return ui.Result.Succeeded
+
+
+def get_target_views(doc, pattern):
+    """Get all non-template views with graphic overrides whose names match a pattern."""
+    views = db.FilteredElementCollector(doc)\
+              .OfClass(db.View)\
+              .ToElements()
+    return sorted([view for view in views
+                   if not view.IsTemplate
+                   and view.AreGraphicsOverridesAllowed()
+                   and fnmatch.fnmatch(view.Name, pattern)],
+                  key=lambda view: view.Name)
+
+
+def get_element_categories(doc, view):
+    """Get the elements visible in a view as {element id: category id}."""
+    elements = db.FilteredElementCollector(doc, view.Id)\
+                 .WhereElementIsNotElementType()\
+                 .ToElements()
+    element_categories = {}
+    for element in elements:
+        category = element.Category
+        element_categories[element.Id.IntegerValue] = category.Id.IntegerValue if category else None
+    return element_categories
+
+
+if __name__ == "__main__":
+    #__window__.Hide()
+    result = main()
+    if result == ui.Result.Succeeded:
+        __window__.Close()
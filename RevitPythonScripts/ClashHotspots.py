@@ -0,0 +1,134 @@
+"""Cluster the clashes of an interference report into hotspots and create section box views."""
+
+from __future__ import print_function
+import clr
+clr.AddReference('RevitAPI')
+clr.AddReference('RevitAPIUI')
+import Autodesk.Revit.DB as db
+import Autodesk.Revit.UI as ui
+clr.AddReference("System.Windows.Forms")
+import System.Windows.Forms as swf
+import clash_hotspots
+import interference_report
+
+__name = "ClashHotspots.py"
+__version = "0.2b"
+
+MAX_HOTSPOT_VIEWS = 10  # views are created for the highest ranked hotspots only
+
+
+def main():
+    """Main Function."""
+
+    print("🐍 Running {fname} version {ver}...".format(fname=__name, ver=__version))
+
+    # STEP 0: Setup
+    doc = __revit__.ActiveUIDocument.Document
+
+    # STEP 1: Ask user for clash report html file and parse it
+    print("Opening interference check report file...", end="")
+    open_dialog = swf.OpenFileDialog()
+    open_dialog.Title = "Open Interference Check Report"
+    open_dialog.Filter = "HMTL files (*.html)|*.html"
+    if open_dialog.ShowDialog() != swf.DialogResult.OK:  # no file selected
+        print("\n✘ No file selected. Nothing to do.")
+        return ui.Result.Cancelled
+    file_path = open_dialog.FileName
+    print("✔")
+    print("Reading and parsing {fname}...".format(fname=file_path), end="")
+    report = interference_report.parse_report(file_path)
+    print("✔")
+    print("  ➜ Found {num} clashes in the report.".format(num=len(report)))
+
+    # STEP 2: Get the bounding boxes of the clashing elements
+    print("Getting bounding boxes of the clashing elements...", end="")
+    snapshot_path = clash_hotspots.snapshot_path(file_path)
+    bounding_boxes = clash_hotspots.load_snapshot(snapshot_path)  # keeps boxes of elements not in this model
+    bounding_boxes.update(get_bounding_boxes(doc, report.element_ids()))
+    clash_hotspots.save_snapshot(snapshot_path, bounding_boxes)
+    print("✔")
+    print("  ➜ Found {num} bounding boxes.".format(num=len(bounding_boxes)))
+
+    # STEP 3: Cluster the clashes into hotspots
+    print("Clustering clashes into hotspots...", end="")
+    hotspots, skipped = clash_hotspots.find_hotspots(report.pairs(), bounding_boxes)
+    print("✔")
+    print("  ➜ Found {num} hotspots, skipped {skip} clashes without bounding boxes.".format(
+        num=len(hotspots), skip=skipped))
+    for rank, hotspot in enumerate(hotspots[:MAX_HOTSPOT_VIEWS], start=1):
+        print("  ➜ Hotspot {rank}: {num} clashes".format(rank=rank, num=hotspot.clash_count))
+    if not hotspots:
+        print("✘ No hotspots found. Nothing to do.")
+        return ui.Result.Cancelled
+
+    # STEP 4: Create a section box view for each of the highest ranked hotspots
+    print("Creating 3D views of the top {num} hotspots...".format(num=min(len(hotspots), MAX_HOTSPOT_VIEWS)), end="")
+    transaction = db.Transaction(doc)
+    transaction.Start("{name} - v{ver}".format(name=__name, ver=__version))
+    try:
+        delete_hotspot_views(doc)
+        view_family_type = get_3d_view_family_type(doc)
+        for rank, hotspot in enumerate(hotspots[:MAX_HOTSPOT_VIEWS], start=1):
+            create_hotspot_view(doc, view_family_type, rank, hotspot)
+    except Exception as ex:
+        print("\n✘ Exception:\n {ex}".format(ex=ex))
+        transaction.RollBack()
+        return ui.Result.Failed
+    else:
+        transaction.Commit()
+        print("✔\nDone. 😊")
+        return ui.Result.Succeeded
+
+
+def get_bounding_boxes(doc, element_ids):
+    """Get the model bounding boxes of elements as {id: (min xyz, max xyz)}."""
+    bounding_boxes = {}
+    for element_id in element_ids:
+        element = doc.GetElement(db.ElementId(element_id))
+        if element is None:  # element of a linked model or deleted since the report
+            continue
+        box = element.get_BoundingBox(None)
+        if box is None:
+            continue
+        bounding_boxes[element_id] = ((box.Min.X, box.Min.Y, box.Min.Z), (box.Max.X, box.Max.Y, box.Max.Z))
+    return bounding_boxes
+
+
+def get_3d_view_family_type(doc):
+    """Get the first 3D view family type of the document."""
+    view_family_types = db.FilteredElementCollector(doc)\
+                          .OfClass(db.ViewFamilyType)\
+                          .ToElements()
+    for view_family_type in view_family_types:
+        if view_family_type.ViewFamily == db.ViewFamily.ThreeDimensional:
+            return view_family_type
+    raise LookupError("No 3D view family type found!")
+
+
+def delete_hotspot_views(doc):
+    """Delete the hotspot views of a previous run, views named like them by users are kept."""
+    views = db.FilteredElementCollector(doc)\
+              .OfClass(db.View3D)\
+              .ToElements()
+    for view in views:
+        if not view.IsTemplate and clash_hotspots.is_hotspot_view_name(view.Name):
+            doc.Delete(view.Id)
+
+
+def create_hotspot_view(doc, view_family_type, rank, hotspot):
+    """Create an isometric 3D view with a section box around a hotspot."""
+    minimum, maximum = clash_hotspots.section_box(hotspot)
+    box = db.BoundingBoxXYZ()
+    box.Min = db.XYZ(*minimum)
+    box.Max = db.XYZ(*maximum)
+    view = db.View3D.CreateIsometric(doc, view_family_type.Id)
+    view.Name = clash_hotspots.view_name(rank, hotspot)
+    view.SetSectionBox(box)
+    return view
+
+
+if __name__ == "__main__":
+    #__window__.Hide()
+    result = main()
+    if result == ui.Result.Succeeded:
+        __window__.Close()
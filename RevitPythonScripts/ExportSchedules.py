@@ -8,11 +8,13 @@ import Autodesk.Revit.DB as db
 import Autodesk.Revit.UI as ui
 clr.AddReference("System.Windows.Forms")
 import System.Windows.Forms as swf
+import schedule_fingerprint
 
 __name = "ExportSchedules.py"
-__version = "0.1b"
+__version = "0.2b"
 
 PREFIX = "Qty_"
+INCREMENTAL = True  # only export schedules that changed since the last export
 
 
 def main():
@@ -55,20 +57,38 @@ def main():
     print("🛈 Selected output folder: {folder}".format(
         folder=folder_browser.SelectedPath))        
 
-    # STEP 3: Export all selected schedules
+    # STEP 4: Export all selected schedules that changed since the last export
     # https://www.revitapidocs.com/2018/8ba18e73-6daf-81b6-d15b-e4aa90bc8c22.htm
     print("Exporting schedules as CSV to selected output folder...", end="")
+    folder = folder_browser.SelectedPath
+    previous_fingerprints = schedule_fingerprint.load_manifest(folder) if INCREMENTAL else {}
+    fingerprints = {}  # file_name: fingerprint
+    skipped = []
     try:
         export_options = db.ViewScheduleExportOptions()
         export_options.FieldDelimiter = ","
         for schedule in quantity_schedules:
             file_name = "{name}.csv".format(name=schedule.Name)
-            schedule.Export(folder_browser.SelectedPath, file_name, export_options)
+            if INCREMENTAL:
+                fingerprint = schedule_fingerprint.schedule_fingerprint(
+                    schedule, db.SectionType.Header, db.SectionType.Body)
+                fingerprints[file_name] = fingerprint
+                if not schedule_fingerprint.needs_export(folder, file_name, fingerprint, previous_fingerprints):
+                    skipped.append(file_name)
+                    continue
+            schedule.Export(folder, file_name, export_options)
     except Exception as ex:
         print("\n✘ Exception:\n {ex}".format(ex=ex))
         return ui.Result.Failed
     else:
-        print("✔\nDone. 😊")
+        if INCREMENTAL:
+            schedule_fingerprint.save_manifest(folder, fingerprints)
+        print("✔")
+        print("  ➜ Exported {num} schedules.".format(num=len(quantity_schedules) - len(skipped)))
+        print("  ➜ Skipped {num} unchanged schedules.".format(num=len(skipped)))
+        for file_name in skipped:
+            print("  ➜ Skipped '{name}'".format(name=file_name))
+        print("Done. 😊")
         return ui.Result.Succeeded
 
 
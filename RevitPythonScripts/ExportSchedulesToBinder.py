@@ -0,0 +1,85 @@
+"""Export all Schedules with a certain prefix directly into one Excel workbook.
+
+This script streams the table data of the schedules straight into the
+binder's workbook writer (see PythonScripts/bind_schedules.py) without
+exporting and re-reading CSV files in between.
+"""
+
+from __future__ import print_function
+import os.path
+import sys
+import clr
+clr.AddReference('RevitAPI')
+clr.AddReference('RevitAPIUI')
+import Autodesk.Revit.DB as db
+import Autodesk.Revit.UI as ui
+clr.AddReference("System.Windows.Forms")
+import System.Windows.Forms as swf
+BINDER_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "PythonScripts")
+sys.path.append(os.path.normpath(BINDER_FOLDER))
+import schedule_pipeline
+
+__name = "ExportSchedulesToBinder.py"
+__version = "0.1b"
+
+PREFIX = "Qty_"
+
+
+def main():
+    """Main script docstring."""
+
+    print("🐍 Running {fname} version {ver}...".format(fname=__name, ver=__version))
+
+    # STEP 0: Setup
+    doc = __revit__.ActiveUIDocument.Document
+
+    # STEP 1: Find all appropriate schedules
+    print("Getting all available schedules from the model...", end="")
+    all_schedules = db.FilteredElementCollector(doc)\
+                  .OfCategory(db.BuiltInCategory.OST_Schedules)\
+                  .WhereElementIsNotElementType()\
+                  .ToElements()
+    print("✔")
+    print("  ➜ Found {num} schedules in the project.".format(num=len(all_schedules)))
+
+    # STEP 2: Filtering for quantification schedules (with given prefix)
+    print("Filtering quantification schedules from the found schedules...", end="")
+    quantity_schedules = sorted(
+        [s for s in all_schedules if s.Name.startswith(PREFIX)], key=lambda s: s.Name)
+    print("✔")
+    print("  ➜ Found {num} schedules with prefix '{prefix}'.".format(
+        num=len(quantity_schedules), prefix=PREFIX))
+
+    # STEP 3: Ask for the workbook file location
+    print("Please select the Excel workbook to write...", end="")
+    save_dialog = swf.SaveFileDialog()
+    save_dialog.Title = "Save Schedule Binder"
+    save_dialog.Filter = "Excel-File (*.xlsx)|*.xlsx"
+    save_dialog.FileName = "binder.xlsx"
+    if save_dialog.ShowDialog() != swf.DialogResult.OK:  # no file selected
+        print("\n✘ No file selected. Nothing to do.")
+        return ui.Result.Cancelled
+    print("✔")
+    print("🛈 Selected workbook: {path}".format(path=save_dialog.FileName))
+
+    # STEP 4: Stream the schedule table data into the workbook
+    print("Writing schedules to the workbook...")
+    source = schedule_pipeline.ViewScheduleSource(
+        quantity_schedules, header_section=db.SectionType.Header, body_section=db.SectionType.Body)
+    try:
+        sheet_names = schedule_pipeline.bind_schedule_source(
+            source, save_dialog.FileName,
+            progress=lambda code: print("  ➜ Wrote sheet '{code}'".format(code=code)))
+    except Exception as ex:
+        print("\n✘ Exception:\n {ex}".format(ex=ex))
+        return ui.Result.Failed
+    else:
+        print("✔\nWrote {num} sheets.\nDone. 😊".format(num=len(sheet_names)))
+        return ui.Result.Succeeded
+
+
+if __name__ == "__main__":
+    #__window__.Hide()
+    result = main()
+    # if result == ui.Result.Succeeded:
+    #     __window__.Close()
@@ -1,7 +1,6 @@
-"""Split all pipes into horizontal and vertical pipes."""
+"""Split all pipes into horizontal, vertical and sloped pipes."""
 
 from __future__ import print_function
-import math
 import clr
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
@@ -11,9 +10,10 @@ clr.AddReference("System.Windows.Forms")
 clr.AddReference("System.Drawing")
 import System.Windows.Forms as swf
 import System.Drawing as sd
+import pipe_geometry
 
 __name = "HorizontalVerticalSplit.py"
-__version = "0.1a"
+__version = "0.2a"
 
 # Constsants:
 FEET_2_METER = 0.3048
@@ -51,9 +51,10 @@ def main():
     categorized_pipes = categorize_pipes(sorted_pipes)
     print("✔")
     for key in categorized_pipes.keys():
-        print("  ➜ Found {numh} horizontal pipes = {lenh} m an {numv} vertical pipes = {lenv} m of type '{key}' in the model.".format(
+        print("  ➜ Found {numh} horizontal pipes = {lenh} m, {numv} vertical pipes = {lenv} m and {nums} sloped pipes = {lens} m of type '{key}' in the model.".format(
             numh=len(categorized_pipes[key]["horizontal"]), lenh=total_length(categorized_pipes[key]["horizontal"]),
             numv=len(categorized_pipes[key]["vertical"]), lenv=total_length(categorized_pipes[key]["vertical"]),
+            nums=len(categorized_pipes[key]["sloped"]), lens=total_length(categorized_pipes[key]["sloped"]),
             key=key))
 
 
@@ -71,34 +72,24 @@ def sort_pipes(pipes, doc):
             sorted_pipes[system_abbreviation] = [pipe, ]
     return sorted_pipes
 
-def categorize_pipes(sorted_pipes):
-    """Categorize vertical/horizontal pipes."""
+def categorize_pipes(sorted_pipes, tolerance=pipe_geometry.DEFAULT_TOLERANCE):
+    """Categorize horizontal/vertical/sloped pipes."""
     categorized_pipes = {}
     for key, pipes in sorted_pipes.items():
-        categories = {"vertical": [], "horizontal": []}
+        starts, ends = [], []
         for pipe in pipes:
-            if is_vertical(pipe):
-                categories["vertical"].append(pipe)
-            else:
-                categories["horizontal"].append(pipe)
+            curve = pipe.Location.Curve
+            point1 = curve.GetEndPoint(0)
+            point2 = curve.GetEndPoint(1)
+            starts.append((point1.X, point1.Y, point1.Z))
+            ends.append((point2.X, point2.Y, point2.Z))
+        classes = pipe_geometry.classify_segments(starts, ends, tolerance)
+        categories = {name: [] for name in pipe_geometry.CLASS_NAMES.values()}
+        for pipe, segment_class in zip(pipes, classes):
+            categories[pipe_geometry.CLASS_NAMES[segment_class]].append(pipe)
         categorized_pipes[key] = categories
     return categorized_pipes
 
-def is_vertical(pipe, tolerance=1):
-    """Check if a pipe is vertical (within the given angle tolerance)."""
-    curve = pipe.Location.Curve
-    point1 = curve.GetEndPoint(0)
-    point2 = curve.GetEndPoint(1)
-    dz = abs(point1.Z - point2.Z)
-    if dz:  # is not horizontal
-        dx = abs(point1.X - point2.X)
-        dy = abs(point1.Y - point2.Y)
-        dxy = math.sqrt(dx ** 2 + dy ** 2)
-        alpha = math.degrees(math.atan2(dxy, dz))
-        if alpha < tolerance:
-            return True  # is vertical
-    return False  # is not vertical
-
 def total_length(pipes):
     """Calculate the total length of a list of pipes."""
     total_length_m = 0
@@ -1,7 +1,11 @@
-"""Cleanup unhosted and rogue pipe and duct insulation."""
+"""Cleanup unhosted and rogue pipe and duct insulation.
+
+The insulation is audited with insulation_audit, which reads the insulation
+elements into compact records, resolves their hosts in bulk and classifies
+pipe and duct insulation concurrently.
+"""
 
 from __future__ import print_function
-import collections
 import datetime
 import itertools
 import clr
@@ -11,9 +15,11 @@ import Autodesk.Revit.DB as db
 import Autodesk.Revit.UI as ui
 clr.AddReference("System.Windows.Forms")
 import System.Windows.Forms as swf
+from System.Collections.Generic import List
+import insulation_audit
 
 __name = "InsulationCleanup.py"
-__version = "1.0b"
+__version = "1.1b"
 
 CHECK = "✔"
 ERROR = "✘"
@@ -29,18 +35,10 @@ def main():
     doc = __revit__.ActiveUIDocument.Document
 
     # STEP 1: Inspect Model and summarize findings
-    pipe_insulations = query_all_elements_of_category(
-        doc=doc, cat=db.BuiltInCategory.OST_PipeInsulations)
-    duct_insulations = query_all_elements_of_category(
-        doc=doc, cat=db.BuiltInCategory.OST_DuctInsulations)
-    rogue_pipe, unhosted_pipe = find_rogue_and_unhosted_elements(
-        doc=doc, elems=pipe_insulations)
-    rogue_duct, unhosted_duct = find_rogue_and_unhosted_elements(
-        doc=doc, elems=duct_insulations)
-    summary_list = write_summary(
-        tpipe=pipe_insulations, tduct=duct_insulations,  # totals
-        upipe= unhosted_pipe, uduct=unhosted_duct,  # unhosted
-        rpipe=rogue_pipe, rduct=rogue_duct)  # rogue
+    results = insulation_audit.audit(doc)
+    pipe = results[insulation_audit.PIPE_INSULATION]
+    duct = results[insulation_audit.DUCT_INSULATION]
+    summary_list = write_summary(pipe=pipe, duct=duct)
     summary_text = "\n".join(summary_list)
     print(summary_text)
 
@@ -64,8 +62,7 @@ def main():
             file_path = save_dialog.FileName
             print("Writing report to {0}".format(file_path))
             with open(file_path, mode="wb") as fh:
-                report = write_report(
-                    doc, unhosted_pipe, rogue_pipe, unhosted_duct, rogue_duct)
+                report = write_report(doc, pipe, duct)
                 for line in report:
                     fh.write("{line}\r\n".format(line=line))
             print("✔\nDone. 😊")
@@ -78,22 +75,20 @@ def main():
         transaction.Start("{name} - v{ver}".format(name=__name, ver=__version))
         try:
             print("Cleaning Insulation...")
-            for pipe_element in unhosted_pipe:
-                doc.Delete(pipe_element.Id)
+            delete_records(doc, pipe.unhosted)
             print("Deleted {num} unhosted pipe insulation elements".format(
-                num=len(unhosted_pipe)))
-            for pipe_pair in rogue_pipe:
-                cleanup_insulation(pipe_pair)
+                num=len(pipe.unhosted)))
+            for pipe_record in pipe.rogue:
+                cleanup_insulation(doc, pipe_record)
             print("Moved {num} rogue pipe insulation elements.".format(
-                num=len(rogue_pipe)))
-            for duct_element in unhosted_duct:
-                doc.Delete(duct_element.Id)
+                num=len(pipe.rogue)))
+            delete_records(doc, duct.unhosted)
             print("Deleted {num} unhosted duct insulation elements.".format(
-                num=len(unhosted_duct)))
-            for duct_pair in rogue_duct:
-                cleanup_insulation(duct_pair)
+                num=len(duct.unhosted)))
+            for duct_record in duct.rogue:
+                cleanup_insulation(doc, duct_record)
             print("Moved {num} rogue duct insulation elements.".format(
-                num=len(rogue_duct)))
+                num=len(duct.rogue)))
         except Exception as exception:
             print("Failed.\nException:\n{ex}".format(ex=exception))
             transaction.RollBack()
@@ -107,45 +102,27 @@ def main():
         return ui.Result.Cancelled
 
 
-ElementHostPair = collections.namedtuple("ElementHostPair", ["element", "host"])
-
-
-def query_all_elements_of_category(doc, cat):
-    """Return all elements of a category from a document."""
-    collector = db.FilteredElementCollector(doc)
-    elements = collector.OfCategory(cat)\
-                        .WhereElementIsNotElementType()\
-                        .ToElements()
-    return elements
-
-
-def find_rogue_and_unhosted_elements(doc, elems):
-    """Find all rogue and unhosted insulation elements."""
-    unhosted_elements = []
-    rogue_elements = []
-    for element in elems:
-        host_id = element.HostElementId
-        host_element = doc.GetElement(host_id)
-        if host_element is None:
-            unhosted_elements.append(element)
-        else:
-            if element.WorksetId != host_element.WorksetId:
-                rogue_elements.append(ElementHostPair(element, host_element))
-    return rogue_elements, unhosted_elements
+def delete_records(doc, records):
+    """Delete the insulation elements of audit records with one call."""
+    if records:
+        doc.Delete(List[db.ElementId](db.ElementId(record.element_id) for record in records))
 
 
-def cleanup_insulation(pair):
-    """Cleanup rogue and unhosted insulation elements."""
-    element_workset_id = pair.element.WorksetId.IntegerValue
-    host_workset_id = pair.host.WorksetId.IntegerValue
-    host_workset_parameter = pair.host.get_Parameter(
+def cleanup_insulation(doc, record):
+    """Cleanup a rogue insulation element given by its audit record."""
+    element_workset_id = record.workset_id
+    host_workset_id = record.host_workset_id
+    host = doc.GetElement(db.ElementId(record.host_id))
+    host_workset_parameter = host.get_Parameter(
         db.BuiltInParameter.ELEM_PARTITION_PARAM)
     host_workset_parameter.Set(element_workset_id)
     host_workset_parameter.Set(host_workset_id)
 
 
-def write_summary(tpipe, tduct, upipe, rpipe, uduct, rduct):
-    """Write a summary of rogue and unhosted insulation elements."""
+def write_summary(pipe, duct):
+    """Write a summary of rogue and unhosted insulation elements from the audit results."""
+    tpipe, upipe, rpipe = pipe.total, pipe.unhosted, pipe.rogue
+    tduct, uduct, rduct = duct.total, duct.unhosted, duct.rogue
     summary = []
     summary.append("Pipe Insulation:")
     summary.append("{res} Found {num} rogue pipe insulation elements.".format(
@@ -153,22 +130,22 @@ def write_summary(tpipe, tduct, upipe, rpipe, uduct, rduct):
     summary.append("{res} Found {num} unhosted pipe insulation elements.".format(
         num=len(upipe), res=ERROR if len(upipe) else CHECK))
     summary.append("There is a total of {tot} pipe insulation elements in the model.".format(
-        tot=len(tpipe)))
+        tot=tpipe))
     summary.append("Duct Insulation:")
     summary.append("{res} Found {num} rogue duct insulation elements.".format(
         num=len(rduct), res=ERROR if len(rduct) else CHECK))
     summary.append("{res} Found {num} unhosted duct insulation elements.".format(
         num=len(uduct), res=ERROR if len(uduct) else CHECK))
     summary.append("There is a total of {tot} duct insulation elements in the model.".format(
-        tot=len(tduct)))
+        tot=tduct))
     return summary
 
 
-def write_report(doc, upipe, rpipe, uduct, rduct):
-    """Write report of rogue and unhosted insulation elements."""
-    workset_table = doc.GetWorksetTable()
-    rogue = len(rpipe) + len(rduct)
-    unhosted = len(upipe) + len(uduct)
+def write_report(doc, pipe, duct):
+    """Write report of rogue and unhosted insulation elements from the audit results."""
+    workset_names = insulation_audit.WorksetNames(doc)
+    rogue = len(pipe.rogue) + len(duct.rogue)
+    unhosted = len(pipe.unhosted) + len(duct.unhosted)
     report = []
     # write header with general information
     report.append("reporting time, {now}".format(now=datetime.datetime.now()))
@@ -180,21 +157,20 @@ def write_report(doc, upipe, rpipe, uduct, rduct):
     report.append(
         "index,element id,element name,element workset,host id,host name,host workset")
     # write rogue element data:
-    for idx, pair in enumerate(itertools.chain(rpipe, rduct), start=1):
-        elem, host = pair
-        elem_workset = workset_table.GetWorkset(elem.WorksetId)
-        host_workset = workset_table.GetWorkset(host.WorksetId)
+    for idx, record in enumerate(itertools.chain(pipe.rogue, duct.rogue), start=1):
+        elem = doc.GetElement(db.ElementId(record.element_id))
+        host = doc.GetElement(db.ElementId(record.host_id))
         line = line_template.format(
             idx=idx,
-            eid=elem.Id.IntegerValue, en=elem.Name, ews=elem_workset.Name,
-            hid=host.Id.IntegerValue, hn=host.Name, hws=host_workset.Name)
+            eid=record.element_id, en=elem.Name, ews=workset_names.name(record.workset_id),
+            hid=record.host_id, hn=host.Name, hws=workset_names.name(record.host_workset_id))
         report.append(line)
     # write unhosted element data:
-    for idx, elem in enumerate(itertools.chain(upipe, uduct), start=1):
-        elem_workset = workset_table.GetWorkset(elem.WorksetId)
+    for idx, record in enumerate(itertools.chain(pipe.unhosted, duct.unhosted), start=1):
+        elem = doc.GetElement(db.ElementId(record.element_id))
         line = line_template.format(
             idx=idx,
-            eid=elem.Id.IntegerValue, en=elem.Name, ews=elem_workset.Name,
+            eid=record.element_id, en=elem.Name, ews=workset_names.name(record.workset_id),
             hid="-", hn="-", hws="-")
         report.append(line)
     return report
@@ -0,0 +1,118 @@
+"""Audit of pipe and duct insulation for unhosted and rogue elements.
+
+An insulation element is unhosted if its host element does not exist
+(anymore) and rogue if it lives on another workset than its host. The audit
+reads every insulation element once into a compact record of integer ids,
+resolves the worksets of all hosts with one collector over the host
+categories instead of one doc.GetElement call per insulation element, and
+keeps the workset names in a cache, as a model only has a few dozen
+worksets. The few hosts missing from the collector (e.g. of a category not
+listed in HOST_CATEGORIES) are looked up one by one, only hosts which do not
+exist at all make their insulation unhosted. Records and their
+classification live in insulation_records, which does not depend on the
+Revit API.
+
+The Revit API must only be used from the thread running the script, so the
+records are read on that thread. Classifying the records does not touch the
+Revit API and runs on one worker thread per insulation category, pipe and
+duct insulation are classified concurrently (IronPython has no global
+interpreter lock).
+"""
+
+import threading
+import clr
+clr.AddReference("RevitAPI")
+import Autodesk.Revit.DB as db
+from System.Collections.Generic import List
+import insulation_records
+
+PIPE_INSULATION = db.BuiltInCategory.OST_PipeInsulations
+DUCT_INSULATION = db.BuiltInCategory.OST_DuctInsulations
+HOST_CATEGORIES = (  # categories of the elements insulation can be hosted by
+    db.BuiltInCategory.OST_PipeCurves,
+    db.BuiltInCategory.OST_PipeFitting,
+    db.BuiltInCategory.OST_PipeAccessory,
+    db.BuiltInCategory.OST_FlexPipeCurves,
+    db.BuiltInCategory.OST_DuctCurves,
+    db.BuiltInCategory.OST_DuctFitting,
+    db.BuiltInCategory.OST_DuctAccessory,
+    db.BuiltInCategory.OST_FlexDuctCurves,
+)
+
+
+class WorksetNames(object):
+    """Workset names of a document, memoized by workset id."""
+
+    def __init__(self, doc):
+        """Initializer."""
+        self.workset_table = doc.GetWorksetTable()
+        self.names = {}  # workset id: workset name
+
+    def name(self, workset_id):
+        """Name of the workset with the given (integer) id."""
+        try:
+            return self.names[workset_id]
+        except KeyError:
+            workset = self.workset_table.GetWorkset(db.WorksetId(workset_id))
+            self.names[workset_id] = workset.Name
+            return self.names[workset_id]
+
+
+def read_records(doc, category):
+    """Read all insulation elements of a category into records (without host worksets)."""
+    elements = db.FilteredElementCollector(doc)\
+                 .OfCategory(category)\
+                 .WhereElementIsNotElementType()\
+                 .ToElements()
+    return [insulation_records.InsulationRecord(element.Id.IntegerValue, element.WorksetId.IntegerValue,
+                             element.HostElementId.IntegerValue)
+            for element in elements]
+
+
+def read_host_worksets(doc, host_ids):
+    """Read the workset ids of the existing host elements as {host id: workset id}.
+
+    Hosts are read with one collector over the host categories, hosts of
+    other categories are read one by one. Ids of deleted hosts are missing
+    from the result.
+    """
+    host_ids = set(host_ids)
+    if not host_ids:
+        return {}
+    hosts = db.FilteredElementCollector(doc)\
+              .WherePasses(db.ElementMulticategoryFilter(List[db.BuiltInCategory](HOST_CATEGORIES)))\
+              .WhereElementIsNotElementType()\
+              .ToElements()
+    host_worksets = {}
+    for host in hosts:
+        host_id = host.Id.IntegerValue
+        if host_id in host_ids:
+            host_worksets[host_id] = host.WorksetId.IntegerValue
+    for host_id in host_ids.difference(host_worksets):
+        host = doc.GetElement(db.ElementId(host_id))
+        if host is not None:
+            host_worksets[host_id] = host.WorksetId.IntegerValue
+    return host_worksets
+
+
+def audit(doc, categories=(PIPE_INSULATION, DUCT_INSULATION)):
+    """Audit the insulation of the given categories, returns {category: AuditResult}."""
+    records = {category: read_records(doc, category) for category in categories}
+    host_worksets = read_host_worksets(
+        doc, (record.host_id for category_records in records.values() for record in category_records))
+    results, errors = {}, []
+
+    def worker(category):
+        try:
+            results[category] = insulation_records.classify(records[category], host_worksets)
+        except Exception as ex:
+            errors.append(ex)
+
+    threads = [threading.Thread(target=worker, args=(category,)) for category in categories]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return results
@@ -0,0 +1,54 @@
+"""Records of insulation elements and their classification.
+
+An insulation record holds the integer ids of an insulation element, its
+host and their worksets. Classifying records into rogue and unhosted
+insulation only compares those ids, so it runs off the Revit API thread.
+This module does not depend on the Revit API.
+"""
+
+NO_WORKSET = None  # host workset of records without an existing host
+
+
+class InsulationRecord(object):
+    """Ids of an insulation element, its host and their worksets."""
+
+    __slots__ = ("element_id", "workset_id", "host_id", "host_workset_id")
+
+    def __init__(self, element_id, workset_id, host_id, host_workset_id=NO_WORKSET):
+        """Initializer."""
+        self.element_id = element_id
+        self.workset_id = workset_id
+        self.host_id = host_id
+        self.host_workset_id = host_workset_id
+
+    def is_unhosted(self):
+        """Check if the host of the insulation does not exist."""
+        return self.host_workset_id is NO_WORKSET
+
+    def is_rogue(self):
+        """Check if the insulation is not on the workset of its host."""
+        return not self.is_unhosted() and self.workset_id != self.host_workset_id
+
+
+class AuditResult(object):
+    """Rogue and unhosted insulation records of one category."""
+
+    __slots__ = ("total", "rogue", "unhosted")
+
+    def __init__(self, total=0, rogue=None, unhosted=None):
+        """Initializer."""
+        self.total = total
+        self.rogue = rogue if rogue is not None else []
+        self.unhosted = unhosted if unhosted is not None else []
+
+
+def classify(records, host_worksets):
+    """Fill in the host worksets of records and sort them into an audit result."""
+    result = AuditResult(total=len(records))
+    for record in records:
+        record.host_workset_id = host_worksets.get(record.host_id, NO_WORKSET)
+        if record.is_unhosted():
+            result.unhosted.append(record)
+        elif record.is_rogue():
+            result.rogue.append(record)
+    return result
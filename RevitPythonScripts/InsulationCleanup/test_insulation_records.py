@@ -0,0 +1,27 @@
+"""Tests of the classification of insulation records."""
+
+import insulation_records
+
+Record = insulation_records.InsulationRecord
+
+
+def test_classify_rogue_and_unhosted():
+    records = [Record(1, 100, 10), Record(2, 100, 20), Record(3, 100, 30), Record(4, 200, 10)]
+    result = insulation_records.classify(records, {10: 100, 20: 300})
+    assert result.total == 4
+    assert [record.element_id for record in result.rogue] == [2, 4]
+    assert [record.element_id for record in result.unhosted] == [3]
+    assert records[1].host_workset_id == 300
+
+
+def test_unhosted_records_are_not_rogue():
+    record = Record(1, 100, -1)
+    result = insulation_records.classify([record], {})
+    assert record.is_unhosted()
+    assert not record.is_rogue()
+    assert result.rogue == []
+
+
+def test_empty_records():
+    result = insulation_records.classify([], {10: 100})
+    assert (result.total, result.rogue, result.unhosted) == (0, [], [])
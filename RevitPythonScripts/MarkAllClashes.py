@@ -1,22 +1,37 @@
 """Mark all clashes from an interference report in current view."""
 
-from HTMLParser import HTMLParser
+import hashlib
 import clr
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
 import Autodesk.Revit.DB as db
+import Autodesk.Revit.DB.ExtensibleStorage as es
 import Autodesk.Revit.UI as ui
 clr.AddReference("System.Windows.Forms")
 import System.Windows.Forms as swf
+from System import Guid
+from System.Collections.Generic import IList, List
+import clash_index
+import clash_overrides
+import interference_report
 
 __name = "MarkAllClashes.py"
-__version = "1.0b"
+__version = "1.4b"
 
 CLASH_COLOR = db.Color(255, 0, 0)  # red
 CLASH_PATTERN_ID = db.ElementId(19)
 FADED_COLOR = db.Color(192, 192, 192)  # light gray
 FADED_PATTERN_ID = CLASH_PATTERN_ID
 FADED_TRANSPARENCY = 50
+FILTER_NAME_PREFIX = "MarkAllClashes - "
+HIGHLIGHT_FILTER_NAME = FILTER_NAME_PREFIX + "Clashing Elements {digest}"  # shared by views with the same highlights
+FADE_FILTER_NAME = FILTER_NAME_PREFIX + "Faded Elements"
+MARKS_SCHEMA_GUID = Guid("8f3a2c61-5b7e-4d0a-9c1e-2f6b8d4a7e93")  # element ids marked one by one per view
+MARKS_FIELD_NAME = "ElementIds"
+TEMPLATE_PARAMETERS = (  # view template settings preventing category and filter overrides
+    db.BuiltInParameter.VIS_GRAPHICS_MODEL,
+    db.BuiltInParameter.VIS_GRAPHICS_FILTERS,
+)
 
 clashing_overrides = db.OverrideGraphicSettings()
 clashing_overrides.SetProjectionLineColor(CLASH_COLOR)
@@ -46,33 +61,38 @@ def main():
     if open_dialog.ShowDialog() == swf.DialogResult.OK:  # file selected
         file_path = open_dialog.FileName
         # STEP 2: Parse clash report file and summarize findings
-        print("Reading {fname}...".format(fname=file_path))
-        with open(file_path, mode="rb") as html_file:
-            html = html_file.read()  # just read the plain bytes
-            uhtml = unicode(html, "utf-16")  # Revit exports html in UTF-16(-LE) encoding
-        print("Parsing file contents...")
-        parser = InterferenceReportParser()
-        parser.feed(uhtml)
-        parser.close()
-        clashes = parser.clashes
-        clashing_ids = []
-        for pair in parser.clashes.values():
-            for elem_id in pair:
-                clashing_ids.append(elem_id)
-        clashing_ids = set(clashing_ids)
-        # Get all element ids of the elements in the view
-        all_ids = db.FilteredElementCollector(doc, view.Id)\
-                    .WhereElementIsNotElementType()\
-                    .ToElementIds()
-        all_ids = set([elem_id.IntegerValue for elem_id in all_ids])
+        print("Reading and parsing {fname}...".format(fname=file_path))
+        report = interference_report.parse_report(file_path)
+        clashing_ids = report.element_ids()
+        # Compare with the clash index of the previous report and save this report's index
+        index = clash_index.ClashIndex.from_report(report)
+        clash_diff = diff_with_previous_report(file_path, index)
+        try:
+            index.save(clash_index.index_path(file_path))
+        except (IOError, OSError) as ex:  # e.g. a read-only report folder
+            print("Could not save the clash index of the report, it cannot be compared to later reports: {ex}".format(ex=ex))
+        # Get all element ids of the elements in the view and their categories
+        elements = db.FilteredElementCollector(doc, view.Id)\
+                     .WhereElementIsNotElementType()\
+                     .ToElements()
+        element_categories = {}  # element id: category id
+        for element in elements:
+            category = element.Category
+            element_categories[element.Id.IntegerValue] = category.Id.IntegerValue if category else None
+        all_ids = set(element_categories)
         # Get all element ids of non-clashing elements in the view
         non_clashing_ids = all_ids - clashing_ids
         # Create summary text for user input dialog       
         summary_text = "Checked report {path}\n".format(path=file_path)
-        summary_text += "Found {num} clashes in the report.\n".format(num=len(clashes))
+        summary_text += "Found {num} clashes in the report.\n".format(num=len(report))
+        if report.malformed_rows:
+            summary_text += "Skipped {num} malformed rows in the report.\n".format(num=report.malformed_rows)
         summary_text += "Found {num} clashing elements involved in those clashes.\n".format(num=len(clashing_ids))
         summary_text += "The total number of elements in the current view is {num}\n".format(num=len(all_ids))
         summary_text += "Found {num} non-clashing elements in the current view.".format(num=len(non_clashing_ids))
+        if clash_diff:
+            summary_text += "\nCompared to the previous report there are {new} new, {res} resolved and {per} persisting clashes.".format(
+                new=len(clash_diff.new), res=len(clash_diff.resolved), per=len(clash_diff.persisting))
         print(summary_text)
 
         # STEP 3: Ask user for display option
@@ -81,6 +101,8 @@ def main():
         dialog.MainContent = summary_text
         dialog.AddCommandLink(ui.TaskDialogCommandLinkId.CommandLink1, "Mark clashing elements and fade the rest")
         dialog.AddCommandLink(ui.TaskDialogCommandLinkId.CommandLink2, "Hide all non-clashing elements temporarily")
+        if clash_diff:
+            dialog.AddCommandLink(ui.TaskDialogCommandLinkId.CommandLink3, "Mark only new clashing elements and fade the rest")
         dialog.CommonButtons = ui.TaskDialogCommonButtons.Close
         dialog.DefaultButton = ui.TaskDialogResult.Close
         result = dialog.Show()
@@ -91,10 +113,11 @@ def main():
         try:
             if result == ui.TaskDialogResult.CommandLink1:  # Mark clashes and fade the rest
                 print("Marking all clashing elements and fading the rest...")
-                for elem_id in all_ids:  # fade all visible elements in the view
-                    view.SetElementOverrides(db.ElementId(elem_id), faded_overrides)
-                for elem_id in clashing_ids:  # emphasize the clashing elements
-                    view.SetElementOverrides(db.ElementId(elem_id), clashing_overrides)
+                mark_and_fade(doc, view, element_categories, clashing_ids)
+            elif result == ui.TaskDialogResult.CommandLink3:  # Mark new clashes and fade the rest
+                print("Marking new clashing elements and fading the rest...")
+                new_clashing_ids = set(elem_id for pair in clash_diff.new for elem_id in pair)
+                mark_and_fade(doc, view, element_categories, new_clashing_ids)
             elif result == ui.TaskDialogResult.CommandLink2:  # Hide all non-clashing elements
                 print("Hiding all non-clashing elements in the view temporarily...")
                 for elem_id in non_clashing_ids:  # hide alll non-clashing elements
@@ -111,43 +134,154 @@ def main():
         print("Nothing to do.")
 
 
-class InterferenceReportParser(HTMLParser):
-    """HTML parser for parsing Revit Interference CHeck reports."""
-
-    def __init__(self):
-        """Initializer."""
-        HTMLParser.__init__(self)
-        self.clashes = {}  # clash#: [itemA#, itemB#]
-        self.in_column = False
-        self.line_counter = -1  # 0 = header, 1...n = data
-        self.column_counter = 0  # 1 = id, 2 = item A, 3 = item B
-        self.current_data = []
-
-    def handle_starttag(self, tag, attrs):
-        """Start tag handler."""
-        if tag == "tr":  # enter line (row)
-            self.in_row = True
-            self.line_counter += 1
-        elif tag == "td":  # enter data column
-            self.in_column = True
-            self.column_counter += 1
-
-    def handle_endtag(self, tag):
-        """End tag handler."""
-        if tag == "tr":  # exit line (row)
-            self.in_row = False
-            self.column_counter = 0  # reset for next line
-            if self.line_counter > 0:
-                self.clashes[self.line_counter] = self.current_data  # save
-                self.current_data = []  # reset
-        elif tag == "td":  # exit data column
-            self.in_column = False
-
-    def handle_data(self, data):
-        """Data handler."""
-        if self.in_column and self.line_counter > 0 and self.column_counter > 1:
-            elem_id = int(data.split(":")[-1].strip().split(" ")[-1].strip())
-            self.current_data.append(elem_id)
+def diff_with_previous_report(report_path, index):
+    """Compare a clash index to the index of the newest older report in the report's folder.
+
+    Returns None if there is no readable previous index.
+    """
+    previous_index_path = clash_index.find_previous_index(report_path)
+    if previous_index_path is None:
+        return None
+    try:
+        previous_index = clash_index.ClashIndex.load(previous_index_path)
+    except (IOError, ValueError) as ex:
+        print("Ignoring previous clash index {path}: {ex}".format(path=previous_index_path, ex=ex))
+        return None
+    print("Comparing to previous clash index {path}...".format(path=previous_index_path))
+    return clash_index.diff(previous_index, index)
+
+
+def mark_and_fade(doc, view, element_categories, clashing_ids):
+    """Highlight the clashing elements of a view and fade all others."""
+    plan = plan_view_overrides(doc, view, element_categories, clashing_ids)
+    print("Applying overrides with {num} operations...".format(num=clash_overrides.operation_count(plan)))
+    apply_override_plan(doc, view, plan)
+    delete_unused_highlight_filters(doc)
+
+
+def plan_view_overrides(doc, view, element_categories, clashing_ids):
+    """Plan the overrides of a view, only element overrides if its view template controls them."""
+    marked_ids = load_marked_ids(view)
+    if is_template_controlled(doc, view):
+        return clash_overrides.plan_element_overrides(element_categories, clashing_ids, marked_ids)
+    filterable_category_ids = set(
+        category_id.IntegerValue for category_id in db.ParameterFilterUtilities.GetAllFilterableCategories())
+    return clash_overrides.plan_overrides(element_categories, clashing_ids, filterable_category_ids, marked_ids)
+
+
+def apply_override_plan(doc, view, plan):
+    """Fade and highlight the elements of a view as planned.
+
+    The filters of an earlier run are taken off the view first. The
+    highlight filter is added above the fade filter, so it takes precedence.
+    Highlight filters are shared by all views with the same highlights.
+    """
+    default_overrides = db.OverrideGraphicSettings()
+    for elem_id in plan.reset_element_ids:
+        view.SetElementOverrides(db.ElementId(elem_id), default_overrides)
+    if not is_template_controlled(doc, view):
+        for filter_id in view.GetFilters():
+            if doc.GetElement(filter_id).Name.startswith(FILTER_NAME_PREFIX):
+                view.RemoveFilter(filter_id)
+    if plan.highlight_filter_ids:
+        highlight_filter = get_highlight_filter(doc, plan.highlight_filter_ids)
+        view.AddFilter(highlight_filter.Id)
+        view.SetFilterOverrides(highlight_filter.Id, clashing_overrides)
+    if plan.fade_category_ids:
+        fade_filter = get_fade_filter(doc)
+        view.AddFilter(fade_filter.Id)
+        view.SetFilterOverrides(fade_filter.Id, faded_overrides)
+    for elem_id in plan.fade_element_ids:
+        view.SetElementOverrides(db.ElementId(elem_id), faded_overrides)
+    for elem_id in plan.highlight_element_ids:
+        view.SetElementOverrides(db.ElementId(elem_id), clashing_overrides)
+    save_marked_ids(view, clash_overrides.marked_element_ids(plan))
+
+
+def is_template_controlled(doc, view):
+    """Check if the view template of a view controls its V/G overrides or filters."""
+    if view.ViewTemplateId == db.ElementId.InvalidElementId:
+        return False
+    template = doc.GetElement(view.ViewTemplateId)
+    non_controlled_ids = set(
+        parameter_id.IntegerValue for parameter_id in template.GetNonControlledTemplateParameterIds())
+    return any(db.ElementId(parameter).IntegerValue not in non_controlled_ids for parameter in TEMPLATE_PARAMETERS)
+
+
+def get_highlight_filter(doc, element_ids):
+    """Get the selection filter of the given elements, named by a digest of their ids."""
+    digest = hashlib.sha1(",".join(str(elem_id) for elem_id in sorted(element_ids)).encode("ascii")).hexdigest()
+    name = HIGHLIGHT_FILTER_NAME.format(digest=digest[:12])
+    for selection_filter in get_tool_filters(doc, db.SelectionFilterElement):
+        if selection_filter.Name == name:
+            return selection_filter
+    selection_filter = db.SelectionFilterElement.Create(doc, name)
+    selection_filter.SetElementIds(List[db.ElementId]([db.ElementId(elem_id) for elem_id in element_ids]))
+    return selection_filter
+
+
+def get_fade_filter(doc):
+    """Get the rule-less filter passing all elements of all filterable categories, create it if needed."""
+    for fade_filter in get_tool_filters(doc, db.ParameterFilterElement):
+        if fade_filter.Name == FADE_FILTER_NAME:
+            return fade_filter
+    return db.ParameterFilterElement.Create(
+        doc, FADE_FILTER_NAME, db.ParameterFilterUtilities.GetAllFilterableCategories())
+
+
+def get_tool_filters(doc, filter_class):
+    """Get the filters of a class created by this tool."""
+    filters = db.FilteredElementCollector(doc)\
+                .OfClass(filter_class)\
+                .ToElements()
+    return [view_filter for view_filter in filters if view_filter.Name.startswith(FILTER_NAME_PREFIX)]
+
+
+def delete_unused_highlight_filters(doc):
+    """Delete the highlight selection filters of this tool (and its earlier versions) no view uses anymore."""
+    used_ids = set()
+    views = db.FilteredElementCollector(doc)\
+              .OfClass(db.View)\
+              .ToElements()
+    for view in views:
+        if view.AreGraphicsOverridesAllowed():
+            used_ids.update(filter_id.IntegerValue for filter_id in view.GetFilters())
+    unused_ids = [selection_filter.Id for selection_filter in get_tool_filters(doc, db.SelectionFilterElement)
+                  if selection_filter.Id.IntegerValue not in used_ids]
+    if unused_ids:
+        doc.Delete(List[db.ElementId](unused_ids))
+
+
+def get_marks_schema():
+    """Get the extensible storage schema of the ids marked with element overrides, create it if needed."""
+    schema = es.Schema.Lookup(MARKS_SCHEMA_GUID)
+    if schema is None:
+        builder = es.SchemaBuilder(MARKS_SCHEMA_GUID)
+        builder.SetSchemaName("MarkAllClashesMarkedElements")
+        builder.SetReadAccessLevel(es.AccessLevel.Public)
+        builder.SetWriteAccessLevel(es.AccessLevel.Public)
+        builder.AddArrayField(MARKS_FIELD_NAME, clr.GetClrType(db.ElementId))
+        schema = builder.Finish()
+    return schema
+
+
+def load_marked_ids(view):
+    """Get the ids of the elements of a view marked with element overrides by the last run."""
+    schema = es.Schema.Lookup(MARKS_SCHEMA_GUID)
+    if schema is None:
+        return set()
+    entity = view.GetEntity(schema)
+    if not entity.IsValid():
+        return set()
+    return set(element_id.IntegerValue for element_id in entity.Get[IList[db.ElementId]](MARKS_FIELD_NAME))
+
+
+def save_marked_ids(view, element_ids):
+    """Remember the ids of the elements of a view marked with element overrides."""
+    entity = es.Entity(get_marks_schema())
+    entity.Set[IList[db.ElementId]](
+        MARKS_FIELD_NAME, List[db.ElementId]([db.ElementId(elem_id) for elem_id in element_ids]))
+    view.SetEntity(entity)
 
 
 if __name__ == "__main__":
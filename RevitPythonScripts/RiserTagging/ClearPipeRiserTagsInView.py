@@ -1,17 +1,26 @@
-"""Clear all BHE_DE pipe riser tags in the current view."""
+"""Clear all BHE_DE pipe riser tags in the current view or in many views.
+
+The riser tags are filtered by their tag type in the element collector
+itself, so the tags of other families are never handed to Python.
+"""
 
 from __future__ import print_function
+import fnmatch
 import clr
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
 import Autodesk.Revit.DB as db
 import Autodesk.Revit.UI as ui
+from System.Collections.Generic import List
+import bulk_delete
+import tag_types
 
 __name = "ClearPipeRiserTagsInView.py"
-__version = "0.2b"
+__version = "0.5b"
 
 # Constants
-TAG_FAMILY_NAME = "BHE_DE_PipeTag_FlowArrow"
+DRY_RUN = False  # only count what would be deleted
+VIEW_NAME_PATTERN = "*Riser*"  # fnmatch pattern of the view names to clear in pattern mode
 
 
 def main():
@@ -20,51 +29,81 @@ def main():
     print("🐍 Running {name} version {ver}".format(name=__name, ver=__version))
 
     # STEP 0: Setup
-    app = __revit__.Application
     doc = __revit__.ActiveUIDocument.Document
-    uidoc = __revit__.ActiveUIDocument
     view = doc.ActiveView
 
-    # STEP 1: Get all pipe tags in the view
-    print("Getting all pipe tags from the view... ", end="")
-    tags = db.FilteredElementCollector(doc, view.Id)\
-             .OfCategory(db.BuiltInCategory.OST_PipeTags)\
-             .WhereElementIsNotElementType()\
-             .ToElements()
-    print("✔")
-    print("  ➜ Found {num} tags in the current view.".format(num=len(tags)))
-
-    # STEP 2: Filter for BHE_DE pipe riser tags
-    print("Filtering for pipe riser tags... ", end="")
-    riser_tags = []
-    for tag in tags:
-        tag_type = doc.GetElement(tag.GetTypeId())
-        tag_family_name = tag_type.get_Parameter(db.BuiltInParameter.SYMBOL_FAMILY_NAME_PARAM).AsString()
-        if tag_family_name == TAG_FAMILY_NAME:
-            riser_tags.append(tag)
+    # STEP 1: Ask the user for the views to clear
+    dialog = ui.TaskDialog(title="Clear Riser Tags")
+    dialog.MainInstruction = "Clear the pipe riser tags in..."
+    dialog.AddCommandLink(ui.TaskDialogCommandLinkId.CommandLink1, "the current view")
+    dialog.AddCommandLink(
+        ui.TaskDialogCommandLinkId.CommandLink2, "all views matching '{pattern}'".format(pattern=VIEW_NAME_PATTERN))
+    dialog.AddCommandLink(ui.TaskDialogCommandLinkId.CommandLink3, "all views of the project")
+    dialog.CommonButtons = ui.TaskDialogCommonButtons.Close
+    dialog.DefaultButton = ui.TaskDialogResult.Close
+    result = dialog.Show()
+    if result == ui.TaskDialogResult.CommandLink1:
+        view_ids = [view.Id]
+    elif result == ui.TaskDialogResult.CommandLink2:
+        view_ids = get_view_ids(doc, VIEW_NAME_PATTERN)
+    elif result == ui.TaskDialogResult.CommandLink3:
+        view_ids = None  # no view filter
+    else:
+        print("Nothing to do. 😑")
+        return ui.Result.Cancelled
+
+    # STEP 2: Get all BHE_DE pipe riser tags in the views
+    print("Getting all pipe riser tags from the views... ", end="")
+    riser_tag_filter = tag_types.get_registry(doc).riser_tag_filter()
+    if riser_tag_filter is None or view_ids == []:
+        print("\nNothing to do. 😑")
+        return ui.Result.Cancelled
+    collector = db.FilteredElementCollector(doc)\
+                  .OfCategory(db.BuiltInCategory.OST_PipeTags)\
+                  .WhereElementIsNotElementType()\
+                  .WherePasses(riser_tag_filter)
+    if view_ids is not None:
+        collector.WherePasses(owner_view_filter(view_ids))
+    riser_tag_ids = list(collector.ToElementIds())
     print("✔")
-    print("  ➜ Found {num} pipe riser tags in the current view.".format(num=len(riser_tags)))
+    print("  ➜ Found {num} pipe riser tags.".format(num=len(riser_tag_ids)))
 
     # STEP 3: Delete all BHE_DE pipe riser tags
-    if len(riser_tags) == 0:
+    if len(riser_tag_ids) == 0:
         print("Nothing to do. 😑")
         return ui.Result.Cancelled
-    print("Deleting all pipe riser tags from the view...", end="")
+    print("Deleting all pipe riser tags...", end="")
     transaction = db.Transaction(doc)
     transaction.Start("{name} - v{ver}".format(name=__name, ver=__version))
     try:
-        for riser_tag in riser_tags:
-            doc.Delete(riser_tag.Id)
+        result = bulk_delete.delete_elements(doc, riser_tag_ids, dry_run=DRY_RUN)
     except Exception as ex:
         print("\n✘ Exception:\n {ex}".format(ex=ex))
         transaction.RollBack()
         return ui.Result.Failed
     else:
         transaction.Commit()
-        print("✔\nDone. 😊")
+        print("✔")
+        print("  ➜ {summary}".format(summary=bulk_delete.summary(result, DRY_RUN)))
+        print("Done. 😊")
         return ui.Result.Succeeded
 
 
+def get_view_ids(doc, pattern):
+    """Get the ids of all non-template views whose names match a pattern."""
+    views = db.FilteredElementCollector(doc)\
+              .OfClass(db.View)\
+              .ToElements()
+    return [view.Id for view in views if not view.IsTemplate and fnmatch.fnmatch(view.Name, pattern)]
+
+
+def owner_view_filter(view_ids):
+    """Element filter passing the elements owned by any of the given views."""
+    if len(view_ids) == 1:
+        return db.ElementOwnerViewFilter(view_ids[0])
+    return db.LogicalOrFilter(List[db.ElementFilter]([db.ElementOwnerViewFilter(view_id) for view_id in view_ids]))
+
+
 if __name__ == "__main__":
     #__window__.Hide()
     result = main()
@@ -1,7 +1,10 @@
 """Color all pipe tags based on the color of the host's pipe system type.
 
 This script colors pipe riser tags based on the system override color of the
-tagged pipe.
+tagged pipe, in the current view or in all views of the project. Tags whose
+overrides already are exactly the color override (no halftone, line weight,
+patterns, ...) are skipped, so re-running it on unchanged views hardly
+changes anything.
 """
 
 from __future__ import print_function
@@ -10,12 +13,22 @@ clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
 import Autodesk.Revit.DB as db
 import Autodesk.Revit.UI as ui
+import tag_types
 
 __name = "ColorRiserTags.py"
-__version = "0.2b"
+__version = "0.4b"
 
-# Constants
-TAG_FAMILY_NAME = "BHE_DE_PipeTag_FlowArrow"
+OVERRIDE_PROPERTIES = (  # compared to find tags with the right overrides (missing ones are skipped)
+    "ProjectionLineColor", "ProjectionLinePatternId", "ProjectionLineWeight",
+    "CutLineColor", "CutLinePatternId", "CutLineWeight",
+    "ProjectionFillColor", "ProjectionFillPatternId", "IsProjectionFillPatternVisible",
+    "CutFillColor", "CutFillPatternId", "IsCutFillPatternVisible",
+    "SurfaceForegroundPatternColor", "SurfaceForegroundPatternId", "IsSurfaceForegroundPatternVisible",
+    "SurfaceBackgroundPatternColor", "SurfaceBackgroundPatternId", "IsSurfaceBackgroundPatternVisible",
+    "CutForegroundPatternColor", "CutForegroundPatternId", "IsCutForegroundPatternVisible",
+    "CutBackgroundPatternColor", "CutBackgroundPatternId", "IsCutBackgroundPatternVisible",
+    "Halftone", "Transparency", "DetailLevel",
+)
 
 
 def main():
@@ -27,51 +40,112 @@ def main():
     doc = __revit__.ActiveUIDocument.Document
     view = doc.ActiveView
 
-    # STEP 1: Get all the tags in the view
-    print("Getting all pipe tags from the view... ", end="")
-    tags = db.FilteredElementCollector(doc, view.Id)\
-             .OfCategory(db.BuiltInCategory.OST_PipeTags)\
-             .WhereElementIsNotElementType()\
-             .ToElements()
+    # STEP 1: Ask the user for the scope and get all the tags in it
+    dialog = ui.TaskDialog(title="Color Riser Tags")
+    dialog.MainInstruction = "Color the riser tags in..."
+    dialog.AddCommandLink(ui.TaskDialogCommandLinkId.CommandLink1, "the current view")
+    dialog.AddCommandLink(ui.TaskDialogCommandLinkId.CommandLink2, "all views of the project")
+    dialog.CommonButtons = ui.TaskDialogCommonButtons.Close
+    dialog.DefaultButton = ui.TaskDialogResult.Close
+    result = dialog.Show()
+    if result == ui.TaskDialogResult.CommandLink1:
+        collector = db.FilteredElementCollector(doc, view.Id)
+    elif result == ui.TaskDialogResult.CommandLink2:
+        collector = db.FilteredElementCollector(doc)
+    else:
+        print("Nothing to do. 😑")
+        return ui.Result.Cancelled
+    print("Getting all pipe tags... ", end="")
+    tags = collector.OfCategory(db.BuiltInCategory.OST_PipeTags)\
+                    .WhereElementIsNotElementType()\
+                    .ToElements()
     print("✔")
-    print("  ➜ Found {num} tags in the current view.".format(num=len(tags)))
+    print("  ➜ Found {num} tags.".format(num=len(tags)))
 
     # STEP 2: Filter for BHE_DE pipe riser tags
     print("Filtering for pipe riser tags... ", end="")
-    riser_tags = []
-    for tag in tags:
-        tag_type = doc.GetElement(tag.GetTypeId())
-        tag_family_name = tag_type.get_Parameter(db.BuiltInParameter.SYMBOL_FAMILY_NAME_PARAM).AsString()
-        if tag_family_name == TAG_FAMILY_NAME:
-            riser_tags.append(tag)
+    registry = tag_types.get_registry(doc)
+    riser_tags = [tag for tag in tags if registry.is_riser_tag_type(tag.GetTypeId())]
     print("✔")
-    print("  ➜ Found {num} pipe riser tags in the current view.".format(num=len(riser_tags)))
+    print("  ➜ Found {num} pipe riser tags.".format(num=len(riser_tags)))
 
     # STEP 3: Override tag color based on host system type color
-    print("Recoloring all tags in the view based on host system color... ", end="")
+    print("Recoloring all tags based on host system color... ", end="")
     transaction = db.Transaction(doc)
     transaction.Start("{name} - v{ver}".format(name=__name, ver=__version))
     try:
-        for riser_tag in riser_tags:
-            host = riser_tag.GetTaggedLocalElement()
-            system = host.MEPSystem
-            if system:
-                system_type = doc.GetElement(system.GetTypeId())
-                color = system_type.LineColor
-                override = db.OverrideGraphicSettings()
-                view.SetElementOverrides(riser_tag.Id, override)  # reset to default
-                override.SetProjectionLineColor(color)
-                view.SetElementOverrides(riser_tag.Id, override)
+        changed, unchanged = recolor_tags(doc, riser_tags)
     except Exception as ex:
         print("\n✘ Exception:\n {ex}".format(ex=ex))
         transaction.RollBack()
         return ui.Result.Failed
     else:
         transaction.Commit()
-        print("✔\nDone. 😊")
+        print("✔")
+        print("  ➜ Recolored {num} tags, {same} tags had the right color already.".format(
+            num=changed, same=unchanged))
+        print("Done. 😊")
         return ui.Result.Succeeded
 
 
+def recolor_tags(doc, riser_tags):
+    """Color riser tags in their views by their host's system type line color.
+
+    The override of every system type is created once per run. A tag is
+    only written to (with one call) if any of its current overrides differs
+    from the system type's override, i.e. the line color with defaults for
+    everything else. Returns the number of changed and unchanged tags.
+    """
+    overrides = {}  # system type id: (color key, override graphic settings)
+    views = {}  # view id: view
+    changed = unchanged = 0
+    for riser_tag in riser_tags:
+        host = riser_tag.GetTaggedLocalElement()
+        system = host.MEPSystem if host is not None else None
+        if not system:
+            continue
+        system_type_id = system.GetTypeId()
+        key = system_type_id.IntegerValue
+        if key not in overrides:
+            color = doc.GetElement(system_type_id).LineColor
+            override = db.OverrideGraphicSettings()
+            override.SetProjectionLineColor(color)
+            overrides[key] = (override_key(override), override)
+        target_key, override = overrides[key]
+        view_id = riser_tag.OwnerViewId
+        view = views.get(view_id.IntegerValue)
+        if view is None:
+            view = views[view_id.IntegerValue] = doc.GetElement(view_id)
+        if override_key(view.GetElementOverrides(riser_tag.Id)) == target_key:
+            unchanged += 1
+            continue
+        view.SetElementOverrides(riser_tag.Id, override)  # replaces all previous overrides of the tag
+        changed += 1
+    return changed, unchanged
+
+
+def override_key(override):
+    """Comparable key of all properties of override graphic settings."""
+    key = []
+    for name in OVERRIDE_PROPERTIES:
+        value = getattr(override, name, None)
+        if isinstance(value, db.Color):
+            value = color_key(value)
+        elif isinstance(value, db.ElementId):
+            value = value.IntegerValue
+        elif value is not None and not isinstance(value, (bool, int, float)):
+            value = str(value)  # enums like the detail level
+        key.append(value)
+    return tuple(key)
+
+
+def color_key(color):
+    """Comparable (red, green, blue) key of a color, None for invalid colors (no override)."""
+    if not color.IsValid:
+        return None
+    return (color.Red, color.Green, color.Blue)
+
+
 if __name__ == "__main__":
     #__window__.Hide()
     __result__ = main()
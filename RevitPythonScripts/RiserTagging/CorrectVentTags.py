@@ -1,41 +1,23 @@
 """Correct ventilation pipe riser tags.
 
-This script checks through all pipe riser tags in the current view
-and corrects them to ventilation style tags if the tagged pipes system
-is a ventilation system.
+This script checks through all pipe riser tags in the current view (or in
+the whole project) and corrects them to ventilation style tags if the tagged
+pipes system is a ventilation system. The tags are grouped by their target
+tag type and retyped with one call per target type.
 """
 
 from __future__ import print_function
+import collections
 import clr
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
 import Autodesk.Revit.DB as db
 import Autodesk.Revit.UI as ui
+from System.Collections.Generic import List
+import tag_types
 
 __name = "CorrectVentTags.py"
-__version = "0.2b"
-
-# Constants
-TAG_FAMILY_NAME = "BHE_DE_PipeTag_FlowArrow"
-TAG_TYPE_NAME_MAPPING = {  # hard coded tag names to use
-    "Steigleitung": TAG_FAMILY_NAME + " - Steigleitung",
-    "Fallleitung": TAG_FAMILY_NAME + " - Fallleitung",
-    "VonOben": TAG_FAMILY_NAME + " - VonOben",
-    "NachOben": TAG_FAMILY_NAME + " - NachOben",
-    "VonUnten": TAG_FAMILY_NAME + " - VonUnten",
-    "NachUnten": TAG_FAMILY_NAME + " - NachUnten",
-    "LüftungNachOben": TAG_FAMILY_NAME + " - LüftungNachOben",
-    "LüftungVonUnten": TAG_FAMILY_NAME + " - LüftungVonUnten",
-    "LüftungSteigleitung": TAG_FAMILY_NAME + " - LüftungSteigleitung",
-}
-REMAPPING = {
-    "NachOben": "LüftungNachOben",
-    "VonOben": "LüftungNachOben",
-    "NachUnten": "LüftungVonUnten",
-    "VonUnten": "LüftungVonUnten",
-    "Steigleitung": "LüftungSteigleitung",
-    "Fallleitung": "LüftungSteigleitung",
-}
+__version = "0.4b"
 
 
 def main():
@@ -49,58 +31,58 @@ def main():
 
     # STEP 1: Get all available Pipe Tags in the project
     print("Getting all available pipe tags from the model... ", end="")
-    tag_types = db.FilteredElementCollector(doc)\
-                  .OfCategory(db.BuiltInCategory.OST_PipeTags)\
-                  .WhereElementIsElementType()\
-                  .ToElements()
-    tag_types_mapping = {}  # tag_title: tag_type
-    for tag_type in tag_types:
-        tag_family_name = tag_type.get_Parameter(db.BuiltInParameter.SYMBOL_FAMILY_NAME_PARAM).AsString()
-        tag_type_name = tag_type.get_Parameter(db.BuiltInParameter.SYMBOL_NAME_PARAM).AsString()
-        full_tag_name = "{f_name} - {t_name}".format(f_name=tag_family_name, t_name=tag_type_name)
-        tag_types_mapping[full_tag_name] = tag_type
+    registry = tag_types.get_registry(doc)
     print("✔")
 
     # STEP 2: Check if setup tags actually exist in project
     print("Checking if expected tag family (and types) exist(s)... ", end="")
-    all_tags_available = True
-    for tag_name in TAG_TYPE_NAME_MAPPING.values():
-        if not tag_name in tag_types_mapping:
-            print("✘ Error: {tag_name} not available!".format(tag_name=tag_name))
-            all_tags_available = False
-    if not all_tags_available:
+    missing_tag_names = registry.missing_tag_names(tag_types.TAG_TYPE_NAME_MAPPING.keys())
+    for tag_name in missing_tag_names:
+        print("✘ Error: {tag_name} not available!".format(tag_name=tag_name))
+    if missing_tag_names:
         print("✘ Error: Not all required tags are available in the project! See above.")
         return ui.Result.Failed
     print("✔")
 
-    # STEP 3: Get all the tags in the view
-    tags_in_view = db.FilteredElementCollector(doc, view.Id)\
-                     .OfCategory(db.BuiltInCategory.OST_PipeTags)\
-                     .WhereElementIsNotElementType()\
-                     .ToElements()
+    # STEP 3: Ask the user for the scope and get all the tags in it
+    dialog = ui.TaskDialog(title="Correct Ventilation Tags")
+    dialog.MainInstruction = "Correct the riser tags of ventilation pipes in..."
+    dialog.AddCommandLink(ui.TaskDialogCommandLinkId.CommandLink1, "the current view")
+    dialog.AddCommandLink(ui.TaskDialogCommandLinkId.CommandLink2, "all views of the project")
+    dialog.CommonButtons = ui.TaskDialogCommonButtons.Close
+    dialog.DefaultButton = ui.TaskDialogResult.Close
+    result = dialog.Show()
+    if result == ui.TaskDialogResult.CommandLink1:
+        collector = db.FilteredElementCollector(doc, view.Id)
+    elif result == ui.TaskDialogResult.CommandLink2:
+        collector = db.FilteredElementCollector(doc)
+    else:
+        print("Nothing to do. 😑")
+        return ui.Result.Cancelled
+    print("Getting all pipe tags... ", end="")
+    tags = collector.OfCategory(db.BuiltInCategory.OST_PipeTags)\
+                    .WhereElementIsNotElementType()\
+                    .ToElements()
+    print("✔")
+    print("  ➜ Found {num} pipe tags.".format(num=len(tags)))
 
-    # STEP 4: Change all tags on vent pipes to vent tags
+    # STEP 4: Find the tags on vent pipes grouped by their target tag type
+    print("Finding pipe riser tags tagging vent pipes... ", end="")
+    retypes = plan_vent_retypes(doc, tags, registry)
+    print("✔")
+    for target, tag_ids in retypes.items():
+        print("  ➜ Found {num} tags to change to '{target}'.".format(num=len(tag_ids), target=target))
+    if not retypes:
+        print("Nothing to do. 😑")
+        return ui.Result.Cancelled
+
+    # STEP 5: Change all tags on vent pipes to vent tags
     print("Changing all pipe riser tags tagging vent pipes.... ", end="")
     transaction = db.Transaction(doc)
     transaction.Start("{name} - v{ver}".format(name=__name, ver=__version))
     try:
-        for tag in tags_in_view:
-            host = tag.GetTaggedLocalElement()
-            system = host.MEPSystem
-            if system:
-                system_type = doc.GetElement(system.GetTypeId())
-                system_classification = system_type.SystemClassification
-                if system_classification == db.MEPSystemClassification.Vent:
-                    tag_type = doc.GetElement(tag.GetTypeId())
-                    tag_family_name = tag_type.get_Parameter(db.BuiltInParameter.SYMBOL_FAMILY_NAME_PARAM).AsString()
-                    tag_type_name = tag_type.get_Parameter(db.BuiltInParameter.SYMBOL_NAME_PARAM).AsString()
-                    if not tag_family_name == TAG_FAMILY_NAME:  # other kind of tag, dont bother
-                        continue
-                    if tag_type_name not in REMAPPING:  # tag type already good or not in remapping
-                        continue
-                    target = REMAPPING[tag_type_name]
-                    target_type_id = tag_types_mapping[TAG_TYPE_NAME_MAPPING[target]].Id
-                    tag.ChangeTypeId(target_type_id)
+        for target, tag_ids in retypes.items():
+            db.Element.ChangeTypeId(doc, List[db.ElementId](tag_ids), registry.riser_tag_type_id(target))
     except Exception as ex:
         print("\n✘ Exception:\n {ex}".format(ex=ex))
         transaction.RollBack()
@@ -111,6 +93,34 @@ def main():
         return ui.Result.Succeeded
 
 
+def plan_vent_retypes(doc, tags, registry):
+    """Group the riser tags of vent pipes to retype by their target tag type name.
+
+    The tag type of a tag is checked first (a dict lookup in the registry),
+    the host's system is only looked at for riser tags with a ventilation
+    variant and the classification of every system type is read only once.
+    """
+    is_vent_system_type = {}  # system type id: bool
+    retypes = collections.defaultdict(list)  # target tag type name: [tag id, ...]
+    for tag in tags:
+        tag_family_name, tag_type_name = registry.family_and_type_name(tag.GetTypeId())
+        if not tag_family_name == tag_types.TAG_FAMILY_NAME:  # other kind of tag, dont bother
+            continue
+        if tag_type_name not in tag_types.REMAPPING:  # tag type already good or not in remapping
+            continue
+        host = tag.GetTaggedLocalElement()
+        system = host.MEPSystem if host is not None else None
+        if not system:
+            continue
+        system_type_id = system.GetTypeId()
+        key = system_type_id.IntegerValue
+        if key not in is_vent_system_type:
+            system_classification = doc.GetElement(system_type_id).SystemClassification
+            is_vent_system_type[key] = system_classification == db.MEPSystemClassification.Vent
+        if is_vent_system_type[key]:
+            retypes[tag_types.REMAPPING[tag_type_name]].append(tag.Id)
+    return retypes
+
 if __name__ == "__main__":
     #__window__.Hide()
     __result__ = main()
@@ -0,0 +1,178 @@
+"""Tag all vertical risers in all (selected) plan views of the project.
+
+This script does what TagRisersInView.py does for the current view for all
+floor plan views matching the configured name pattern, levels and
+disciplines in one run. The vertical pipes of the whole model are collected
+and categorized only once and indexed by their elevation range, so every
+view only looks at the pipes crossing its view range, of which only the ones
+visible in the view are tagged. A view failing to be tagged is rolled back
+on its own and reported, the other views are still tagged.
+"""
+
+from __future__ import print_function
+import fnmatch
+import clr
+clr.AddReference('RevitAPI')
+clr.AddReference('RevitAPIUI')
+import Autodesk.Revit.DB as db
+import Autodesk.Revit.UI as ui
+from System.Collections.Generic import List
+import pipe_geometry
+import riser_categories
+import tag_types
+from interval_index import IntervalIndex
+import TagRisersInView
+
+__name = "TagRisersInProject.py"
+__version = "0.2b"
+
+# Constants
+VIEW_NAME_PATTERN = "*"  # fnmatch pattern of the view names to tag
+LEVEL_NAMES = []  # names of the levels whose plans to tag, empty for all levels
+DISCIPLINES = []  # names of the view disciplines to tag (e.g. "Mechanical", "Plumbing"), empty for all
+
+
+def main():
+    """Main Script. """
+
+    print("🐍 Running {fname} version {ver}...".format(fname=__name, ver=__version))
+
+    # STEP 0: Setup
+    doc = __revit__.ActiveUIDocument.Document
+
+    # STEP 1: Get all available Pipe Tags in the project and check the required ones exist
+    print("Getting all available pipe tags from the model...", end="")
+    registry = tag_types.get_registry(doc)
+    print("✔")
+    print("Checking if expected tag family (and types) exist(s)... ", end="")
+    missing_tag_names = registry.missing_tag_names(tag_types.RISER_TYPE_NAMES)
+    for tag_name in missing_tag_names:
+        print("✘ Error: {tag_name} not available!".format(tag_name=tag_name))
+    if missing_tag_names:
+        print("✘ Error: Not all required tags are available in the project! See above.")
+        return ui.Result.Failed
+    print("✔")
+
+    # STEP 2: Get all plan views to tag
+    print("Getting all plan views to tag... ", end="")
+    views = get_plan_views(doc)
+    print("✔")
+    print("  ➜ Found {num} plan views to tag.".format(num=len(views)))
+    if not views:
+        print("Nothing to do. 😑")
+        return ui.Result.Cancelled
+
+    # STEP 3: Get all vertical pipes in the model (once)
+    print("Getting all vertical pipes from the model... ", end="")
+    pipes = db.FilteredElementCollector(doc)\
+              .OfCategory(db.BuiltInCategory.OST_PipeCurves)\
+              .WhereElementIsNotElementType()\
+              .ToElements()
+    records = [TagRisersInView.read_pipe_record(pipe) for pipe in pipes]
+    good_records = [record for record in records if not riser_categories.is_weird(record)]
+    classes = pipe_geometry.classify_segments(
+        [record.start for record in good_records], [record.end for record in good_records])
+    vertical_records = [record for record, segment_class in zip(good_records, classes)
+                        if segment_class == pipe_geometry.VERTICAL]
+    print("✔")
+    print("  ➜ Found {num} vertical pipes ({weird} weird pipes skipped) in the model.".format(
+        num=len(vertical_records), weird=len(records) - len(good_records)))
+
+    # STEP 4: Index the vertical pipes by their elevation range
+    print("Indexing vertical pipes by elevation... ", end="")
+    index = IntervalIndex(
+        (min(record.start[2], record.end[2]), max(record.start[2], record.end[2]), record)
+        for record in vertical_records)
+    print("✔")
+
+    # STEP 5: Categorize and tag the pipes in every view
+    print("Creating tags... ")
+    failed_views = []
+    transaction_group = db.TransactionGroup(doc, "{name} - v{ver}".format(name=__name, ver=__version))
+    transaction_group.Start()
+    try:
+        for number, view in enumerate(views, start=1):
+            top, bottom = TagRisersInView.top_and_bottom_elevation(doc, view)
+            in_view = crop_box_filter(view)
+            candidates = visible_records(
+                doc, view, [record for record in index.overlapping(bottom, top) if in_view(record)])
+            categorized_records, _ = riser_categories.categorize_pipes(candidates, top, bottom)
+            tag_count = sum(len(category_records) for category_records in categorized_records.values())
+            print("  ➜ [{num}/{total}] Tagging {tags} pipes in '{name}'... ".format(
+                num=number, total=len(views), tags=tag_count, name=view.Name), end="")
+            transaction = db.Transaction(doc, "Tag risers in {name}".format(name=view.Name))
+            transaction.Start()
+            try:
+                reconciliation = TagRisersInView.tag_pipes(doc, view, categorized_records, registry, top)
+            except Exception as ex:  # skip this view, keep the others
+                transaction.RollBack()
+                failed_views.append(view.Name)
+                print("✘ Exception:\n {ex}".format(ex=ex))
+                continue
+            transaction.Commit()
+            print("✔ {summary}".format(summary=TagRisersInView.reconciliation_summary(reconciliation)))
+    except Exception as ex:
+        print("\n✘ Exception:\n {ex}".format(ex=ex))
+        transaction_group.RollBack()
+        return ui.Result.Failed
+    else:
+        transaction_group.Assimilate()
+        if failed_views:
+            print("✘ Failed to tag {num} views (rolled back): {names}".format(
+                num=len(failed_views), names=", ".join(failed_views)))
+            return ui.Result.Failed
+        print("Done. 😊")
+        return ui.Result.Succeeded
+
+
+# Helpers:
+def get_plan_views(doc):
+    """Get all floor plan views matching the configured name pattern, levels and disciplines."""
+    views = db.FilteredElementCollector(doc)\
+              .OfClass(db.ViewPlan)\
+              .ToElements()
+    plan_views = []
+    for view in views:
+        if view.IsTemplate or view.ViewType != db.ViewType.FloorPlan or view.GenLevel is None:
+            continue
+        if not fnmatch.fnmatch(view.Name, VIEW_NAME_PATTERN):
+            continue
+        if LEVEL_NAMES and view.GenLevel.Name not in LEVEL_NAMES:
+            continue
+        if DISCIPLINES and str(view.Discipline) not in DISCIPLINES:
+            continue
+        plan_views.append(view)
+    return sorted(plan_views, key=lambda view: (view.GenLevel.ProjectElevation, view.Name))
+
+
+def visible_records(doc, view, records):
+    """Get the pipe records whose pipes are visible in a view (V/G, filters, worksets, phases, ...)."""
+    if not records:
+        return []
+    candidate_ids = List[db.ElementId]([record.element.Id for record in records])
+    visible_ids = db.FilteredElementCollector(doc, candidate_ids)\
+                    .WherePasses(db.VisibleInViewFilter(doc, view.Id))\
+                    .ToElementIds()
+    visible = set(element_id.IntegerValue for element_id in visible_ids)
+    return [record for record in records if record.element.Id.IntegerValue in visible]
+
+
+def crop_box_filter(view):
+    """Get a function checking if a pipe record lies within the crop box of a view (in plan).
+
+    The crop box is approximated by its axis aligned extents in model coordinates.
+    """
+    if not view.CropBoxActive:
+        return lambda record: True
+    crop_box = view.CropBox
+    corners = [crop_box.Transform.OfPoint(point) for point in (crop_box.Min, crop_box.Max)]
+    min_x, max_x = min(p.X for p in corners), max(p.X for p in corners)
+    min_y, max_y = min(p.Y for p in corners), max(p.Y for p in corners)
+    return lambda record: min_x <= record.start[0] <= max_x and min_y <= record.start[1] <= max_y
+
+
+if __name__ == "__main__":
+    #__window__.Hide()
+    result = main()
+    # if result == ui.Result.Succeeded:
+    #     __window__.Close()
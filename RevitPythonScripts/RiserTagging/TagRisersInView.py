@@ -7,29 +7,39 @@ default.
 After categorization the script places pipe riser tags at the pipes based on the
 acquired information. It therefor uses a hardcoded mapping of categories to
 annotation symbol family types.
+In reconcile mode the riser tags already in the view are kept if they are
+correct (or their ventilation variant), retyped if they are wrong and deleted
+if they are orphaned or duplicates, so only untagged pipes get new tags.
+New tags are placed next to their pipe with a leader where they would
+overlap other tags in the view.
 """
 
 from __future__ import print_function
-import math
 import clr
 clr.AddReference('RevitAPI')
 clr.AddReference('RevitAPIUI')
 import Autodesk.Revit.DB as db
 import Autodesk.Revit.UI as ui
+import bulk_delete
+import pipe_geometry
+import riser_categories
+import tag_placement
+import tag_reconcile
+import tag_types
 
 __name = "TagRisersInView.py"
-__version = "0.3b"
+__version = "0.7b"
 
 # Constants
+RECONCILE = True  # reconcile with the existing riser tags instead of adding tags to all pipes
 FEET_TO_METER = 0.3048  # meter/feet
-TAG_FAMILY_NAME = "BHE_DE_PipeTag_FlowArrow"
-TAG_TYPE_NAME_MAPPING = {  # hard coded tag names to use
-    "Steigleitung": TAG_FAMILY_NAME + " - Steigleitung",
-    "Fallleitung": TAG_FAMILY_NAME + " - Fallleitung",
-    "VonOben": TAG_FAMILY_NAME + " - VonOben",
-    "NachOben": TAG_FAMILY_NAME + " - NachOben",
-    "VonUnten": TAG_FAMILY_NAME + " - VonUnten",
-    "NachUnten": TAG_FAMILY_NAME + " - NachUnten",
+TAG_SIZE = 6 / 304.8  # feet, size of a riser tag on paper (6 mm)
+VENT_VARIANTS = {  # tag type name: accepted ventilation variants of it
+    type_name: {vent_type_name} for type_name, vent_type_name in tag_types.REMAPPING.items()}
+FLOW_DIRECTIONS = {  # connector flow directions as used by riser_categories
+    db.FlowDirectionType.In: riser_categories.FLOW_IN,
+    db.FlowDirectionType.Out: riser_categories.FLOW_OUT,
+    db.FlowDirectionType.Bidirectional: riser_categories.FLOW_BIDIRECTIONAL,
 }
 
 
@@ -44,26 +54,15 @@ def main():
 
     # STEP 1: Get all available Pipe Tags in the project
     print("Getting all available pipe tags from the model...", end="")
-    tag_types = db.FilteredElementCollector(doc)\
-                  .OfCategory(db.BuiltInCategory.OST_PipeTags)\
-                  .WhereElementIsElementType()\
-                  .ToElements()
+    registry = tag_types.get_registry(doc)
     print("✔")
-    tags = {}  # tag_title: tag_type
-    for tag_type in tag_types:
-        tag_family_name = tag_type.get_Parameter(db.BuiltInParameter.SYMBOL_FAMILY_NAME_PARAM).AsString()
-        tag_type_name = tag_type.get_Parameter(db.BuiltInParameter.SYMBOL_NAME_PARAM).AsString()
-        full_tag_name = "{f_name} - {t_name}".format(f_name=tag_family_name, t_name=tag_type_name)
-        tags[full_tag_name] = tag_type
 
     # STEP 2: Check if setup tags actually exist in project
     print("Checking if expected tag family (and types) exist(s)... ", end="")
-    all_tags_available = True
-    for tag_name in TAG_TYPE_NAME_MAPPING.values():
-        if not tag_name in tags:
-            print("✘ Error: {tag_name} not available!".format(tag_name=tag_name))
-            all_tags_available = False
-    if not all_tags_available:
+    missing_tag_names = registry.missing_tag_names(tag_types.RISER_TYPE_NAMES)
+    for tag_name in missing_tag_names:
+        print("✘ Error: {tag_name} not available!".format(tag_name=tag_name))
+    if missing_tag_names:
         print("✘ Error: Not all required tags are available in the project! See above.")
         return ui.Result.Failed
     print("✔")
@@ -74,25 +73,29 @@ def main():
         print("✘ Error: Currently active view is not a plan view!")
         return ui.Result.Failed
             
-    # STEP 4: Get all pipes in the view
+    # STEP 4: Get all pipes in the view and read their geometry and flow data
     print("Getting all pipes from the currently active view... ", end="")
     pipes = db.FilteredElementCollector(doc, view.Id)\
               .OfCategory(db.BuiltInCategory.OST_PipeCurves)\
               .ToElements()
+    records = [read_pipe_record(pipe) for pipe in pipes]
     print("✔")
-    print("  ➜ Found {num} pipes in the currently active view.".format(num=len(pipes)))
+    print("  ➜ Found {num} pipes in the currently active view.".format(num=len(records)))
 
     # STEP 5: Filter out all "weird" pipes with more or less than 2 connectors
     print("Filtering out weird pipes... ", end="")
-    good_pipes = [pipe for pipe in pipes if not is_weird(pipe)]
+    good_records = [record for record in records if not riser_categories.is_weird(record)]
     print("✔")
-    print("  ➜ Found {num} weird pipes in the view.".format(num=len(pipes)-len(good_pipes)))
+    print("  ➜ Found {num} weird pipes in the view.".format(num=len(records)-len(good_records)))
 
     # STEP 6: Filter for vertical pipes
     print("Filtering vertical pipes... ", end="")
-    vertical_pipes = [pipe for pipe in good_pipes if is_vertical(pipe)]
+    classes = pipe_geometry.classify_segments(
+        [record.start for record in good_records], [record.end for record in good_records])
+    vertical_records = [record for record, segment_class in zip(good_records, classes)
+                        if segment_class == pipe_geometry.VERTICAL]
     print("✔")
-    print("  ➜ Found {num} vertical pipes in the view.".format(num=len(vertical_pipes)))
+    print("  ➜ Found {num} vertical pipes in the view.".format(num=len(vertical_records)))
 
     # STEP 7: Get the top and bottom view range elevations
     print("Finding views boundary elevations... ", end="")
@@ -103,126 +106,40 @@ def main():
 
     # STEP 8: Categorize pipes according to location and flow
     print("Categorizing vertical pipes... ", end="")
-    categorized_pipes, _ = categorize_pipes(vertical_pipes, top, bottom)
+    categorized_records, _ = riser_categories.categorize_pipes(vertical_records, top, bottom)
     print("✔")
-    for category, pipes in categorized_pipes.items():
-        print("  ➜ Found {num} pipes in category '{cat}'".format(num=len(pipes), cat=category))
+    for category, records in categorized_records.items():
+        print("  ➜ Found {num} pipes in category '{cat}'".format(num=len(records), cat=category))
 
     # STEP 9: Place tags at the pipes
     print("Creating tags... ", end="")
     transaction = db.Transaction(doc)
     transaction.Start("{name} - v{ver}".format(name=__name, ver=__version))
     try:
-        for category, pipes in categorized_pipes.items():
-            tag_type_id = tags[TAG_TYPE_NAME_MAPPING[category]].Id
-            for pipe in pipes:
-                point = pipe_location(pipe, top)
-                new_tag = db.IndependentTag.Create(doc, view.Id, db.Reference(pipe), False, db.TagMode.TM_ADDBY_CATEGORY, db.TagOrientation.Horizontal, point)
-                new_tag.ChangeTypeId(tag_type_id)
+        reconciliation = tag_pipes(doc, view, categorized_records, registry, top)
     except Exception as ex:
         print("\n✘ Exception:\n {ex}".format(ex=ex))
         transaction.RollBack()
         return ui.Result.Failed
     else:
         transaction.Commit()
-        print("✔\nDone. 😊")
+        print("✔")
+        print("  ➜ {summary}".format(summary=reconciliation_summary(reconciliation)))
+        print("Done. 😊")
         return ui.Result.Succeeded
 
 
 # Helpers:
-def get_connectors(pipe):
-    """Get all the connector elements of a pipe.
-    
-    The length of this list is usually 2, but there have been incidents where this list
-    was seen to have three connectors for a single pipe!
-    """
-    connector_set = pipe.ConnectorManager.Connectors
-    connectors = [connector for connector in connector_set.GetEnumerator()]
-    return connectors
-
-def categorize_pipes(vertical_pipes, top, bottom):
-    """Categorize vertical pipes based on location in the view and flow.
-
-    Default to assuming downward flow (gravity) when no flow information is
-    available for the investigated pipe element.
-    """
-    categorized_pipes = {key: [] for key in TAG_TYPE_NAME_MAPPING.keys()}
-    uncategorized_pipes = []
-    for pipe in vertical_pipes:
-        connectors = get_connectors(pipe)
-        if any([connector.Direction == db.FlowDirectionType.Bidirectional for connector in connectors]):
-            start, end = get_high_low(pipe)
-        else:
-            start, end = get_in_out(pipe)
-        if start >= end:  # → pipe going down
-            if start >= top and bottom >= end:
-                categorized_pipes["Fallleitung"].append(pipe)
-            elif start >= top and top >= end >= bottom:
-                categorized_pipes["VonOben"].append(pipe)
-            elif top >= start >= bottom and bottom >= end:
-                categorized_pipes["NachUnten"].append(pipe)
-            else:  # pipe does not extend out of the view range
-                uncategorized_pipes.append(pipe)
-        else:  # start < end --> pipe going up
-            if end >= top and bottom >= start:
-                categorized_pipes["Steigleitung"].append(pipe)
-            elif end >= top and top >= start >= bottom:
-                categorized_pipes["NachOben"].append(pipe)
-            elif top >= end >= bottom and bottom >= start:
-                categorized_pipes["VonUnten"].append(pipe)
-            else:  # pipe does not extend out of the view range
-                uncategorized_pipes.append(pipe)
-    return categorized_pipes, uncategorized_pipes
-
-def get_in_out(pipe):
-    """Get the inflow and the outflow elevations from two arbitrary points."""
-    first, second = get_connectors(pipe)  # assert len(connectors) == 2
-    direction1, direction2 = first.Direction, second.Direction
-    if direction1 == db.FlowDirectionType.In and direction2 == db.FlowDirectionType.Out:
-        inflow = first.Origin.Z
-        outflow = second.Origin.Z
-    elif direction1 == db.FlowDirectionType.Out and direction2 == db.FlowDirectionType.In:
-        inflow = second.Origin.Z
-        outflow = first.Origin.Z
-    else:  # some connector is bidirectional or both are equal, use high/low
-        inflow, outflow = get_high_low(pipe)
-    return inflow, outflow
-
-# TODO: reformulate this in terms of Curve Location points rather than connector origins
-def get_high_low(pipe):
-    """Get the higher and the lower elevations from two arbitrary points."""
-    #first, second = get_points(pipe)#get_connectors(pipe)  # assert len(connectors) == 2
-    point1, point2 = get_points(pipe)#first.Origin, second.Origin
-    high = max(point1.Z, point2.Z)
-    low = min(point1.Z, point2.Z)
-    return high, low
-
-def get_points(pipe):
-    """Get the start and end point of a pipe."""
+def read_pipe_record(pipe):
+    """Read the geometry and flow data of a pipe into a record (in one go)."""
     curve = pipe.Location.Curve
     point0 = curve.GetEndPoint(0)
     point1 = curve.GetEndPoint(1)
-    return point0, point1
-
-def is_vertical(pipe, tolerance=1):
-    """Check if a pipe is vertical (within the given angle tolerance)."""
-    point1, point2 = get_points(pipe)
-    dz = abs(point1.Z - point2.Z)
-    if dz:  # is not horizontal
-        dx = abs(point1.X - point2.X)
-        dy = abs(point1.Y - point2.Y)
-        dxy = math.sqrt(dx ** 2 + dy ** 2)
-        alpha = math.degrees(math.atan2(dxy, dz))
-        if alpha < tolerance:
-            return True  # is vertical
-    return False  # is not vertical
-
-def is_weird(pipe):
-    """Figure out if a pipe has a weird number of connectors."""
-    connectors = get_connectors(pipe)
-    if len(connectors) != 2:
-        return True  # is weird
-    return False  # is not weird
+    connector_flows = tuple(
+        (FLOW_DIRECTIONS[connector.Direction], connector.Origin.Z)
+        for connector in pipe.ConnectorManager.Connectors)
+    return riser_categories.PipeRecord(
+        pipe, (point0.X, point0.Y, point0.Z), (point1.X, point1.Y, point1.Z), connector_flows)
 
 def top_and_bottom_elevation(doc, view):
     """Extract top and bottom elevation of a plan view.
@@ -251,14 +168,78 @@ def top_and_bottom_elevation(doc, view):
     return top_elevation, bottom_elevation
 
 
-def pipe_location(pipe, elevation):
-    """Returns the intersetion point of the pipe with the elevation."""
-    # Assuming the pipe is perfectly vertical for now
-    curve = pipe.Location.Curve
-    pipe_point = curve.GetEndPoint(0)
-    point = db.XYZ(pipe_point.X, pipe_point.Y, elevation)
-    return point
+def tag_pipes(doc, view, categorized_records, registry, elevation):
+    """Tag the categorized pipes of a view at the given elevation.
 
+    In reconcile mode only the difference to the riser tags already in the
+    view is applied. Returns the applied tag_reconcile.Reconciliation.
+    """
+    records = {}  # pipe id: record
+    desired = {}  # pipe id: tag type name
+    for category, category_records in categorized_records.items():
+        for record in category_records:
+            pipe_id = record.element.Id.IntegerValue
+            records[pipe_id] = record
+            desired[pipe_id] = category
+    existing = get_existing_riser_tags(doc, view, registry) if RECONCILE else []
+
+    def retype_target(existing_type_name, type_name):
+        """Keep ventilation tags ventilation tags when retyping them."""
+        vent_type_name = tag_types.REMAPPING.get(type_name)
+        if existing_type_name in tag_types.VENT_TYPE_NAMES and registry.riser_tag_type_id(vent_type_name):
+            return vent_type_name
+        return type_name
+
+    reconciliation = tag_reconcile.reconcile_tags(desired, existing, VENT_VARIANTS, retype_target)
+    bulk_delete.delete_elements(doc, [db.ElementId(tag_id) for tag_id in reconciliation.delete])
+    for tag_id, type_name in reconciliation.retype:
+        doc.GetElement(db.ElementId(tag_id)).ChangeTypeId(registry.riser_tag_type_id(type_name))
+    tag_size = TAG_SIZE * view.Scale
+    placements = tag_placement.place_tags(
+        [records[pipe_id].start[:2] for pipe_id, _ in reconciliation.create],  # assuming perfectly vertical pipes
+        tag_size, tag_size, get_tag_boxes(doc, view))
+    for (pipe_id, type_name), placement in zip(reconciliation.create, placements):
+        x, y = placement.point
+        point = db.XYZ(x, y, elevation)
+        new_tag = db.IndependentTag.Create(doc, view.Id, db.Reference(records[pipe_id].element), placement.leader, db.TagMode.TM_ADDBY_CATEGORY, db.TagOrientation.Horizontal, point)
+        new_tag.ChangeTypeId(registry.riser_tag_type_id(type_name))
+    return reconciliation
+
+
+def get_tag_boxes(doc, view):
+    """Get the plan boxes (min x, min y, max x, max y) of all tags in a view."""
+    tags_in_view = db.FilteredElementCollector(doc, view.Id)\
+                     .OfClass(db.IndependentTag)\
+                     .ToElements()
+    boxes = []
+    for tag in tags_in_view:
+        box = tag.get_BoundingBox(view)
+        if box is not None:
+            boxes.append((box.Min.X, box.Min.Y, box.Max.X, box.Max.Y))
+    return boxes
+
+
+def get_existing_riser_tags(doc, view, registry):
+    """Get the riser tags in a view as tag_reconcile.ExistingTag records."""
+    tags_in_view = db.FilteredElementCollector(doc, view.Id)\
+                     .OfCategory(db.BuiltInCategory.OST_PipeTags)\
+                     .WhereElementIsNotElementType()\
+                     .ToElements()
+    existing = []
+    for tag in tags_in_view:
+        family_name, type_name = registry.family_and_type_name(tag.GetTypeId())
+        host_id = tag.TaggedLocalElementId
+        if family_name != tag_types.TAG_FAMILY_NAME or host_id == db.ElementId.InvalidElementId:  # not ours or linked
+            continue
+        existing.append(tag_reconcile.ExistingTag(tag.Id.IntegerValue, host_id.IntegerValue, type_name))
+    return existing
+
+
+def reconciliation_summary(reconciliation):
+    """Summarize the changes of a reconciliation."""
+    return "Created {new}, retyped {re} and deleted {old} tags, {same} tags were fine already.".format(
+        new=len(reconciliation.create), re=len(reconciliation.retype),
+        old=len(reconciliation.delete), same=reconciliation.unchanged)
 
 if __name__ == "__main__":
     #__window__.Hide()
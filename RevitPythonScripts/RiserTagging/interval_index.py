@@ -0,0 +1,82 @@
+"""Static interval index for finding pipes by their elevation range.
+
+The index is a centered interval tree: every node keeps the intervals
+containing its center, sorted by their lower and by their upper bound, and
+the intervals entirely below or above the center go to its child nodes.
+Finding all intervals overlapping a query range costs O(log n + k) for k
+results, so matching the vertical pipes of a whole model against the view
+ranges of many plan views scales with the number of pipes rather than with
+views x pipes. This module does not depend on the Revit API.
+"""
+
+
+class IntervalIndex(object):
+    """Index of (low, high, item) intervals."""
+
+    def __init__(self, intervals):
+        """Initializer."""
+        self.root = build_node(list(intervals))
+
+    def overlapping(self, low, high):
+        """Items of all intervals overlapping the closed range [low, high]."""
+        items = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            if high < node.center:  # intervals of the node start at or below the center
+                for interval in node.by_low:
+                    if interval[0] > high:
+                        break
+                    items.append(interval[2])
+                if node.below is not None:
+                    stack.append(node.below)
+            elif low > node.center:  # intervals of the node end at or above the center
+                for interval in node.by_high:
+                    if interval[1] < low:
+                        break
+                    items.append(interval[2])
+                if node.above is not None:
+                    stack.append(node.above)
+            else:  # the range contains the center and so overlaps all intervals of the node
+                items.extend(interval[2] for interval in node.by_low)
+                if node.below is not None:
+                    stack.append(node.below)
+                if node.above is not None:
+                    stack.append(node.above)
+        return items
+
+
+class Node(object):
+    """Node of an interval tree."""
+
+    __slots__ = ("center", "by_low", "by_high", "below", "above")
+
+    def __init__(self, center, by_low, by_high, below, above):
+        """Initializer."""
+        self.center = center
+        self.by_low = by_low  # intervals containing the center sorted by ascending low
+        self.by_high = by_high  # the same intervals sorted by descending high
+        self.below = below  # node of the intervals entirely below the center
+        self.above = above  # node of the intervals entirely above the center
+
+
+def build_node(intervals):
+    """Build an interval tree node of (low, high, item) intervals, None if there are none."""
+    if not intervals:
+        return None
+    bounds = sorted(bound for interval in intervals for bound in interval[:2])
+    center = bounds[len(bounds) // 2]
+    below, containing, above = [], [], []
+    for interval in intervals:
+        if interval[1] < center:
+            below.append(interval)
+        elif interval[0] > center:
+            above.append(interval)
+        else:
+            containing.append(interval)
+    return Node(
+        center,
+        sorted(containing, key=lambda interval: interval[0]),
+        sorted(containing, key=lambda interval: interval[1], reverse=True),
+        build_node(below),
+        build_node(above))
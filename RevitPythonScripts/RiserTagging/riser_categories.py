@@ -0,0 +1,96 @@
+"""Categorization of vertical pipes for pipe riser tagging.
+
+The pipe data needed for categorizing is read from Revit once per pipe into
+a compact PipeRecord: the end points of the pipe's location curve and the
+flow directions and elevations of its connectors. Filtering weird pipes
+and categorizing vertical pipes by flow and by location in the view range
+then run on the records only (see pipe_geometry for finding the vertical
+pipes). This module does not depend on the Revit API.
+"""
+
+# Flow directions of connectors (mirroring Autodesk.Revit.DB.FlowDirectionType)
+FLOW_IN = "In"
+FLOW_OUT = "Out"
+FLOW_BIDIRECTIONAL = "Bidirectional"
+
+# Riser categories (the tag type names)
+CATEGORIES = ("Steigleitung", "Fallleitung", "VonOben", "NachOben", "VonUnten", "NachUnten")
+
+
+class PipeRecord(object):
+    """Geometry and flow data of a pipe."""
+
+    __slots__ = ("element", "start", "end", "connector_flows")
+
+    def __init__(self, element, start, end, connector_flows):
+        """Initializer.
+
+        element is the pipe element itself (not used for categorizing),
+        start and end are the (x, y, z) end points of the pipe's location
+        curve and connector_flows is a tuple of (flow direction, elevation)
+        pairs, one per connector.
+        """
+        self.element = element
+        self.start = start
+        self.end = end
+        self.connector_flows = connector_flows
+
+
+def is_weird(record):
+    """Figure out if a pipe has a weird number of connectors."""
+    return len(record.connector_flows) != 2
+
+
+def get_high_low(record):
+    """Get the higher and the lower elevations of the pipe's end points."""
+    return max(record.start[2], record.end[2]), min(record.start[2], record.end[2])
+
+
+def get_in_out(record):
+    """Get the inflow and the outflow elevations from the connectors."""
+    (direction1, z1), (direction2, z2) = record.connector_flows  # assert len(connector_flows) == 2
+    if direction1 == FLOW_IN and direction2 == FLOW_OUT:
+        return z1, z2
+    if direction1 == FLOW_OUT and direction2 == FLOW_IN:
+        return z2, z1
+    return get_high_low(record)  # some connector is bidirectional or both are equal, use high/low
+
+
+def categorize(record, top, bottom):
+    """Category of a vertical pipe based on location in the view and flow, None if uncategorized.
+
+    Default to assuming downward flow (gravity) when no flow information is
+    available for the pipe.
+    """
+    if any(direction == FLOW_BIDIRECTIONAL for direction, _ in record.connector_flows):
+        start, end = get_high_low(record)
+    else:
+        start, end = get_in_out(record)
+    if start >= end:  # → pipe going down
+        if start >= top and bottom >= end:
+            return "Fallleitung"
+        elif start >= top and top >= end >= bottom:
+            return "VonOben"
+        elif top >= start >= bottom and bottom >= end:
+            return "NachUnten"
+    else:  # start < end --> pipe going up
+        if end >= top and bottom >= start:
+            return "Steigleitung"
+        elif end >= top and top >= start >= bottom:
+            return "NachOben"
+        elif top >= end >= bottom and bottom >= start:
+            return "VonUnten"
+    return None  # pipe does not extend out of the view range
+
+
+def categorize_pipes(vertical_records, top, bottom):
+    """Categorize vertical pipes, returns ({category: [record, ...]}, [uncategorized record, ...])."""
+    categorized = {category: [] for category in CATEGORIES}
+    uncategorized = []
+    for record in vertical_records:
+        category = categorize(record, top, bottom)
+        if category is None:
+            uncategorized.append(record)
+        else:
+            categorized[category].append(record)
+    return categorized, uncategorized
@@ -0,0 +1,93 @@
+"""Collision free placement of tags around their anchor points.
+
+Every tag is placed at its anchor (e.g. the location of a riser) if its box
+does not overlap any annotation already placed. Otherwise candidate
+positions on rings of growing distance around the anchor are tried and the
+first free one is taken, with a leader from the tag to the anchor. Placed
+boxes are kept in a uniform grid index, so every overlap check only looks
+at the boxes of a few nearby cells and placing thousands of tags stays
+near-linear. Tags without a free candidate position stay at their anchor.
+
+Boxes are (min x, min y, max x, max y) tuples in plan. This module does not
+depend on the Revit API.
+"""
+
+import collections
+import math
+
+MAX_RINGS = 4  # number of candidate rings around an anchor
+RING_DIRECTIONS = 8  # candidate positions per ring
+
+Placement = collections.namedtuple("Placement", [
+    "point",  # (x, y) center of the tag
+    "leader",  # True if the tag needs a leader to its anchor
+    "free",  # False if no free position was found and the tag overlaps others
+])
+
+
+class GridIndex(object):
+    """Uniform grid index of boxes for overlap queries."""
+
+    def __init__(self, cell_size):
+        """Initializer."""
+        self.cell_size = float(cell_size)
+        self.cells = collections.defaultdict(list)  # (column, row): [box, ...]
+
+    def cells_of(self, box):
+        """Grid cells covered by a box."""
+        min_column, min_row = int(math.floor(box[0] / self.cell_size)), int(math.floor(box[1] / self.cell_size))
+        max_column, max_row = int(math.floor(box[2] / self.cell_size)), int(math.floor(box[3] / self.cell_size))
+        for column in range(min_column, max_column + 1):
+            for row in range(min_row, max_row + 1):
+                yield (column, row)
+
+    def insert(self, box):
+        """Add a box to the index."""
+        for cell in self.cells_of(box):
+            self.cells[cell].append(box)
+
+    def overlaps(self, box):
+        """Check if a box overlaps any box of the index."""
+        for cell in self.cells_of(box):
+            for other in self.cells.get(cell, ()):
+                if box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]:
+                    return True
+        return False
+
+
+def tag_box(point, width, height):
+    """Box of a tag of the given size centered at a point."""
+    return (point[0] - width / 2.0, point[1] - height / 2.0, point[0] + width / 2.0, point[1] + height / 2.0)
+
+
+def candidate_offsets(width, height, max_rings=MAX_RINGS, directions=RING_DIRECTIONS):
+    """Candidate (dx, dy) offsets of a tag from its anchor, nearest first."""
+    offsets = [(0.0, 0.0)]
+    spacing = math.hypot(width, height)
+    for ring in range(1, max_rings + 1):
+        for direction in range(directions):
+            angle = 2 * math.pi * direction / directions
+            offsets.append((ring * spacing * math.cos(angle), ring * spacing * math.sin(angle)))
+    return offsets
+
+
+def place_tags(anchors, width, height, obstacles=(), max_rings=MAX_RINGS):
+    """Place tags of the given size around their (x, y) anchors avoiding the obstacle boxes and each other.
+
+    Returns one Placement per anchor, in the order of the anchors.
+    """
+    index = GridIndex(max(width, height))
+    for box in obstacles:
+        index.insert(box)
+    offsets = candidate_offsets(width, height, max_rings)
+    placements = []
+    for anchor in anchors:
+        placement = Placement(anchor, False, False)
+        for dx, dy in offsets:
+            point = (anchor[0] + dx, anchor[1] + dy)
+            if not index.overlaps(tag_box(point, width, height)):
+                placement = Placement(point, bool(dx or dy), True)
+                break
+        index.insert(tag_box(placement.point, width, height))
+        placements.append(placement)
+    return placements
@@ -0,0 +1,54 @@
+"""Reconciliation of existing pipe riser tags with the desired ones.
+
+Given the desired tag type per pipe and the riser tags already placed in a
+view, only the difference is planned: tags for untagged pipes are created,
+tags of the wrong type are retyped, and tags whose pipe is not to be tagged
+(anymore) or which duplicate another tag of the same pipe are deleted.
+Re-running the riser tagging on a mostly unchanged view therefore touches
+only the few changed pipes. This module does not depend on the Revit API.
+"""
+
+import collections
+
+ExistingTag = collections.namedtuple("ExistingTag", ["tag_id", "host_id", "type_name"])
+Reconciliation = collections.namedtuple("Reconciliation", [
+    "create",  # [(pipe id, tag type name), ...] of tags to create
+    "retype",  # [(tag id, tag type name), ...] of tags to change the type of
+    "delete",  # [tag id, ...] of orphaned or duplicate tags
+    "unchanged",  # number of tags which are fine as they are
+])
+
+
+def reconcile_tags(desired, existing, accepted=None, retype_target=None):
+    """Plan the changes turning the existing tags into the desired ones.
+
+    desired maps pipe ids to the tag type name they should be tagged with,
+    existing is a list of ExistingTag. accepted optionally maps desired tag
+    type names to the set of type names which are fine as well (e.g. vent
+    variants of a tag type) and retype_target(existing type name, desired
+    type name) optionally chooses the type name to retype a wrong tag to.
+    """
+    accepted = accepted or {}
+    tags_by_host = collections.defaultdict(list)
+    for tag in existing:
+        tags_by_host[tag.host_id].append(tag)
+    create, retype, delete = [], [], []
+    unchanged = 0
+    for host_id, tags in tags_by_host.items():
+        type_name = desired.get(host_id)
+        if type_name is None:  # orphan, the pipe is not to be tagged
+            delete.extend(tag.tag_id for tag in tags)
+            continue
+        good_names = accepted.get(type_name, set()) | {type_name}
+        good_tags = [tag for tag in tags if tag.type_name in good_names]
+        keep = good_tags[0] if good_tags else tags[0]
+        delete.extend(tag.tag_id for tag in tags if tag is not keep)
+        if keep.type_name in good_names:
+            unchanged += 1
+        else:
+            target = retype_target(keep.type_name, type_name) if retype_target else type_name
+            retype.append((keep.tag_id, target))
+    for host_id, type_name in desired.items():
+        if host_id not in tags_by_host:
+            create.append((host_id, type_name))
+    return Reconciliation(create, retype, delete, unchanged)
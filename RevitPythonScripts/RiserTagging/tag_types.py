@@ -0,0 +1,179 @@
+"""Shared pipe riser tag types of the RiserTagging scripts.
+
+This module holds the tag type tables used by all RiserTagging scripts and a
+per document registry of the pipe tag types. The registry reads the family
+and type names of a tag type only once and then answers lookups by type id
+from a dict, so checking the family of thousands of tags costs a dict hit
+per tag. Registries are dropped when the pipe tag types of their document
+change or the document is closed.
+
+The host may run every command in a fresh script engine, which imports
+this module anew, so the registries and the document event handlers are
+kept in the data of the AppDomain, which lives as long as the Revit
+session. This relies on the host running all script engines in Revit's
+AppDomain, as the RevitPythonShell and RpsRuntime add-ins do. The handlers
+are subscribed once per session by whichever engine comes first and are
+removed again when the last registry is dropped, so they never pile up.
+"""
+
+import clr
+clr.AddReference('RevitAPI')
+import Autodesk.Revit.DB as db
+import Autodesk.Revit.DB.Events as events
+from System import AppDomain, EventHandler
+from System.Collections.Generic import List
+
+TAG_FAMILY_NAME = "BHE_DE_PipeTag_FlowArrow"
+RISER_TYPE_NAMES = ("Steigleitung", "Fallleitung", "VonOben", "NachOben", "VonUnten", "NachUnten")
+VENT_TYPE_NAMES = ("LüftungNachOben", "LüftungVonUnten", "LüftungSteigleitung")
+TAG_TYPE_NAME_MAPPING = {  # hard coded tag names to use
+    type_name: TAG_FAMILY_NAME + " - " + type_name for type_name in RISER_TYPE_NAMES + VENT_TYPE_NAMES}
+REMAPPING = {  # riser tag type name: ventilation tag type name
+    "NachOben": "LüftungNachOben",
+    "VonOben": "LüftungNachOben",
+    "NachUnten": "LüftungVonUnten",
+    "VonUnten": "LüftungVonUnten",
+    "Steigleitung": "LüftungSteigleitung",
+    "Fallleitung": "LüftungSteigleitung",
+}
+
+REGISTRIES_KEY = "RiserTagging.tag_types.registries"  # AppDomain data of the registries
+SUBSCRIPTION_KEY = "RiserTagging.tag_types.subscription"  # AppDomain data of the subscribed event handlers
+
+
+class TagTypeRegistry(object):
+    """Pipe tag types of a document, memoized by type id."""
+
+    def __init__(self, doc):
+        """Initializer."""
+        self.doc = doc
+        self.names = {}  # type id: (family name, type name)
+        self._tag_types = None  # full tag name: tag type, read on first use
+
+    def family_and_type_name(self, type_id):
+        """Family and type name of a tag type given by its id."""
+        key = type_id.IntegerValue
+        try:
+            return self.names[key]
+        except KeyError:
+            self.names[key] = read_names(self.doc.GetElement(type_id))
+            return self.names[key]
+
+    def is_riser_tag_type(self, type_id):
+        """Check if a type id belongs to a pipe riser tag type."""
+        return self.family_and_type_name(type_id)[0] == TAG_FAMILY_NAME
+
+    def tag_types(self):
+        """All pipe tag types of the document as {family - type: tag type}."""
+        if self._tag_types is None:
+            tag_types = db.FilteredElementCollector(self.doc)\
+                          .OfCategory(db.BuiltInCategory.OST_PipeTags)\
+                          .WhereElementIsElementType()\
+                          .ToElements()
+            self._tag_types = {}
+            for tag_type in tag_types:
+                names = read_names(tag_type)
+                self.names[tag_type.Id.IntegerValue] = names
+                self._tag_types["{0} - {1}".format(*names)] = tag_type
+        return self._tag_types
+
+    def riser_tag_type_id(self, type_name):
+        """Id of the riser tag type with the given type name, None if it does not exist."""
+        tag_type = self.tag_types().get(TAG_TYPE_NAME_MAPPING.get(type_name))
+        return tag_type.Id if tag_type is not None else None
+
+    def riser_tag_type_ids(self):
+        """Ids of all tag types of the riser tag family."""
+        return [tag_type.Id for tag_type in self.tag_types().values()
+                if self.family_and_type_name(tag_type.Id)[0] == TAG_FAMILY_NAME]
+
+    def riser_tag_filter(self):
+        """Element filter passing the riser tags only (by their type parameter), None if there are no riser tag types."""
+        type_filters = [
+            db.ElementParameterFilter(db.ParameterFilterRuleFactory.CreateEqualsRule(
+                db.ElementId(db.BuiltInParameter.ELEM_TYPE_PARAM), type_id))
+            for type_id in self.riser_tag_type_ids()]
+        if not type_filters:
+            return None
+        if len(type_filters) == 1:
+            return type_filters[0]
+        return db.LogicalOrFilter(List[db.ElementFilter](type_filters))
+
+    def missing_tag_names(self, type_names):
+        """Full names of the riser tag types with the given type names missing in the document."""
+        return [TAG_TYPE_NAME_MAPPING[type_name] for type_name in type_names
+                if TAG_TYPE_NAME_MAPPING[type_name] not in self.tag_types()]
+
+
+def read_names(tag_type):
+    """Read the family and type name of a tag type."""
+    return (tag_type.get_Parameter(db.BuiltInParameter.SYMBOL_FAMILY_NAME_PARAM).AsString(),
+            tag_type.get_Parameter(db.BuiltInParameter.SYMBOL_NAME_PARAM).AsString())
+
+
+def get_registry(doc):
+    """Get the tag type registry of a document."""
+    subscribe(doc.Application)
+    registries = shared_registries()
+    registry = registries.get(doc)
+    if registry is None:
+        registry = registries[doc] = TagTypeRegistry(doc)
+    return registry
+
+
+def shared_registries():
+    """Registries of the Revit session as {document: TagTypeRegistry}, shared by all script engines."""
+    registries = AppDomain.CurrentDomain.GetData(REGISTRIES_KEY)
+    if registries is None:
+        registries = {}
+        AppDomain.CurrentDomain.SetData(REGISTRIES_KEY, registries)
+    return registries
+
+
+def subscribe(application):
+    """Drop registries on changes of their documents' pipe tag types (once per Revit session)."""
+    if AppDomain.CurrentDomain.GetData(SUBSCRIPTION_KEY) is not None:
+        return
+    subscription = (application,
+                    EventHandler[events.DocumentChangedEventArgs](on_document_changed),
+                    EventHandler[events.DocumentClosingEventArgs](on_document_closing))
+    application.DocumentChanged += subscription[1]
+    application.DocumentClosing += subscription[2]
+    AppDomain.CurrentDomain.SetData(SUBSCRIPTION_KEY, subscription)
+
+
+def unsubscribe():
+    """Remove the document event handlers."""
+    subscription = AppDomain.CurrentDomain.GetData(SUBSCRIPTION_KEY)
+    if subscription is None:
+        return
+    application, changed_handler, closing_handler = subscription
+    application.DocumentChanged -= changed_handler
+    application.DocumentClosing -= closing_handler
+    AppDomain.CurrentDomain.SetData(SUBSCRIPTION_KEY, None)
+
+
+def drop_registry(doc):
+    """Drop the registry of a document, stop handling document events after the last one."""
+    registries = shared_registries()
+    registries.pop(doc, None)
+    if not registries:
+        unsubscribe()
+
+
+def on_document_changed(sender, args):
+    """Drop the registry of a document if pipe tag types were added, modified or deleted."""
+    doc = args.GetDocument()
+    registry = shared_registries().get(doc)
+    if registry is None:
+        return
+    tag_type_filter = db.LogicalAndFilter(
+        db.ElementCategoryFilter(db.BuiltInCategory.OST_PipeTags), db.ElementIsElementTypeFilter())
+    if (args.GetAddedElementIds(tag_type_filter).Count or args.GetModifiedElementIds(tag_type_filter).Count
+            or any(element_id.IntegerValue in registry.names for element_id in args.GetDeletedElementIds())):
+        drop_registry(doc)
+
+
+def on_document_closing(sender, args):
+    """Drop the registry of a closing document."""
+    drop_registry(args.Document)
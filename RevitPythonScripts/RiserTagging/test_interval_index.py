@@ -0,0 +1,28 @@
+"""Tests of the interval index of pipe elevation ranges."""
+
+import random
+import interval_index
+
+
+def test_matches_brute_force():
+    generator = random.Random(7)
+    intervals = []
+    for item in range(200):
+        low = generator.uniform(0, 100)
+        intervals.append((low, low + generator.uniform(0, 20), item))
+    index = interval_index.IntervalIndex(intervals)
+    for _ in range(50):
+        low = generator.uniform(-10, 110)
+        high = low + generator.uniform(0, 15)
+        expected = sorted(item for start, end, item in intervals if start <= high and low <= end)
+        assert sorted(index.overlapping(low, high)) == expected
+
+
+def test_touching_bounds_overlap():
+    index = interval_index.IntervalIndex([(0.0, 1.0, "a"), (2.0, 3.0, "b")])
+    assert sorted(index.overlapping(1.0, 2.0)) == ["a", "b"]
+    assert index.overlapping(1.5, 1.9) == []
+
+
+def test_empty_index():
+    assert interval_index.IntervalIndex([]).overlapping(0.0, 1.0) == []
@@ -0,0 +1,38 @@
+"""Tests of the categorization of vertical pipes."""
+
+import riser_categories
+
+TOP, BOTTOM = 10.0, 0.0
+
+
+def record(low, high, flows):
+    """Vertical pipe record from low to high with the given connector flow directions (low end first)."""
+    return riser_categories.PipeRecord(None, (0, 0, low), (0, 0, high), ((flows[0], low), (flows[1], high)))
+
+
+def test_upward_flow_categories():
+    up = (riser_categories.FLOW_IN, riser_categories.FLOW_OUT)
+    assert riser_categories.categorize(record(-5, 15, up), TOP, BOTTOM) == "Steigleitung"
+    assert riser_categories.categorize(record(5, 15, up), TOP, BOTTOM) == "NachOben"
+    assert riser_categories.categorize(record(-5, 5, up), TOP, BOTTOM) == "VonUnten"
+
+
+def test_downward_flow_categories():
+    down = (riser_categories.FLOW_OUT, riser_categories.FLOW_IN)
+    assert riser_categories.categorize(record(-5, 15, down), TOP, BOTTOM) == "Fallleitung"
+    assert riser_categories.categorize(record(5, 15, down), TOP, BOTTOM) == "VonOben"
+    assert riser_categories.categorize(record(-5, 5, down), TOP, BOTTOM) == "NachUnten"
+
+
+def test_bidirectional_pipes_are_assumed_to_flow_down():
+    flows = (riser_categories.FLOW_BIDIRECTIONAL, riser_categories.FLOW_IN)
+    assert riser_categories.categorize(record(-5, 15, flows), TOP, BOTTOM) == "Fallleitung"
+
+
+def test_pipes_inside_the_view_range_are_uncategorized():
+    inside = record(2, 8, (riser_categories.FLOW_IN, riser_categories.FLOW_OUT))
+    weird = riser_categories.PipeRecord(None, (0, 0, 0), (0, 0, 1), ())
+    categorized, uncategorized = riser_categories.categorize_pipes([inside], TOP, BOTTOM)
+    assert uncategorized == [inside]
+    assert all(not records for records in categorized.values())
+    assert riser_categories.is_weird(weird)
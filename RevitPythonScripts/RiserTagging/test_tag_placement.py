@@ -0,0 +1,38 @@
+"""Tests of the collision free placement of tags."""
+
+import tag_placement
+
+
+def overlap(box, other):
+    """Check if two boxes overlap."""
+    return box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]
+
+
+def test_free_anchor_is_used():
+    placements = tag_placement.place_tags([(0.0, 0.0), (10.0, 0.0)], 2.0, 1.0)
+    assert placements == [tag_placement.Placement((0.0, 0.0), False, True),
+                          tag_placement.Placement((10.0, 0.0), False, True)]
+
+
+def test_tags_avoid_obstacles_and_each_other():
+    anchors = [(0.0, 0.0)] * 5
+    obstacle = (-1.0, -1.0, 1.0, 1.0)
+    placements = tag_placement.place_tags(anchors, 2.0, 1.0, obstacles=[obstacle])
+    boxes = [tag_placement.tag_box(placement.point, 2.0, 1.0) for placement in placements]
+    assert all(placement.free and placement.leader for placement in placements)
+    for number, box in enumerate(boxes):
+        assert not overlap(box, obstacle)
+        assert not any(overlap(box, other) for other in boxes[number + 1:])
+
+
+def test_crowded_tag_stays_at_its_anchor():
+    obstacle = (-100.0, -100.0, 100.0, 100.0)
+    placements = tag_placement.place_tags([(0.0, 0.0)], 2.0, 1.0, obstacles=[obstacle], max_rings=2)
+    assert placements == [tag_placement.Placement((0.0, 0.0), False, False)]
+
+
+def test_grid_index_overlaps_across_cells():
+    index = tag_placement.GridIndex(1.0)
+    index.insert((0.5, 0.5, 3.5, 1.5))
+    assert index.overlaps((3.0, 1.0, 4.0, 2.0))
+    assert not index.overlaps((3.5, 0.0, 5.0, 1.0))
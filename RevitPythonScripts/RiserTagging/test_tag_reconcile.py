@@ -0,0 +1,34 @@
+"""Tests of the reconciliation of existing riser tags."""
+
+import tag_reconcile
+
+Tag = tag_reconcile.ExistingTag
+
+
+def test_only_the_difference_is_planned():
+    desired = {1: "Up", 2: "Down", 3: "Up"}
+    existing = [Tag(10, 1, "Up"), Tag(20, 2, "Up"), Tag(40, 4, "Down")]
+    plan = tag_reconcile.reconcile_tags(desired, existing)
+    assert plan.create == [(3, "Up")]
+    assert plan.retype == [(20, "Down")]
+    assert plan.delete == [40]
+    assert plan.unchanged == 1
+
+
+def test_duplicates_keep_a_good_tag():
+    existing = [Tag(10, 1, "Down"), Tag(11, 1, "Up"), Tag(12, 1, "Up")]
+    plan = tag_reconcile.reconcile_tags({1: "Up"}, existing)
+    assert plan.retype == []
+    assert sorted(plan.delete) == [10, 12]
+    assert plan.unchanged == 1
+
+
+def test_accepted_variants_and_retype_target():
+    existing = [Tag(10, 1, "Up Vent"), Tag(20, 2, "Down Vent")]
+    plan = tag_reconcile.reconcile_tags(
+        {1: "Up", 2: "Up"}, existing, accepted={"Up": {"Up Vent"}},
+        retype_target=lambda existing_name, desired_name: desired_name + " Vent")
+    assert plan.unchanged == 1
+    assert plan.retype == [(20, "Up Vent")]
+    assert plan.create == []
+    assert plan.delete == []
@@ -3,9 +3,12 @@
 import clr
 clr.AddReference('RevitAPI')
 import Autodesk.Revit.DB as db
+import bulk_delete
 
 __name = "SpaceDelete.py"
-__version = "0.1a"
+__version = "0.2a"
+
+DRY_RUN = False  # only count what would be deleted
 
 def main():
     """Main Program."""
@@ -18,7 +21,7 @@ def main():
     # Get all Spaces from the model
     spaces = db.FilteredElementCollector(doc)\
             .OfCategory(db.BuiltInCategory.OST_MEPSpaces)\
-            .ToElements()
+            .ToElementIds()
     print("Found {0} spaces in the model.".format(len(spaces)))
 
     # Delete all Spaces from the model
@@ -26,14 +29,13 @@ def main():
     transaction = db.Transaction(doc)
     transaction.Start("{name} - v{ver}".format(name=__name, ver=__version))
     try:
-        for space in spaces:
-            # print("deleting {0}...".format(space.Id))
-            doc.Delete(space.Id)
+        result = bulk_delete.delete_elements(doc, spaces, dry_run=DRY_RUN)
     except Exception as ex:
         print("Exception:\n {0}".format(ex))
         transaction.RollBack()
     else:
         transaction.Commit()
+        print(bulk_delete.summary(result, DRY_RUN))
         print("Done.")
 
 
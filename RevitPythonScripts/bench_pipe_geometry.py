@@ -0,0 +1,93 @@
+"""Benchmark for classifying pipe segments into horizontal, vertical and sloped ones.
+
+Generates synthetic pipe segments (mostly horizontal and vertical with some
+sloped ones and a bit of jitter) and times the batch classification of
+pipe_geometry as well as the classification of the segments one by one,
+checking that both agree. Runs outside of Revit:
+
+    python bench_pipe_geometry.py --segments 1000000
+"""
+
+from __future__ import print_function
+import argparse
+import random
+import sys
+import time
+import pipe_geometry
+
+# Constants:
+SUCCESS = 0
+FAILURE = -1
+
+
+def main(segments, tolerance, seed=0):
+    """Generate segments and time their classification."""
+    print("Generating {num} segments... ".format(num=segments), end="")
+    starts, ends = generate_segments(segments, seed)
+    print("✔")
+    print("Classifying segments (NumPy {state})...".format(
+        state="available" if pipe_geometry.numpy is not None else "not available"))
+    batch_classes, batch_time = timed(lambda: pipe_geometry.classify_segments(starts, ends, tolerance))
+    report("batch", batch_time, segments)
+    if pipe_geometry.numpy is not None:  # time the classification without converting the points
+        start_array = pipe_geometry.numpy.array(starts)
+        end_array = pipe_geometry.numpy.array(ends)
+        _, array_time = timed(lambda: pipe_geometry.classify_segments(start_array, end_array, tolerance))
+        report("batch arrays", array_time, segments)
+    threshold = pipe_geometry.squared_tangent(tolerance)
+    single_classes, single_time = timed(
+        lambda: [pipe_geometry.classify(start, end, threshold=threshold) for start, end in zip(starts, ends)])
+    report("one by one", single_time, segments)
+    for number, name in sorted(pipe_geometry.CLASS_NAMES.items()):
+        print("  ➜ {num} {name} segments".format(num=list(batch_classes).count(number), name=name))
+    if list(batch_classes) != single_classes:
+        print("✘ Batch and one by one classifications differ!")
+        return FAILURE
+    return SUCCESS
+
+
+def generate_segments(segments, seed=0):
+    """Generate the start and end points of random pipe segments."""
+    rng = random.Random(seed)
+    starts, ends = [], []
+    for _ in range(segments):
+        x, y, z = rng.uniform(0, 300), rng.uniform(0, 300), rng.uniform(0, 100)
+        length = rng.uniform(0.1, 20)
+        kind = rng.random()
+        if kind < 0.6:  # horizontal
+            dx, dy, dz = length, 0.0, 0.0
+        elif kind < 0.9:  # vertical
+            dx, dy, dz = 0.0, 0.0, length
+        else:  # sloped
+            dx, dy, dz = length, 0.0, length * rng.uniform(0.01, 1)
+        jitter = rng.gauss(0, 0.005)  # small deviations around the tolerance
+        starts.append((x, y, z))
+        ends.append((x + dx + jitter, y + dy, z + dz + jitter))
+    return starts, ends
+
+
+def timed(function):
+    """Call a function and return its result and the elapsed wall time."""
+    start = time.time()
+    result = function()
+    return result, time.time() - start
+
+
+def report(stage, seconds, segments):
+    """Print the timing and throughput of a benchmark stage."""
+    throughput = segments / seconds if seconds else float("inf")
+    print("  ➜ {stage:<12} {sec:8.3f} s {rate:14,.0f} segments/s".format(stage=stage, sec=seconds, rate=throughput))
+
+
+if __name__ == "__main__":
+    # Parse command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segments", type=int, default=1000000, help="number of segments to generate")
+    parser.add_argument(
+        "--tolerance", type=float, default=pipe_geometry.DEFAULT_TOLERANCE,
+        help="tolerance angle in degrees")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the segment generator")
+    args = parser.parse_args()
+    # Run benchmark
+    result = main(segments=args.segments, tolerance=args.tolerance, seed=args.seed)
+    sys.exit(result)
@@ -0,0 +1,80 @@
+"""Bulk deletion of Revit elements.
+
+Elements are deleted in chunks with one Document.Delete call per chunk
+instead of one call per element, so Revit regenerates once per chunk. Every
+chunk is deleted in a sub transaction of the caller's open transaction. If
+Revit refuses to delete a chunk, it is rolled back and bisected until the
+refused elements are found, all other elements are still deleted. Elements
+already deleted along with an earlier chunk are dropped from a chunk before
+deleting it, so they never cause such a bisection. In a dry run all chunks
+are deleted within one more sub transaction which is rolled back at the
+end, so the result tells what would be deleted without changing the model
+and elements deleted along with an earlier chunk are not counted twice.
+"""
+
+import collections
+import clr
+clr.AddReference('RevitAPI')
+import Autodesk.Revit.DB as db
+from System.Collections.Generic import List
+
+CHUNK_SIZE = 5000  # elements deleted with one call
+
+DeleteResult = collections.namedtuple("DeleteResult", [
+    "deleted",  # ids of the requested elements (to be) deleted
+    "refused",  # ids of the requested elements Revit refused to delete
+    "dependent_count",  # number of further elements (to be) deleted along with them
+])
+
+
+def delete_elements(doc, element_ids, chunk_size=CHUNK_SIZE, dry_run=False):
+    """Delete elements given by their ids in chunks, needs an open transaction."""
+    element_ids = list(element_ids)
+    deleted, refused = [], []
+    total = 0  # number of all deleted elements including dependents
+    dry_run_transaction = db.SubTransaction(doc) if dry_run else None
+    if dry_run_transaction is not None:
+        dry_run_transaction.Start()
+    try:
+        for start in range(0, len(element_ids), chunk_size):
+            chunk = []
+            for element_id in element_ids[start:start + chunk_size]:
+                if doc.GetElement(element_id) is None:  # deleted along with an earlier chunk
+                    deleted.append(element_id)
+                else:
+                    chunk.append(element_id)
+            if chunk:
+                total += delete_chunk(doc, chunk, deleted, refused)
+    finally:
+        if dry_run_transaction is not None:
+            dry_run_transaction.RollBack()
+    return DeleteResult(deleted, refused, max(total - len(deleted), 0))
+
+
+def delete_chunk(doc, chunk, deleted, refused):
+    """Delete a chunk of elements, bisecting it if Revit refuses to delete it as a whole.
+
+    Returns the number of deleted elements including dependent elements.
+    """
+    sub_transaction = db.SubTransaction(doc)
+    sub_transaction.Start()
+    try:
+        deleted_ids = doc.Delete(List[db.ElementId](chunk))
+    except Exception:
+        sub_transaction.RollBack()
+        if len(chunk) == 1:
+            refused.extend(chunk)
+            return 0
+        middle = len(chunk) // 2
+        return (delete_chunk(doc, chunk[:middle], deleted, refused)
+                + delete_chunk(doc, chunk[middle:], deleted, refused))
+    sub_transaction.Commit()
+    deleted.extend(chunk)
+    return deleted_ids.Count
+
+
+def summary(result, dry_run=False):
+    """Summarize a delete result."""
+    return "{verb} {num} elements (and {dep} dependent elements), {ref} elements were refused.".format(
+        verb="Would delete" if dry_run else "Deleted", num=len(result.deleted),
+        dep=result.dependent_count, ref=len(result.refused))
@@ -0,0 +1,48 @@
+"""Combine interference reports and map clashing elements to views.
+
+Several reports are parsed once and their clashing element ids combined as
+a union (clashing in any report) or an intersection (clashing in every
+report). The VisibilityIndex records the elements visible in each view
+together with their categories, so elements shared by many views keep one
+category entry.
+
+The module does not depend on the Revit API.
+"""
+
+UNION = "union"
+INTERSECTION = "intersection"
+COMBINE_MODES = (UNION, INTERSECTION)
+
+
+def combine_clashing_ids(reports, mode=UNION):
+    """Combine the clashing element ids of parsed interference reports."""
+    if mode not in COMBINE_MODES:
+        raise ValueError("Unknown combine mode '{mode}'!".format(mode=mode))
+    combined = None
+    for report in reports:
+        element_ids = report.element_ids()
+        if combined is None:
+            combined = element_ids
+        elif mode == UNION:
+            combined |= element_ids
+        else:
+            combined &= element_ids
+    return combined if combined is not None else set()
+
+
+class VisibilityIndex(object):
+    """View -> elements visibility index with element categories."""
+
+    def __init__(self):
+        """Initializer."""
+        self.categories = {}  # element id: category id (None for elements without a category)
+        self.view_elements = {}  # view id: set of visible element ids
+
+    def add_view(self, view_id, element_categories):
+        """Record the elements visible in a view given as {element id: category id}."""
+        self.categories.update(element_categories)
+        self.view_elements[view_id] = set(element_categories)
+
+    def element_categories(self, view_id):
+        """Elements visible in a view as {element id: category id}."""
+        return {element_id: self.categories[element_id] for element_id in self.view_elements[view_id]}
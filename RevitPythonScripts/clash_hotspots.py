@@ -0,0 +1,187 @@
+"""Spatial clustering of interference report clashes into hotspots.
+
+Every clash is located at the center of the overlap of the bounding boxes
+of its two elements (or halfway between them if the boxes do not overlap).
+The clash locations are binned into a uniform grid. A hotspot is a window
+of 3 x 3 x 3 cells around a cell: the window with the most clashes becomes
+the first hotspot, its cells are claimed, and so on with the remaining
+cells. Hotspots therefore never grow beyond their window, also where
+clashes are spread over whole floors, and are ranked by their number of
+clashes. Binning and picking the windows take a few dictionary lookups per
+occupied cell, so tens of thousands of clashes cluster within seconds.
+
+Element bounding boxes are read from Revit or from a snapshot file saved
+next to the report, so the clustering can also be run offline:
+
+    python clash_hotspots.py report.html
+
+The module does not depend on the Revit API.
+"""
+
+from __future__ import print_function
+import collections
+import heapq
+import json
+import os.path
+import re
+import sys
+import time
+
+CELL_SIZE = 10.0  # grid cell edge length in feet (Revit internal units)
+SECTION_BOX_MARGIN = 3.0  # feet added around a hotspot's extents
+SNAPSHOT_SUFFIX = ".bboxes.json"
+SNAPSHOT_VERSION = 1
+VIEW_NAME = "Clash Hotspot {rank:02d} ({num} clashes)"
+VIEW_NAME_PATTERN = re.compile(r"^Clash Hotspot \d{2,} \(\d+ clashes\)$")  # names of generated views only
+
+Hotspot = collections.namedtuple("Hotspot", [
+    "clash_count",  # number of clashes in the hotspot
+    "pairs",  # clashing (element id, element id) pairs
+    "minimum",  # (x, y, z) lower corner of the clash locations
+    "maximum",  # (x, y, z) upper corner of the clash locations
+])
+
+
+def clash_location(box_a, box_b):
+    """Location of a clash between two elements given as (min xyz, max xyz) boxes."""
+    location = []
+    for axis in range(3):
+        low = max(box_a[0][axis], box_b[0][axis])
+        high = min(box_a[1][axis], box_b[1][axis])
+        location.append((low + high) / 2.0)  # center of the overlap or of the gap in between
+    return tuple(location)
+
+
+def find_hotspots(pairs, bounding_boxes, cell_size=CELL_SIZE):
+    """Cluster clashes into hotspots ranked by their number of clashes.
+
+    pairs are the clashing element id pairs and bounding_boxes maps element
+    ids to ((min x, min y, min z), (max x, max y, max z)). Clashes with an
+    element without a bounding box are skipped. Returns the list of
+    hotspots and the number of skipped clashes.
+    """
+    cells = collections.defaultdict(list)  # grid cell: [(pair, location), ...]
+    skipped = 0
+    for pair in pairs:
+        box_a = bounding_boxes.get(pair[0])
+        box_b = bounding_boxes.get(pair[1])
+        if box_a is None or box_b is None:
+            skipped += 1
+            continue
+        location = clash_location(box_a, box_b)
+        cells[grid_cell(location, cell_size)].append((pair, location))
+    hotspots = [make_hotspot([clash for cell in window for clash in cells[cell]])
+                for window in densest_windows(cells)]
+    hotspots.sort(key=lambda hotspot: hotspot.clash_count, reverse=True)
+    return hotspots, skipped
+
+
+def grid_cell(location, cell_size):
+    """Grid cell index of a location."""
+    return tuple(int(coordinate // cell_size) for coordinate in location)
+
+
+def densest_windows(cells):
+    """Greedily group occupied grid cells into windows of a cell and its neighbours, densest first.
+
+    cells maps grid cells to their clashes. Every occupied cell ends up in
+    exactly one window.
+    """
+    unclaimed = set(cells)
+
+    def window_of(cell):
+        return [neighbour for neighbour in window_cells(*cell) if neighbour in unclaimed]
+
+    def count(window):
+        return sum(len(cells[cell]) for cell in window)
+
+    heap = [(-count(window_of(cell)), cell) for cell in cells]  # counts only shrink as cells are claimed
+    heapq.heapify(heap)
+    while heap:
+        negative_count, cell = heapq.heappop(heap)
+        if cell not in unclaimed:
+            continue
+        window = window_of(cell)
+        current_count = count(window)
+        if current_count < -negative_count:  # outdated, neighbours were claimed meanwhile
+            heapq.heappush(heap, (-current_count, cell))
+            continue
+        unclaimed.difference_update(window)
+        yield window
+
+
+def window_cells(x, y, z):
+    """A grid cell and the 26 grid cells around it."""
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for dz in (-1, 0, 1):
+                yield (x + dx, y + dy, z + dz)
+
+
+def make_hotspot(clashes):
+    """Create a hotspot from a list of (pair, location) clashes."""
+    locations = [location for _, location in clashes]
+    minimum = tuple(min(location[axis] for location in locations) for axis in range(3))
+    maximum = tuple(max(location[axis] for location in locations) for axis in range(3))
+    return Hotspot(len(clashes), [pair for pair, _ in clashes], minimum, maximum)
+
+
+def section_box(hotspot, margin=SECTION_BOX_MARGIN):
+    """Section box extents (min xyz, max xyz) around a hotspot."""
+    return (tuple(value - margin for value in hotspot.minimum),
+            tuple(value + margin for value in hotspot.maximum))
+
+
+def view_name(rank, hotspot):
+    """Name of the view of the hotspot with the given rank."""
+    return VIEW_NAME.format(rank=rank, num=hotspot.clash_count)
+
+
+def is_hotspot_view_name(name):
+    """Check if a view name was generated by view_name(), so the view can be replaced."""
+    return VIEW_NAME_PATTERN.match(name) is not None
+
+
+def snapshot_path(report_path):
+    """Path of the bounding box snapshot file of a report."""
+    return report_path + SNAPSHOT_SUFFIX
+
+
+def save_snapshot(path, bounding_boxes):
+    """Save element bounding boxes to a snapshot file."""
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "boxes": {str(element_id): list(box[0]) + list(box[1]) for element_id, box in bounding_boxes.items()},
+    }
+    with open(path, "w") as snapshot_file:
+        snapshot_file.write(json.dumps(snapshot))
+
+
+def load_snapshot(path):
+    """Load element bounding boxes from a snapshot file, empty if there is no usable one."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as snapshot_file:
+            snapshot = json.load(snapshot_file)
+    except (IOError, ValueError):
+        return {}
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return {}
+    return {int(element_id): (tuple(values[:3]), tuple(values[3:]))
+            for element_id, values in snapshot.get("boxes", {}).items()}
+
+
+if __name__ == "__main__":
+    import interference_report
+    start = time.time()
+    report = interference_report.parse_report(sys.argv[1])
+    bounding_boxes = load_snapshot(snapshot_path(sys.argv[1]))
+    hotspots, skipped = find_hotspots(report.pairs(), bounding_boxes)
+    print("Clustered {num} clashes into {hot} hotspots ({skip} without bounding boxes) in {sec:.3f} s.".format(
+        num=len(report), hot=len(hotspots), skip=skipped, sec=time.time() - start))
+    for rank, hotspot in enumerate(hotspots[:10], start=1):
+        print("{rank:3d}: {num} clashes between {low} and {high}".format(
+            rank=rank, num=hotspot.clash_count,
+            low=tuple(round(value, 1) for value in hotspot.minimum),
+            high=tuple(round(value, 1) for value in hotspot.maximum)))
@@ -0,0 +1,223 @@
+"""Compact, persistent index of the clashes of an interference report.
+
+Clashes are identified by their normalized element id pair (lower id first),
+since clash numbers change from report to report. The pairs are kept sorted
+in integer arrays together with an inverted element id -> clashes index in
+compressed sparse row layout. Indexes are saved as binary sidecar files next
+to their reports, so two reports can be compared by merging their sorted
+pair arrays in linear time without parsing the old HTML report again.
+
+The module does not depend on the Revit API.
+"""
+
+import array
+import bisect
+import collections
+import glob
+import os
+import os.path
+import struct
+import sys
+
+INDEX_SUFFIX = ".clashidx"
+TEMP_SUFFIX = ".tmp"  # index files are written to a temporary file first
+MAGIC = b"CLIX"
+VERSION = 1
+HEADER_FORMAT = "<4sIIII"  # magic, version, item size, number of pairs, number of elements
+try:
+    ID_TYPECODE = array.array("q").typecode
+except ValueError:  # no 64 bit integer arrays on older Pythons
+    ID_TYPECODE = "l"
+
+ClashDiff = collections.namedtuple("ClashDiff", ["new", "resolved", "persisting"])  # lists of pairs
+
+
+class ClashIndex(object):
+    """Sorted clash pairs with an element -> clashes inverted index."""
+
+    def __init__(self, lows, highs, element_ids, offsets, positions):
+        """Initializer, use from_pairs() or load() to create an index."""
+        self.lows = lows  # lower element id of each pair, sorted by pair
+        self.highs = highs  # higher element id of each pair
+        self.element_ids = element_ids  # sorted ids of all clashing elements
+        self.offsets = offsets  # clashes of element_ids[i] are positions[offsets[i]:offsets[i + 1]]
+        self.positions = positions  # pair indexes grouped by element
+
+    def __len__(self):
+        """Number of clashes in the index."""
+        return len(self.lows)
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """Build an index from (element id, element id) pairs, duplicates are dropped."""
+        normalized = sorted(set((min(pair), max(pair)) for pair in pairs))
+        lows = array.array(ID_TYPECODE, [low for low, _ in normalized])
+        highs = array.array(ID_TYPECODE, [high for _, high in normalized])
+        entries = sorted(
+            [(low, position) for position, low in enumerate(lows)]
+            + [(high, position) for position, high in enumerate(highs)])
+        element_ids = array.array(ID_TYPECODE)
+        offsets = array.array(ID_TYPECODE)
+        positions = array.array(ID_TYPECODE, [position for _, position in entries])
+        for offset, (element_id, _) in enumerate(entries):
+            if not element_ids or element_ids[-1] != element_id:
+                element_ids.append(element_id)
+                offsets.append(offset)
+        offsets.append(len(entries))
+        return cls(lows, highs, element_ids, offsets, positions)
+
+    @classmethod
+    def from_report(cls, report):
+        """Build an index from a parsed interference report."""
+        return cls.from_pairs(report.pairs())
+
+    def pairs(self):
+        """Iterate the sorted (lower id, higher id) clash pairs."""
+        return zip(self.lows, self.highs)
+
+    def clashes_of(self, element_id):
+        """Clash pairs an element is involved in."""
+        index = bisect.bisect_left(self.element_ids, element_id)
+        if index == len(self.element_ids) or self.element_ids[index] != element_id:
+            return []
+        return [(self.lows[position], self.highs[position])
+                for position in self.positions[self.offsets[index]:self.offsets[index + 1]]]
+
+    def save(self, path):
+        """Write the index to a binary file.
+
+        The index is written to a temporary file first which then replaces
+        the file, so an interrupted save never leaves a truncated index.
+        """
+        arrays = [self.lows, self.highs, self.element_ids, self.offsets, self.positions]
+        temp_path = path + TEMP_SUFFIX
+        try:
+            with open(temp_path, "wb") as index_file:
+                index_file.write(struct.pack(
+                    HEADER_FORMAT, MAGIC, VERSION, self.lows.itemsize, len(self.lows), len(self.element_ids)))
+                for values in arrays:
+                    if sys.byteorder == "big":
+                        values = array.array(values.typecode, values)
+                        values.byteswap()
+                    index_file.write(to_bytes(values))
+            replace_file(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @classmethod
+    def load(cls, path):
+        """Read an index from a binary file."""
+        with open(path, "rb") as index_file:
+            data = index_file.read()
+        header_size = struct.calcsize(HEADER_FORMAT)
+        if len(data) < header_size:
+            raise ValueError("'{path}' is too short for a clash index file!".format(path=path))
+        magic, version, item_size, pair_count, element_count = struct.unpack(HEADER_FORMAT, data[:header_size])
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("'{path}' is no clash index file of version {ver}!".format(path=path, ver=VERSION))
+        typecode = integer_typecode(item_size)
+        sizes = [pair_count, pair_count, element_count, element_count + 1, 2 * pair_count]
+        if len(data) != header_size + sum(sizes) * item_size:
+            raise ValueError("'{path}' is a truncated or corrupt clash index file!".format(path=path))
+        arrays = []
+        start = header_size
+        for size in sizes:
+            values = array.array(typecode)
+            from_bytes(values, data[start:start + size * item_size])
+            if sys.byteorder == "big":
+                values.byteswap()
+            arrays.append(values)
+            start += size * item_size
+        return cls(*arrays)
+
+
+def diff(old, new):
+    """Compare two clash indexes by merging their sorted pairs."""
+    old_pairs = list(old.pairs())
+    new_pairs = list(new.pairs())
+    added, resolved, persisting = [], [], []
+    i = j = 0
+    while i < len(old_pairs) and j < len(new_pairs):
+        if old_pairs[i] == new_pairs[j]:
+            persisting.append(new_pairs[j])
+            i += 1
+            j += 1
+        elif old_pairs[i] < new_pairs[j]:
+            resolved.append(old_pairs[i])
+            i += 1
+        else:
+            added.append(new_pairs[j])
+            j += 1
+    resolved.extend(old_pairs[i:])
+    added.extend(new_pairs[j:])
+    return ClashDiff(added, resolved, persisting)
+
+
+def index_path(report_path):
+    """Path of the sidecar index file of a report."""
+    return report_path + INDEX_SUFFIX
+
+
+def find_previous_index(report_path):
+    """Path of the sidecar index of the newest report older than the given one, None if there is none.
+
+    Reports are ordered by their modification time, the index's own time is
+    only used if its report is gone. So opening an older report after a
+    newer one compares it to the reports before it, not to the newer one.
+    """
+    own_path = os.path.normcase(os.path.abspath(index_path(report_path)))
+    own_time = os.path.getmtime(report_path)
+    pattern = os.path.join(os.path.dirname(os.path.abspath(report_path)), "*" + INDEX_SUFFIX)
+    candidates = []  # (report time, index path)
+    for path in glob.glob(pattern):
+        if os.path.normcase(os.path.abspath(path)) == own_path:
+            continue
+        report_time = report_mtime(path)
+        if report_time < own_time:
+            candidates.append((report_time, path))
+    if not candidates:
+        return None
+    return max(candidates)[1]
+
+
+def report_mtime(path):
+    """Modification time of the report of a sidecar index, of the index itself if the report is gone."""
+    report_path = path[:-len(INDEX_SUFFIX)]
+    if os.path.exists(report_path):
+        return os.path.getmtime(report_path)
+    return os.path.getmtime(path)
+
+
+def replace_file(source_path, target_path):
+    """Move a file over another one, also on Pythons without os.replace (IronPython 2.7)."""
+    if hasattr(os, "replace"):
+        os.replace(source_path, target_path)
+        return
+    if os.path.exists(target_path):
+        os.remove(target_path)
+    os.rename(source_path, target_path)
+
+
+def integer_typecode(item_size):
+    """Array typecode of signed integers with the given item size."""
+    for typecode in ("i", "l", "q"):
+        try:
+            if array.array(typecode).itemsize == item_size:
+                return typecode
+        except ValueError:  # typecode not supported
+            continue
+    raise ValueError("No integer array type with {num} bytes per item!".format(num=item_size))
+
+
+def to_bytes(values):
+    """Raw bytes of an array."""
+    return values.tobytes() if hasattr(values, "tobytes") else values.tostring()
+
+
+def from_bytes(values, data):
+    """Append raw bytes to an array."""
+    if hasattr(values, "frombytes"):
+        values.frombytes(data)
+    else:
+        values.fromstring(data)
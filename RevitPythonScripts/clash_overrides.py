@@ -0,0 +1,74 @@
+"""Plan graphic overrides for marking clashing elements in a view.
+
+"Fade everything, highlight the clashing elements" is expressed with as few
+Revit API calls as possible: one view filter over all filterable categories
+fades everything, one selection based view filter placed above it
+highlights the clashing elements. Filters leave the category overrides of
+the view alone and are simply removed again. Per element overrides are
+only planned where those do not apply: elements of categories that cannot
+be filtered and clash sets too small to be worth a filter. Views whose view
+template controls the V/G overrides or filters only get element overrides.
+The elements marked by element overrides are remembered, so the next run
+only resets those of them it does not override again. The planning is pure
+Python and does not depend on the Revit API.
+"""
+
+import collections
+
+MIN_FILTER_SIZE = 20  # fewer clashing elements are overridden one by one
+
+OverridePlan = collections.namedtuple("OverridePlan", [
+    "fade_category_ids",  # categories faded by the fade filter
+    "fade_element_ids",  # elements to fade one by one
+    "highlight_filter_ids",  # elements to highlight through one selection filter
+    "highlight_element_ids",  # elements to highlight one by one
+    "reset_element_ids",  # elements marked one by one by an earlier run to reset
+])
+
+
+def plan_overrides(element_categories, clashing_ids, filterable_category_ids, marked_ids=(),
+                   min_filter_size=MIN_FILTER_SIZE):
+    """Plan the override operations fading a view and highlighting its clashing elements.
+
+    element_categories maps the ids of all elements in the view to their
+    category ids (None for elements without a category), clashing_ids are
+    the element ids involved in clashes, filterable_category_ids are the
+    categories view filters can be applied to and marked_ids are the
+    elements given element overrides by an earlier run.
+    """
+    fade_category_ids = set()
+    fade_element_ids = set()
+    highlight_ids = set()
+    for element_id, category_id in element_categories.items():
+        if element_id in clashing_ids:
+            highlight_ids.add(element_id)
+        if category_id in filterable_category_ids:
+            fade_category_ids.add(category_id)  # highlights take precedence over this
+        elif element_id not in clashing_ids:
+            fade_element_ids.add(element_id)
+    if len(highlight_ids) >= min_filter_size:
+        return OverridePlan(fade_category_ids, fade_element_ids, highlight_ids, set(),
+                            set(marked_ids) - fade_element_ids)
+    return OverridePlan(fade_category_ids, fade_element_ids, set(), highlight_ids,
+                        set(marked_ids) - fade_element_ids - highlight_ids)
+
+
+def plan_element_overrides(element_categories, clashing_ids, marked_ids=()):
+    """Plan fading and highlighting every element of a view one by one."""
+    highlight_ids = set(element_id for element_id in element_categories if element_id in clashing_ids)
+    fade_element_ids = set(element_categories) - highlight_ids
+    return OverridePlan(set(), fade_element_ids, set(), highlight_ids,
+                        set(marked_ids) - fade_element_ids - highlight_ids)
+
+
+def marked_element_ids(plan):
+    """Elements given element overrides by a plan, to be remembered for the next run."""
+    return plan.fade_element_ids | plan.highlight_element_ids
+
+
+def operation_count(plan):
+    """Number of override API calls needed to apply a plan."""
+    fade_filter_operations = 2 if plan.fade_category_ids else 0  # add filter, set overrides
+    highlight_filter_operations = 3 if plan.highlight_filter_ids else 0  # set ids, add filter, set overrides
+    return (len(plan.reset_element_ids) + fade_filter_operations + len(plan.fade_element_ids)
+            + highlight_filter_operations + len(plan.highlight_element_ids))
@@ -0,0 +1,132 @@
+"""Streaming parser for Revit Interference Check reports.
+
+Revit exports interference reports as UTF-16 encoded HTML tables with one
+clash per row: the clash number followed by the two clashing items, each
+described like "Pipes : Pipe Types : Default : ID 123456". The report is
+decoded and parsed chunk by chunk and only the clash numbers and element id
+pairs are kept, in compact integer arrays. Rows without two valid element
+ids are counted as malformed instead of aborting the parse.
+
+The module does not depend on the Revit API and can be run on its own to
+parse (and time the parsing of) a report:
+
+    python interference_report.py report.html
+"""
+
+from __future__ import print_function
+import array
+import codecs
+import re
+import sys
+import time
+try:
+    from HTMLParser import HTMLParser  # IronPython 2.7
+except ImportError:
+    from html.parser import HTMLParser
+
+CHUNK_SIZE = 1024 * 1024  # bytes decoded and parsed at once
+REPORT_ENCODING = "utf-16"  # Revit exports html in UTF-16(-LE) encoding
+ELEMENT_ID_PATTERN = re.compile(r"(\d+)\s*$")  # trailing number of an item description
+try:
+    ID_TYPECODE = array.array("q").typecode
+except ValueError:  # no 64 bit integer arrays on older Pythons
+    ID_TYPECODE = "l"
+
+
+class InterferenceReportParser(HTMLParser):
+    """HTML parser for parsing Revit Interference CHeck reports."""
+
+    def __init__(self):
+        """Initializer."""
+        HTMLParser.__init__(self)
+        self.clash_numbers = array.array(ID_TYPECODE)
+        self.ids_a = array.array(ID_TYPECODE)
+        self.ids_b = array.array(ID_TYPECODE)
+        self.malformed_rows = 0
+        self.in_column = False
+        self.line_counter = -1  # 0 = header, 1...n = data
+        self.current_cells = []  # texts of the columns of the current row
+        self.current_text = []  # text pieces of the current column
+
+    def __len__(self):
+        """Number of clashes parsed so far."""
+        return len(self.clash_numbers)
+
+    @property
+    def clashes(self):
+        """Clashes as a dict of clash#: [itemA#, itemB#]."""
+        return {number: [id_a, id_b] for number, id_a, id_b in zip(self.clash_numbers, self.ids_a, self.ids_b)}
+
+    def pairs(self):
+        """Iterate the clashing element id pairs."""
+        return zip(self.ids_a, self.ids_b)
+
+    def element_ids(self):
+        """Set of all element ids involved in clashes."""
+        element_ids = set(self.ids_a)
+        element_ids.update(self.ids_b)
+        return element_ids
+
+    def handle_starttag(self, tag, attrs):
+        """Start tag handler."""
+        if tag == "tr":  # enter line (row)
+            self.line_counter += 1
+            self.current_cells = []
+        elif tag == "td":  # enter data column
+            self.in_column = True
+            self.current_text = []
+
+    def handle_endtag(self, tag):
+        """End tag handler."""
+        if tag == "tr":  # exit line (row)
+            if self.line_counter > 0:
+                self.add_clash(self.line_counter, self.current_cells)
+            self.current_cells = []
+        elif tag == "td" and self.in_column:  # exit data column
+            self.in_column = False
+            self.current_cells.append("".join(self.current_text))
+
+    def handle_data(self, data):
+        """Data handler, column texts may arrive in several pieces."""
+        if self.in_column:
+            self.current_text.append(data)
+
+    def add_clash(self, number, cells):
+        """Store the element ids of a clash row or count it as malformed."""
+        element_ids = [element_id(cell) for cell in cells[1:3]]
+        if len(element_ids) != 2 or None in element_ids:
+            self.malformed_rows += 1
+            return
+        self.clash_numbers.append(number)
+        self.ids_a.append(element_ids[0])
+        self.ids_b.append(element_ids[1])
+
+
+def element_id(text):
+    """Element id at the end of an item description, None if there is none."""
+    match = ELEMENT_ID_PATTERN.search(text)
+    if match is None:
+        return None
+    return int(match.group(1))
+
+
+def parse_report(file_path, chunk_size=CHUNK_SIZE):
+    """Parse an interference report file incrementally and return the parser."""
+    decoder = codecs.getincrementaldecoder(REPORT_ENCODING)()
+    parser = InterferenceReportParser()
+    with open(file_path, mode="rb") as html_file:
+        while True:
+            chunk = html_file.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b"", True))
+    parser.close()
+    return parser
+
+
+if __name__ == "__main__":
+    start = time.time()
+    report = parse_report(sys.argv[1])
+    print("Parsed {num} clashes involving {ids} elements ({bad} malformed rows) in {sec:.3f} s.".format(
+        num=len(report), ids=len(report.element_ids()), bad=report.malformed_rows, sec=time.time() - start))
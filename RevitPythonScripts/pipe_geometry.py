@@ -0,0 +1,78 @@
+"""Classification of pipe segments into horizontal, vertical and sloped ones.
+
+A segment is vertical if it deviates less than the tolerance angle from the
+vertical and horizontal if it deviates at most the tolerance angle from the
+horizontal, all other segments are sloped. Instead of computing angles the
+squared horizontal and vertical extents of a segment are compared using the
+squared tangent of the tolerance, which is computed once per batch. Whole
+batches of segments are classified at once with NumPy if it is available,
+with a pure Python loop otherwise (e.g. on IronPython inside Revit).
+
+The module does not depend on the Revit API.
+"""
+
+import array
+import itertools
+import math
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, fall back to a pure Python loop
+    numpy = None
+
+# Segment classes:
+HORIZONTAL = 0
+VERTICAL = 1
+SLOPED = 2
+CLASS_NAMES = {HORIZONTAL: "horizontal", VERTICAL: "vertical", SLOPED: "sloped"}
+DEFAULT_TOLERANCE = 1  # degrees
+
+
+def squared_tangent(tolerance):
+    """Squared tangent of a tolerance angle in degrees."""
+    if not 0 <= tolerance < 45:
+        raise ValueError("Tolerance must be at least 0 and below 45 degrees, not {tol}!".format(tol=tolerance))
+    return math.tan(math.radians(tolerance)) ** 2
+
+
+def classify(start, end, tolerance=DEFAULT_TOLERANCE, threshold=None):
+    """Classify one segment given by its (x, y, z) end points.
+
+    threshold is the squared tangent of the tolerance, pass it in when
+    classifying many segments one by one.
+    """
+    if threshold is None:
+        threshold = squared_tangent(tolerance)
+    dz2 = (end[2] - start[2]) ** 2
+    dxy2 = (end[0] - start[0]) ** 2 + (end[1] - start[1]) ** 2
+    if dxy2 < dz2 * threshold:
+        return VERTICAL
+    if dz2 <= dxy2 * threshold:
+        return HORIZONTAL
+    return SLOPED
+
+
+def classify_segments(starts, ends, tolerance=DEFAULT_TOLERANCE):
+    """Classify a batch of segments given by sequences (or n x 3 arrays) of (x, y, z) end points.
+
+    Returns a NumPy int8 array if NumPy is available, an array.array
+    otherwise.
+    """
+    threshold = squared_tangent(tolerance)
+    if numpy is not None:
+        delta = point_array(ends) - point_array(starts)
+        dz2 = delta[:, 2] ** 2
+        dxy2 = delta[:, 0] ** 2 + delta[:, 1] ** 2
+        classes = numpy.full(len(delta), SLOPED, dtype=numpy.int8)
+        classes[dz2 <= dxy2 * threshold] = HORIZONTAL
+        classes[dxy2 < dz2 * threshold] = VERTICAL
+        return classes
+    return array.array("b", [classify(start, end, threshold=threshold) for start, end in zip(starts, ends)])
+
+
+def point_array(points):
+    """Convert a sequence of (x, y, z) points to an n x 3 NumPy array."""
+    if isinstance(points, numpy.ndarray):
+        return points.astype(numpy.float64, copy=False).reshape(-1, 3)
+    flat = numpy.fromiter(itertools.chain.from_iterable(points), dtype=numpy.float64, count=3 * len(points))
+    return flat.reshape(-1, 3)
@@ -0,0 +1,87 @@
+"""Fingerprints of Revit schedules for exporting only changed schedules.
+
+A fingerprint is a SHA-1 digest of a schedule's definition (fields, column
+headings, filters, sorting) and of the text of its title (header section)
+and its visible table body. The
+fingerprints of the last export are kept in a manifest file in the export
+folder. This module does not depend on the Revit API, any object offering
+the used ViewSchedule members can be fingerprinted.
+"""
+
+import hashlib
+import json
+import os.path
+
+MANIFEST_FILENAME = ".schedule_export_manifest.json"
+MANIFEST_VERSION = 2  # bumped when the fingerprints change for the same schedule
+SEPARATOR = u"\x1f"  # unit separator between texts
+ROW_SEPARATOR = u"\x1e"  # record separator between rows
+
+
+def schedule_fingerprint(schedule, header_section, body_section):
+    """Fingerprint a schedule by its definition and the text of its title and table body.
+
+    header_section and body_section are the section types of the table
+    title and body, i.e. Autodesk.Revit.DB.SectionType.Header and .Body when
+    called from within Revit.
+    """
+    digest = hashlib.sha1()
+    update(digest, schedule.Name)
+    definition = schedule.Definition
+    update(digest, u"itemized={0}".format(definition.IsItemized))
+    update(digest, u"filters={0}".format(definition.GetFilterCount()))
+    update(digest, u"sorting={0}".format(definition.GetSortGroupFieldCount()))
+    for index in range(definition.GetFieldCount()):
+        field = definition.GetField(index)
+        update(digest, u"field={0}|{1}|{2}".format(field.GetName(), field.ColumnHeading, field.IsHidden))
+    digest.update(ROW_SEPARATOR.encode("utf-8"))
+    table_data = schedule.GetTableData()
+    for section_type in (header_section, body_section):
+        section = table_data.GetSectionData(section_type)
+        if section is None:
+            continue
+        for row in range(section.NumberOfRows):
+            for column in range(section.NumberOfColumns):
+                update(digest, schedule.GetCellText(section_type, row, column))
+            digest.update(ROW_SEPARATOR.encode("utf-8"))
+        digest.update(ROW_SEPARATOR.encode("utf-8"))  # end of the section
+    return digest.hexdigest()
+
+
+def update(digest, text):
+    """Add a text and a separator to a digest."""
+    digest.update((text + SEPARATOR).encode("utf-8"))
+
+
+def manifest_path(folder):
+    """Path of the export manifest in an export folder."""
+    return os.path.join(folder, MANIFEST_FILENAME)
+
+
+def load_manifest(folder):
+    """Load the {file name: fingerprint} mapping of the last export to a folder."""
+    path = manifest_path(folder)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (IOError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("fingerprints", {})
+
+
+def save_manifest(folder, fingerprints):
+    """Save the {file name: fingerprint} mapping of an export to a folder."""
+    manifest = {"version": MANIFEST_VERSION, "fingerprints": fingerprints}
+    with open(manifest_path(folder), "w") as manifest_file:
+        manifest_file.write(json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def needs_export(folder, file_name, fingerprint, fingerprints):
+    """Check if a schedule changed since its last export or its file is missing."""
+    if fingerprints.get(file_name) != fingerprint:
+        return True
+    return not os.path.exists(os.path.join(folder, file_name))
@@ -0,0 +1,42 @@
+"""Tests of combining interference reports and indexing view elements."""
+
+import pytest
+import clash_batch
+
+
+class StubReport(object):
+    """Report stub with fixed clashing element ids."""
+
+    def __init__(self, element_ids):
+        """Initializer."""
+        self.ids = set(element_ids)
+
+    def element_ids(self):
+        """Clashing element ids, a new set on every call."""
+        return set(self.ids)
+
+
+def test_union_and_intersection():
+    reports = [StubReport([1, 2, 3]), StubReport([2, 3, 4]), StubReport([3, 5])]
+    assert clash_batch.combine_clashing_ids(reports, clash_batch.UNION) == {1, 2, 3, 4, 5}
+    assert clash_batch.combine_clashing_ids(reports, clash_batch.INTERSECTION) == {3}
+
+
+def test_combining_keeps_the_reports_unchanged():
+    first = StubReport([1, 2])
+    clash_batch.combine_clashing_ids([first, StubReport([3])], clash_batch.UNION)
+    assert first.element_ids() == {1, 2}
+
+
+def test_no_reports_and_unknown_mode():
+    assert clash_batch.combine_clashing_ids([], clash_batch.INTERSECTION) == set()
+    with pytest.raises(ValueError):
+        clash_batch.combine_clashing_ids([StubReport([1])], "xor")
+
+
+def test_visibility_index_element_categories():
+    index = clash_batch.VisibilityIndex()
+    index.add_view(10, {1: -2000011, 2: None})
+    index.add_view(20, {2: None, 3: -2008044})
+    assert index.element_categories(10) == {1: -2000011, 2: None}
+    assert index.element_categories(20) == {2: None, 3: -2008044}
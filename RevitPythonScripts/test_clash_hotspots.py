@@ -0,0 +1,43 @@
+"""Tests of the clustering of clashes into hotspots."""
+
+import clash_hotspots
+
+
+def point_clashes(points):
+    """Clash pairs and bounding boxes of clashes at the given points."""
+    pairs, boxes = [], {}
+    for number, point in enumerate(points):
+        pair = (2 * number, 2 * number + 1)
+        box = (tuple(value - 0.1 for value in point), tuple(value + 0.1 for value in point))
+        boxes[pair[0]] = boxes[pair[1]] = box
+        pairs.append(pair)
+    return pairs, boxes
+
+
+def test_evenly_spread_clashes_are_split_into_bounded_hotspots():
+    points = [(x * 5.0, y * 5.0, z * 10.0) for x in range(100) for y in range(30) for z in range(3)]
+    pairs, boxes = point_clashes(points)
+    hotspots, skipped = clash_hotspots.find_hotspots(pairs, boxes)
+    assert skipped == 0
+    assert sum(hotspot.clash_count for hotspot in hotspots) == len(points)
+    assert len(hotspots) > 50
+    window_size = 3 * clash_hotspots.CELL_SIZE
+    for hotspot in hotspots:
+        assert all(high - low < window_size for low, high in zip(hotspot.minimum, hotspot.maximum))
+
+
+def test_dense_clusters_rank_first():
+    spread = [(x * 20.0, 0.0, 0.0) for x in range(50)]
+    dense_a = [(500.0 + x * 0.1, 100.0, 0.0) for x in range(40)]
+    dense_b = [(-300.0, -300.0 + x * 0.1, 0.0) for x in range(30)]
+    pairs, boxes = point_clashes(spread + dense_a + dense_b)
+    hotspots, _ = clash_hotspots.find_hotspots(pairs, boxes)
+    assert [hotspot.clash_count for hotspot in hotspots[:2]] == [40, 30]
+
+
+def test_only_generated_view_names_are_hotspot_views():
+    hotspot = clash_hotspots.Hotspot(12, [], (0, 0, 0), (1, 1, 1))
+    assert clash_hotspots.view_name(3, hotspot) == "Clash Hotspot 03 (12 clashes)"
+    assert clash_hotspots.is_hotspot_view_name(clash_hotspots.view_name(3, hotspot))
+    assert not clash_hotspots.is_hotspot_view_name("Clash Hotspot Review Level 2")
+    assert not clash_hotspots.is_hotspot_view_name("Clash Hotspot 03 (12 clashes) - Copy 1")
@@ -0,0 +1,39 @@
+"""Tests of the persistent clash index."""
+
+import os
+import pytest
+import clash_index
+
+
+def test_pairs_are_normalized_and_deduplicated():
+    index = clash_index.ClashIndex.from_pairs([(5, 2), (2, 5), (3, 9), (2, 3)])
+    assert list(index.pairs()) == [(2, 3), (2, 5), (3, 9)]
+    assert index.clashes_of(2) == [(2, 3), (2, 5)]
+    assert index.clashes_of(4) == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "report.html.clashidx")
+    clash_index.ClashIndex.from_pairs([(1, 2), (3, 1)]).save(path)
+    loaded = clash_index.ClashIndex.load(path)
+    assert list(loaded.pairs()) == [(1, 2), (1, 3)]
+    assert loaded.clashes_of(1) == [(1, 2), (1, 3)]
+    assert os.listdir(str(tmp_path)) == ["report.html.clashidx"]
+
+
+@pytest.mark.parametrize("length", [0, 10, -1])
+def test_truncated_file_raises_value_error(tmp_path, length):
+    path = str(tmp_path / "report.html.clashidx")
+    clash_index.ClashIndex.from_pairs([(1, 2), (3, 4)]).save(path)
+    with open(path, "rb") as index_file:
+        data = index_file.read()
+    with open(path, "wb") as index_file:
+        index_file.write(data[:length])
+    with pytest.raises(ValueError):
+        clash_index.ClashIndex.load(path)
+
+
+def test_diff():
+    old = clash_index.ClashIndex.from_pairs([(1, 2), (3, 4)])
+    new = clash_index.ClashIndex.from_pairs([(4, 3), (5, 6)])
+    assert clash_index.diff(old, new) == clash_index.ClashDiff([(5, 6)], [(1, 2)], [(3, 4)])
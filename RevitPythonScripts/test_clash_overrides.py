@@ -0,0 +1,52 @@
+"""Tests of the planning of clash marking overrides."""
+
+import clash_overrides
+
+WALLS, PIPES, LINES = -2000011, -2008044, -2000051
+ELEMENT_CATEGORIES = {1: WALLS, 2: WALLS, 3: PIPES, 4: PIPES, 5: LINES, 6: None}
+FILTERABLE = {WALLS, PIPES}
+
+
+def test_filterable_categories_are_faded_by_filter():
+    plan = clash_overrides.plan_overrides(ELEMENT_CATEGORIES, {1, 3}, FILTERABLE, min_filter_size=2)
+    assert plan.fade_category_ids == {WALLS, PIPES}
+    assert plan.fade_element_ids == {5, 6}
+    assert plan.highlight_filter_ids == {1, 3}
+    assert plan.highlight_element_ids == set()
+    assert clash_overrides.operation_count(plan) == 2 + 2 + 3
+
+
+def test_small_clash_sets_are_highlighted_one_by_one():
+    plan = clash_overrides.plan_overrides(ELEMENT_CATEGORIES, {1, 5}, FILTERABLE, min_filter_size=3)
+    assert plan.fade_element_ids == {6}
+    assert plan.highlight_filter_ids == set()
+    assert plan.highlight_element_ids == {1, 5}
+    assert clash_overrides.marked_element_ids(plan) == {1, 5, 6}
+    assert clash_overrides.operation_count(plan) == 2 + 1 + 2
+
+
+def test_clashing_ids_outside_the_view_are_ignored():
+    plan = clash_overrides.plan_overrides(ELEMENT_CATEGORIES, {1, 99}, FILTERABLE, min_filter_size=1)
+    assert plan.highlight_filter_ids == {1}
+
+
+def test_only_stale_marks_are_reset():
+    plan = clash_overrides.plan_overrides(ELEMENT_CATEGORIES, {1, 5}, FILTERABLE, marked_ids={1, 2, 6, 42},
+                                          min_filter_size=3)
+    assert plan.reset_element_ids == {2, 42}
+    assert clash_overrides.operation_count(plan) == 2 + 2 + 1 + 2
+
+
+def test_filter_highlights_reset_earlier_element_highlights():
+    plan = clash_overrides.plan_overrides(ELEMENT_CATEGORIES, {1, 3}, FILTERABLE, marked_ids={1, 5},
+                                          min_filter_size=2)
+    assert plan.reset_element_ids == {1}
+
+
+def test_element_overrides_for_template_controlled_views():
+    plan = clash_overrides.plan_element_overrides(ELEMENT_CATEGORIES, {1, 3}, marked_ids={2, 7})
+    assert plan.fade_category_ids == set()
+    assert plan.fade_element_ids == {2, 4, 5, 6}
+    assert plan.highlight_element_ids == {1, 3}
+    assert plan.reset_element_ids == {7}
+    assert clash_overrides.operation_count(plan) == 1 + 4 + 2
@@ -0,0 +1,42 @@
+"""Tests of the streaming interference report parser."""
+
+import io
+import interference_report
+
+REPORT = u"""<html><body><table>
+<tr><td></td><td>A</td><td>B</td></tr>
+<tr><td>1</td><td>Pipes : Pipe Types : Default : ID 101</td><td>Ducts : Rectangular Duct : ID 202</td></tr>
+<tr><td>2</td><td>Pipes : Pipe Types : Default : ID 101</td><td>Walls : Basic Wall : ID 303</td></tr>
+<tr><td>3</td><td>Pipes : Pipe Types : Default</td><td>Walls : Basic Wall : ID 303</td></tr>
+<tr><td>4</td><td>Cable Trays : Tray &amp; Fittings : ID 404</td><td>Ducts : Round Duct : ID 505</td></tr>
+</table></body></html>
+"""
+
+
+def write_report(tmp_path, text=REPORT):
+    """Write a UTF-16 encoded report file and return its path."""
+    path = str(tmp_path / "report.html")
+    with io.open(path, "w", encoding="utf-16") as report_file:
+        report_file.write(text)
+    return path
+
+
+def test_parse_pairs_and_malformed_rows(tmp_path):
+    report = interference_report.parse_report(write_report(tmp_path))
+    assert len(report) == 3
+    assert list(report.pairs()) == [(101, 202), (101, 303), (404, 505)]
+    assert report.malformed_rows == 1
+    assert report.element_ids() == {101, 202, 303, 404, 505}
+
+
+def test_tiny_chunks_give_same_result(tmp_path):
+    path = write_report(tmp_path)
+    whole = interference_report.parse_report(path)
+    chunked = interference_report.parse_report(path, chunk_size=7)  # splits characters, tags and texts
+    assert list(chunked.pairs()) == list(whole.pairs())
+    assert chunked.malformed_rows == whole.malformed_rows
+
+
+def test_element_id():
+    assert interference_report.element_id(u"Pipes : Pipe Types : Default : ID 123456 ") == 123456
+    assert interference_report.element_id(u"Pipes : Pipe Types : Default") is None
@@ -0,0 +1,110 @@
+"""Tests of the schedule fingerprints against stub schedules."""
+
+import schedule_fingerprint
+
+HEADER = "header"
+BODY = "body"
+
+
+class StubField(object):
+    """Schedule field with a name, heading and hidden flag."""
+
+    def __init__(self, name, heading=None, hidden=False):
+        self.name = name
+        self.ColumnHeading = heading or name
+        self.IsHidden = hidden
+
+    def GetName(self):
+        return self.name
+
+
+class StubDefinition(object):
+    """Schedule definition with fields and filter and sorting counts."""
+
+    def __init__(self, fields, itemized=True, filters=0, sorting=0):
+        self.fields = fields
+        self.IsItemized = itemized
+        self.filters = filters
+        self.sorting = sorting
+
+    def GetFieldCount(self):
+        return len(self.fields)
+
+    def GetField(self, index):
+        return self.fields[index]
+
+    def GetFilterCount(self):
+        return self.filters
+
+    def GetSortGroupFieldCount(self):
+        return self.sorting
+
+
+class StubSection(object):
+    """Table section data with its size."""
+
+    def __init__(self, cells):
+        self.NumberOfRows = len(cells)
+        self.NumberOfColumns = len(cells[0]) if cells else 0
+
+
+class StubTableData(object):
+    """Table data with a header and a body section."""
+
+    def __init__(self, sections):
+        self.sections = sections
+
+    def GetSectionData(self, section_type):
+        return StubSection(self.sections[section_type])
+
+
+class StubSchedule(object):
+    """View schedule with a definition and header and body cell texts."""
+
+    def __init__(self, name="Qty_PIPES_2019", title="Pipes", body=None, fields=None):
+        self.Name = name
+        self.Definition = StubDefinition(fields or [StubField("Length")])
+        self.cells = {HEADER: [[title]], BODY: body if body is not None else [["Length"], ["1 m"]]}
+
+    def GetTableData(self):
+        return StubTableData(self.cells)
+
+    def GetCellText(self, section_type, row, column):
+        return self.cells[section_type][row][column]
+
+
+def fingerprint(schedule):
+    return schedule_fingerprint.schedule_fingerprint(schedule, HEADER, BODY)
+
+
+def test_unchanged_schedule_has_same_fingerprint():
+    assert fingerprint(StubSchedule()) == fingerprint(StubSchedule())
+
+
+def test_title_change_changes_fingerprint():
+    assert fingerprint(StubSchedule(title="Pipes")) != fingerprint(StubSchedule(title="Pipes (new)"))
+
+
+def test_body_change_changes_fingerprint():
+    assert fingerprint(StubSchedule(body=[["Length"], ["1 m"]])) != fingerprint(StubSchedule(body=[["Length"], ["2 m"]]))
+
+
+def test_definition_change_changes_fingerprint():
+    visible = StubSchedule(fields=[StubField("Length")])
+    hidden = StubSchedule(fields=[StubField("Length", hidden=True)])
+    assert fingerprint(visible) != fingerprint(hidden)
+
+
+def test_cells_are_not_concatenated_ambiguously():
+    assert fingerprint(StubSchedule(body=[["ab", "c"]])) != fingerprint(StubSchedule(body=[["a", "bc"]]))
+
+
+def test_needs_export(tmp_path):
+    folder = str(tmp_path)
+    digest = fingerprint(StubSchedule())
+    assert schedule_fingerprint.needs_export(folder, "Qty_PIPES_2019.csv", digest, {})
+    (tmp_path / "Qty_PIPES_2019.csv").write_text(u"")
+    schedule_fingerprint.save_manifest(folder, {"Qty_PIPES_2019.csv": digest})
+    fingerprints = schedule_fingerprint.load_manifest(folder)
+    assert not schedule_fingerprint.needs_export(folder, "Qty_PIPES_2019.csv", digest, fingerprints)
+    assert schedule_fingerprint.needs_export(folder, "Qty_PIPES_2019.csv", "other", fingerprints)